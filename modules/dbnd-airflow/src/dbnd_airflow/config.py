@@ -25,6 +25,26 @@ class AirflowConfig(Config):
         " dag and task concurrency checks"
     )[bool]
 
+    scheduler_ready_queue = parameter(
+        default=False,
+        description="Evaluate only task instances that are ready to run "
+        "or have their upstream state changed on every scheduler loop iteration "
+        "(instead of all task instances of the dag run)",
+    )[bool]
+
+    task_instance_state_max_poll_interval = parameter(
+        default=0.0,
+        description="Max interval (seconds) between task instances state polls, "
+        "polling is slowed down up to this value while no state is changing "
+        "(0 - poll on every scheduler loop iteration)",
+    )[float]
+    task_instance_state_full_refresh_interval = parameter(
+        default=30.0,
+        description="Interval (seconds) between full reads of task instances states, "
+        "in between only unfinished task instances are read "
+        "(finished ones can be changed externally, e.g. marked failed)",
+    )[float]
+
     dbnd_dag_concurrency = parameter(description="Concurrency for dbnd ad-hoc dags")[
         int
     ]
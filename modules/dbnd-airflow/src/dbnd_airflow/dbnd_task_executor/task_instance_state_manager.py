@@ -1,29 +1,101 @@
+import time
+
 from collections import Counter, defaultdict
 from typing import List
 
 from airflow.models import TaskInstance
+from airflow.utils.state import State
+from sqlalchemy import or_
+
+
+# sqlite limits the amount of variables in the query
+_IN_QUERY_CHUNK_SIZE = 500
 
 
 class AirflowTaskInstanceStateManager(object):
     """
     AirflowTaskInstanceStateManager holds latest state info for all relevant task_instances
+
+    Refresh is incremental: we query all unfinished task instances (they are the only ones
+    that are expected to change) and the ones that were unfinished and have disappeared
+    from that query (just finished), so finished task instances are not read again and again.
+    Finished task instances can still be changed externally (e.g. marked failed),
+    so all task instances are read every full_refresh_interval seconds.
+
+    If max_poll_interval is set, polling is slowed down (up to max_poll_interval seconds)
+    while nothing is changing, any change (or force=True) resets it back.
     """
 
-    def __init__(self):
+    def __init__(
+        self, min_poll_interval=0.5, max_poll_interval=0, full_refresh_interval=30
+    ):
         self.status = defaultdict(dict)
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.full_refresh_interval = full_refresh_interval
+
+        self._last_poll = {}  # (dag_id, execution_date) -> (time, idle polls)
+        self._last_full_refresh = {}  # (dag_id, execution_date) -> time
 
     def _get_dag_run(self, dag_id, execution_date):
         return self.status[(dag_id, execution_date)]
 
     def refresh_from_db(self, dag_id, execution_date, session):
+        """
+        Returns task_ids of task instances with changed state
+        """
         TI = TaskInstance
-        updated_status = (
-            session.query(TI.task_id, TI.state)
-            .filter(TI.dag_id == dag_id, TI.execution_date == execution_date)
-            .all()
-        )
+        finished = State.finished()
+        status = self._get_dag_run(dag_id, execution_date)
+
+        dag_run_key = (dag_id, execution_date)
+        dag_run_filter = (TI.dag_id == dag_id, TI.execution_date == execution_date)
+        now = time.time()
+        last_full_refresh = self._last_full_refresh.get(dag_run_key)
+        if (
+            last_full_refresh is None
+            or now - last_full_refresh >= self.full_refresh_interval
+        ):
+            # first (or periodic) refresh, we need to read all task instances
+            updated_status = dict(
+                session.query(TI.task_id, TI.state).filter(*dag_run_filter).all()
+            )
+            self._last_full_refresh[dag_run_key] = now
+            removed = [task_id for task_id in status if task_id not in updated_status]
+        else:
+            updated_status = dict(
+                session.query(TI.task_id, TI.state)
+                .filter(*dag_run_filter)
+                .filter(or_(TI.state.is_(None), TI.state.notin_(finished)))
+                .all()
+            )
+            # were not finished at previous refresh, and they are not "unfinished" now
+            just_finished = [
+                task_id
+                for task_id, state in status.items()
+                if state not in finished and task_id not in updated_status
+            ]
+            for i in range(0, len(just_finished), _IN_QUERY_CHUNK_SIZE):
+                updated_status.update(
+                    session.query(TI.task_id, TI.state)
+                    .filter(*dag_run_filter)
+                    .filter(TI.task_id.in_(just_finished[i : i + _IN_QUERY_CHUNK_SIZE]))
+                    .all()
+                )
+            removed = [
+                task_id for task_id in just_finished if task_id not in updated_status
+            ]
 
-        self.status[(dag_id, execution_date)] = dict(updated_status)
+        changed = set()
+        for task_id, state in updated_status.items():
+            if task_id not in status or status[task_id] != state:
+                status[task_id] = state
+                changed.add(task_id)
+        # removed from db
+        for task_id in removed:
+            status.pop(task_id)
+            changed.add(task_id)
+        return changed
 
     def get_state(self, dag_id, execution_date, task_id):
         return self._get_dag_run(dag_id, execution_date).get(task_id)
@@ -38,8 +110,33 @@ class AirflowTaskInstanceStateManager(object):
         for ti in task_instances:
             ti.state = self.get_state(ti.dag_id, ti.execution_date, ti.task_id)
 
+    def _should_poll(self, dag_run_key, force):
+        if force or not self.max_poll_interval or dag_run_key not in self._last_poll:
+            return True
+        last_poll, idle_polls = self._last_poll[dag_run_key]
+        interval = min(self.max_poll_interval, self.min_poll_interval * 2**idle_polls)
+        return time.time() - last_poll >= interval
+
     def refresh_task_instances_state(
-        self, task_instances, dag_id, execution_date, session
+        self, task_instances, dag_id, execution_date, session, force=False
     ):
-        self.refresh_from_db(dag_id, execution_date, session)
+        """
+        Refreshes the state and syncs it into task instances.
+        Returns task_ids of task instances with changed state
+        (empty if db polling is skipped, as nothing has changed recently).
+        """
+        dag_run_key = (dag_id, execution_date)
+        changed = set()
+        if self._should_poll(dag_run_key, force):
+            changed = self.refresh_from_db(dag_id, execution_date, session)
+
+            _, idle_polls = self._last_poll.get(dag_run_key, (None, 0))
+            self._last_poll[dag_run_key] = (
+                time.time(),
+                0 if changed else idle_polls + 1,
+            )
+
+        # task instance objects can be changed in memory,
+        # all of them are synced (it doesn't require db access)
         self.sync_to_object(task_instances)
+        return changed
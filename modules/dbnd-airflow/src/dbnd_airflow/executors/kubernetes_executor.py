@@ -17,6 +17,7 @@
 
 import logging
 import signal
+import time
 import typing
 
 from airflow.contrib.executors.kubernetes_executor import (
@@ -32,7 +33,10 @@ from airflow.utils.state import State
 from dbnd._core.current import try_get_databand_run
 from dbnd._core.errors.base import DatabandSigTermError
 from dbnd._core.utils.basics.safe_signal import safe_signal
-from dbnd_airflow_contrib.kubernetes_metrics_logger import KubernetesMetricsLogger
+from dbnd_airflow_contrib.kubernetes_metrics_logger import (
+    KubernetesMetricsLogger,
+    PodEventLagStats,
+)
 
 
 if typing.TYPE_CHECKING:
@@ -41,6 +45,12 @@ if typing.TYPE_CHECKING:
 
 MAX_POD_ID_LEN = 253
 
+# the watch is resumed with exponential backoff on errors
+WATCH_MIN_BACKOFF = 1
+WATCH_MAX_BACKOFF = 60
+# log the lag of pod events every so many events
+WATCH_LAG_LOG_EVENTS = 100
+
 logger = logging.getLogger(__name__)
 
 
@@ -314,10 +324,12 @@ class DbndKubernetesJobWatcher(KubernetesJobWatcher):
         self.processed_events = {}
         self.processed_pods = {}
         self.metrics_logger = KubernetesMetricsLogger()
+        self.lag_stats = PodEventLagStats()
 
     def run(self):
         """Performs watching"""
         kube_client = self.kube_dbnd.kube_client
+        backoff = WATCH_MIN_BACKOFF
         try:
             while True:
                 try:
@@ -327,16 +339,31 @@ class DbndKubernetesJobWatcher(KubernetesJobWatcher):
                         self.worker_uuid,
                         self.kube_config,
                     )
+                    backoff = WATCH_MIN_BACKOFF
                 except DatabandSigTermError:
                     break
-                except Exception:
-                    self.log.exception("Unknown error in KubernetesJobWatcher. Failing")
-                    raise
+                except Exception as ex:
+                    if getattr(ex, "status", None) == 410:
+                        # resource version is too old, starting from the current state
+                        self.log.info("Watch resource version is too old: %s", ex)
+                        self.resource_version = 0
+                        continue
+                    # the watch is resumed from the last resource version,
+                    # so we don't miss events (and don't overload the api server)
+                    self.log.exception(
+                        "Unknown error in KubernetesJobWatcher, "
+                        "resuming the watch in %ss with last resource_version: %s",
+                        backoff,
+                        self.resource_version,
+                    )
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, WATCH_MAX_BACKOFF)
                 else:
                     self.log.warning(
                         "Watch died gracefully, starting back up with: "
-                        "last resource_version: %s",
+                        "last resource_version: %s, pod events: %s",
                         self.resource_version,
+                        self.lag_stats,
                     )
         except (KeyboardInterrupt, DatabandSigTermError):
             pass
@@ -376,6 +403,11 @@ class DbndKubernetesJobWatcher(KubernetesJobWatcher):
             pod_name = pod_data.metadata.name
             phase = pod_data.status.phase
 
+            lag = self.lag_stats.on_event(pod_data)
+            self.log.debug("Event: %s at %s, lag: %s", phase, pod_name, lag)
+            if self.lag_stats.events % WATCH_LAG_LOG_EVENTS == 0:
+                self.log.info("Pod events: %s", self.lag_stats)
+
             if self.processed_events.get(pod_name):
                 self.log.debug("Event: %s at %s - skipping as seen", phase, pod_name)
                 continue
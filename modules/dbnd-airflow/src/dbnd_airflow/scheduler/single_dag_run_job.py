@@ -2,6 +2,9 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import datetime
 import logging
+import time
+
+import attr
 
 from airflow import executors, models
 from airflow.jobs import BackfillJob, BaseJob
@@ -24,12 +27,38 @@ from dbnd_airflow.config import AirflowConfig
 from dbnd_airflow.dbnd_task_executor.task_instance_state_manager import (
     AirflowTaskInstanceStateManager,
 )
+from dbnd_airflow.scheduler.task_ready_queue import TaskReadyQueue
 
 
 logger = logging.getLogger(__name__)
 
 SCHEDUALED_OR_RUNNABLE = RUNNABLE_STATES.union({State.SCHEDULED})
 
+
+@attr.s
+class SchedulerLoopStats(object):
+    iterations = attr.ib(default=0)  # type: int
+    total_time = attr.ib(default=0.0)  # type: float
+    scheduling_time = attr.ib(default=0.0)  # type: float
+    max_iteration_time = attr.ib(default=0.0)  # type: float
+    last_iteration_time = attr.ib(default=0.0)  # type: float
+
+    def add_iteration(self, scheduling_time, iteration_time):
+        self.iterations += 1
+        self.total_time += iteration_time
+        self.scheduling_time += scheduling_time
+        self.max_iteration_time = max(self.max_iteration_time, iteration_time)
+        self.last_iteration_time = iteration_time
+
+    def __str__(self):
+        return (
+            "{s.iterations} iterations, {s.total_time:.2f}s total "
+            "({s.scheduling_time:.2f}s scheduling), avg {avg:.3f}s, max {s.max_iteration_time:.3f}s".format(
+                s=self, avg=self.total_time / self.iterations if self.iterations else 0
+            )
+        )
+
+
 # based on airflow BackfillJob
 class SingleDagRunJob(BaseJob, SingletonContext):
     """
@@ -79,8 +108,12 @@ class SingleDagRunJob(BaseJob, SingletonContext):
         self._logged_count = 0  # counter for status update
         self._logged_status = ""  # last printed status
 
-        self.ti_state_manager = AirflowTaskInstanceStateManager()
         self.airflow_config = airflow_config  # type: AirflowConfig
+        self.ti_state_manager = AirflowTaskInstanceStateManager(
+            max_poll_interval=airflow_config.task_instance_state_max_poll_interval,
+            full_refresh_interval=airflow_config.task_instance_state_full_refresh_interval,
+        )
+        self.loop_stats = SchedulerLoopStats()
         super(SingleDagRunJob, self).__init__(*args, **kwargs)
 
     @property
@@ -356,237 +389,345 @@ class SingleDagRunJob(BaseJob, SingletonContext):
         all_ti = list(ti_status.to_run.values())
         waiting_for_executor_result = {}
 
-        while (len(ti_status.to_run) > 0 or len(ti_status.running) > 0) and len(
-            ti_status.deadlocked
-        ) == 0:
-            if current.is_killed():
-                raise friendly_error.task_execution.databand_context_killed(
-                    "SingleDagRunJob scheduling main loop"
-                )
-            self.log.debug("*** Clearing out not_ready list ***")
-            ti_status.not_ready.clear()
-
-            self.ti_state_manager.refresh_task_instances_state(
-                all_ti, self.dag.dag_id, self.execution_date, session=session
-            )
+        ready_queue = None
+        if self.airflow_config.scheduler_ready_queue:
+            ready_queue = TaskReadyQueue(self.dag, [ti.task_id for ti in all_ti])
+            key_by_task_id = {ti.task_id: key for key, ti in ti_status.to_run.items()}
 
-            # we need to execute the tasks bottom to top
-            # or leaf to root, as otherwise tasks might be
-            # determined deadlocked while they are actually
-            # waiting for their upstream to finish
-            for task in self.dag.topological_sort():
-
-                # TODO: too complicated mechanism,
-                # it's not possible that we have multiple tasks with the same id in to run
-                for key, ti in list(ti_status.to_run.items()):
-                    if task.task_id != ti.task_id:
-                        continue
-
-                    if not self._optimize:
-                        ti.refresh_from_db()
-
-                    task = self.dag.get_task(ti.task_id)
-                    ti.task = task
-
-                    # TODO : do we need that?
-                    # ignore_depends_on_past = (
-                    #     self.ignore_first_depends_on_past and
-                    #     ti.execution_date == (start_date or ti.start_date))
-                    ignore_depends_on_past = False
-                    self.log.debug("Task instance to run %s state %s", ti, ti.state)
-
-                    # guard against externally modified tasks instances or
-                    # in case max concurrency has been reached at task runtime
-                    if ti.state == State.NONE:
-                        self.log.warning(
-                            "FIXME: task instance {} state was set to None "
-                            "externally. This should not happen"
-                        )
-                        ti.set_state(State.SCHEDULED, session=session)
-
-                    # The task was already marked successful or skipped by a
-                    # different Job. Don't rerun it.
-                    if ti.state == State.SUCCESS:
-                        ti_status.succeeded.add(key)
-                        self.log.debug("Task instance %s succeeded. Don't rerun.", ti)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-                    elif ti.state == State.SKIPPED:
-                        ti_status.skipped.add(key)
-                        self.log.debug("Task instance %s skipped. Don't rerun.", ti)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-                    elif ti.state == State.FAILED:
-                        self.log.error("Task instance %s failed", ti)
-                        ti_status.failed.add(key)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-                    elif ti.state == State.UPSTREAM_FAILED:
-                        self.log.error("Task instance %s upstream failed", ti)
-                        ti_status.failed.add(key)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-
-                    runtime_deps = []
-                    if self.airflow_config.disable_dag_concurrency_rules:
-                        # RUN Deps validate dag and task concurrency
-                        # It's less relevant when we run in stand along mode with SingleDagRunJob
-                        # from airflow.ti_deps.deps.runnable_exec_date_dep import RunnableExecDateDep
-                        from airflow.ti_deps.deps.valid_state_dep import ValidStateDep
-
-                        # from airflow.ti_deps.deps.dag_ti_slots_available_dep import DagTISlotsAvailableDep
-                        # from airflow.ti_deps.deps.task_concurrency_dep import TaskConcurrencyDep
-                        # from airflow.ti_deps.deps.pool_slots_available_dep import PoolSlotsAvailableDep
-                        runtime_deps = {
-                            # RunnableExecDateDep(),
-                            ValidStateDep(SCHEDUALED_OR_RUNNABLE),
-                            # DagTISlotsAvailableDep(),
-                            # TaskConcurrencyDep(),
-                            # PoolSlotsAvailableDep(),
-                        }
-                    else:
-                        runtime_deps = RUNNING_DEPS
-
-                    dagrun_dep_context = DepContext(
-                        deps=runtime_deps,
-                        ignore_depends_on_past=ignore_depends_on_past,
-                        ignore_task_deps=self.ignore_task_deps,
-                        flag_upstream_failed=True,
+        self.loop_stats = SchedulerLoopStats()
+        try:
+            while (len(ti_status.to_run) > 0 or len(ti_status.running) > 0) and len(
+                ti_status.deadlocked
+            ) == 0:
+                if current.is_killed():
+                    raise friendly_error.task_execution.databand_context_killed(
+                        "SingleDagRunJob scheduling main loop"
                     )
-
-                    # Is the task runnable? -- then run it
-                    # the dependency checker can change states of tis
-                    if ti.are_dependencies_met(
-                        dep_context=dagrun_dep_context,
-                        session=session,
-                        verbose=self.verbose,
-                    ):
-                        ti.refresh_from_db(lock_for_update=True, session=session)
-                        if (
-                            ti.state == State.SCHEDULED
-                            or ti.state == State.UP_FOR_RETRY
-                        ):
-                            if executor.has_task(ti):
-                                self.log.debug(
-                                    "Task Instance %s already in executor "
-                                    "waiting for queue to clear",
-                                    ti,
-                                )
-                            else:
-                                self.log.debug("Sending %s to executor", ti)
-                                # if ti.state == State.UP_FOR_RETRY:
-                                #     ti._try_number += 1
-                                # Skip scheduled state, we are executing immediately
-                                ti.state = State.QUEUED
-                                session.merge(ti)
-
-                                cfg_path = None
-                                if executor.__class__ in (
-                                    executors.LocalExecutor,
-                                    executors.SequentialExecutor,
-                                ):
-                                    cfg_path = tmp_configuration_copy()
-
-                                executor.queue_task_instance(
-                                    ti,
-                                    mark_success=self.mark_success,
-                                    pickle_id=pickle_id,
-                                    ignore_task_deps=self.ignore_task_deps,
-                                    ignore_depends_on_past=ignore_depends_on_past,
-                                    pool=self.pool,
-                                    cfg_path=cfg_path,
-                                )
-
-                                ti_status.to_run.pop(key)
-                                ti_status.running[key] = ti
-                                waiting_for_executor_result[key] = ti
-                        session.commit()
-                        continue
-
-                    if ti.state == State.UPSTREAM_FAILED:
-                        self.log.error("Task instance %s upstream failed", ti)
-                        ti_status.failed.add(key)
-                        ti_status.to_run.pop(key)
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        continue
-
-                    # special case
-                    if ti.state == State.UP_FOR_RETRY:
-                        self.log.debug(
-                            "Task instance %s retry period not " "expired yet", ti
-                        )
-                        if key in ti_status.running:
-                            ti_status.running.pop(key)
-                        ti_status.to_run[key] = ti
-                        continue
-
-                    # all remaining tasks
-                    self.log.debug("Adding %s to not_ready", ti)
-                    ti_status.not_ready.add(key)
-            # execute the tasks in the queue
-            self.heartbeat()
-            executor.heartbeat()
-
-            # If the set of tasks that aren't ready ever equals the set of
-            # tasks to run and there are no running tasks then the backfill
-            # is deadlocked
-            if (
-                ti_status.not_ready
-                and ti_status.not_ready == set(ti_status.to_run)
-                and len(ti_status.running) == 0
-            ):
-                self.log.warning(
-                    "Deadlock discovered for ti_status.to_run=%s",
-                    ti_status.to_run.values(),
+                iteration_start = time.time()
+                self.log.debug("*** Clearing out not_ready list ***")
+                ti_status.not_ready.clear()
+
+                self.ti_state_manager.refresh_task_instances_state(
+                    all_ti,
+                    self.dag.dag_id,
+                    self.execution_date,
+                    session=session,
+                    # executor has results, they should be validated against db state
+                    force=bool(executor.event_buffer),
                 )
-                ti_status.deadlocked.update(ti_status.to_run.values())
-                ti_status.to_run.clear()
 
-            self.ti_state_manager.refresh_task_instances_state(
-                all_ti, self.dag.dag_id, self.execution_date, session=session
-            )
+                if ready_queue:
+                    self._process_ready_task_instances(
+                        ready_queue,
+                        key_by_task_id,
+                        all_ti,
+                        ti_status,
+                        executor,
+                        pickle_id,
+                        waiting_for_executor_result,
+                        session=session,
+                    )
+                else:
+                    # we need to execute the tasks bottom to top
+                    # or leaf to root, as otherwise tasks might be
+                    # determined deadlocked while they are actually
+                    # waiting for their upstream to finish
+                    for task in self.dag.topological_sort():
+
+                        # TODO: too complicated mechanism,
+                        # it's not possible that we have multiple tasks with the same id in to run
+                        for key, ti in list(ti_status.to_run.items()):
+                            if task.task_id != ti.task_id:
+                                continue
+                            self._process_task_instance(
+                                key,
+                                ti,
+                                ti_status,
+                                executor,
+                                pickle_id,
+                                waiting_for_executor_result,
+                                session=session,
+                            )
+                scheduling_time = time.time() - iteration_start
+
+                # execute the tasks in the queue
+                self.heartbeat()
+                executor.heartbeat()
+
+                # If the set of tasks that aren't ready ever equals the set of
+                # tasks to run and there are no running tasks then the backfill
+                # is deadlocked
+                if (
+                    ti_status.not_ready
+                    and ti_status.not_ready == set(ti_status.to_run)
+                    and len(ti_status.running) == 0
+                ):
+                    self.log.warning(
+                        "Deadlock discovered for ti_status.to_run=%s",
+                        ti_status.to_run.values(),
+                    )
+                    ti_status.deadlocked.update(ti_status.to_run.values())
+                    ti_status.to_run.clear()
 
-            # check executor state
-            self._manage_executor_state(ti_status.running, waiting_for_executor_result)
+                self.ti_state_manager.refresh_task_instances_state(
+                    all_ti,
+                    self.dag.dag_id,
+                    self.execution_date,
+                    session=session,
+                    # executor has results, they should be validated against db state
+                    force=bool(executor.event_buffer),
+                )
 
-            # update the task counters
-            self._update_counters(ti_status, waiting_for_executor_result)
+                # check executor state
+                self._manage_executor_state(
+                    ti_status.running, waiting_for_executor_result
+                )
 
-            # update dag run state
-            _dag_runs = ti_status.active_runs[:]
-            for run in _dag_runs:
-                run.update_state(session=session)
+                # update the task counters
+                self._update_counters(ti_status, waiting_for_executor_result)
 
-                self._update_databand_task_run_states(run)
+                # update dag run state
+                _dag_runs = ti_status.active_runs[:]
+                for run in _dag_runs:
+                    run.update_state(session=session)
 
-                if run.state in State.finished():
-                    ti_status.finished_runs += 1
-                    ti_status.active_runs.remove(run)
-                    executed_run_dates.append(run.execution_date)
+                    self._update_databand_task_run_states(run)
 
-            self._log_progress(ti_status)
+                    if run.state in State.finished():
+                        ti_status.finished_runs += 1
+                        ti_status.active_runs.remove(run)
+                        executed_run_dates.append(run.execution_date)
 
-            if self.fail_fast and ti_status.failed:
-                logger.error(
-                    "terminating executor because a task failed and fail_fast mode is enabled"
+                self._log_progress(ti_status)
+                self.loop_stats.add_iteration(
+                    scheduling_time=scheduling_time,
+                    iteration_time=time.time() - iteration_start,
                 )
-                raise DatabandFailFastError(
-                    "Failing whole pipeline as it has failed/canceled tasks %s",
-                    [t[2] for t in ti_status.failed],
+                self.log.debug(
+                    "Scheduler loop iteration took %.3fs (%.3fs scheduling)",
+                    self.loop_stats.last_iteration_time,
+                    scheduling_time,
                 )
 
+                if self.fail_fast and ti_status.failed:
+                    logger.error(
+                        "terminating executor because a task failed and fail_fast mode is enabled"
+                    )
+                    raise DatabandFailFastError(
+                        "Failing whole pipeline as it has failed/canceled tasks %s",
+                        [t[2] for t in ti_status.failed],
+                    )
+        finally:
+            self.log.info("Scheduler loop stats: %s", self.loop_stats)
+
         # return updated status
         return executed_run_dates
 
+    def _process_ready_task_instances(
+        self,
+        ready_queue,
+        key_by_task_id,
+        all_ti,
+        ti_status,
+        executor,
+        pickle_id,
+        waiting_for_executor_result,
+        session,
+    ):
+        """
+        Evaluates only task instances that are ready to run (all upstreams are finished)
+        or have changed state (of its own or of the upstream), all DB changes are committed at once.
+        """
+        # TaskInstance objects are updated by state manager, let find what has changed
+        for ti in all_ti:
+            ready_queue.update_state(ti.task_id, ti.state)
+
+        evaluated = set()
+        for task_id in ready_queue.iter_candidates():
+            key = key_by_task_id[task_id]
+            ti = ti_status.to_run.get(key)
+            if ti is None:
+                # running or finished
+                continue
+            evaluated.add(key)
+            self._process_task_instance(
+                key,
+                ti,
+                ti_status,
+                executor,
+                pickle_id,
+                waiting_for_executor_result,
+                session=session,
+                commit=False,
+            )
+            # dependency check can change the state (upstream failed),
+            # downstream tasks are evaluated in the same pass
+            ready_queue.update_state(ti.task_id, ti.state)
+        session.commit()
+
+        # tasks that are not evaluated are waiting for their upstreams
+        ti_status.not_ready.update(
+            key for key in ti_status.to_run if key not in evaluated
+        )
+
+    def _get_dep_context(self):
+        runtime_deps = []
+        if self.airflow_config.disable_dag_concurrency_rules:
+            # RUN Deps validate dag and task concurrency
+            # It's less relevant when we run in stand along mode with SingleDagRunJob
+            # from airflow.ti_deps.deps.runnable_exec_date_dep import RunnableExecDateDep
+            from airflow.ti_deps.deps.valid_state_dep import ValidStateDep
+
+            # from airflow.ti_deps.deps.dag_ti_slots_available_dep import DagTISlotsAvailableDep
+            # from airflow.ti_deps.deps.task_concurrency_dep import TaskConcurrencyDep
+            # from airflow.ti_deps.deps.pool_slots_available_dep import PoolSlotsAvailableDep
+            runtime_deps = {
+                # RunnableExecDateDep(),
+                ValidStateDep(SCHEDUALED_OR_RUNNABLE),
+                # DagTISlotsAvailableDep(),
+                # TaskConcurrencyDep(),
+                # PoolSlotsAvailableDep(),
+            }
+        else:
+            runtime_deps = RUNNING_DEPS
+
+        # TODO : do we need that?
+        # ignore_depends_on_past = (
+        #     self.ignore_first_depends_on_past and
+        #     ti.execution_date == (start_date or ti.start_date))
+        return DepContext(
+            deps=runtime_deps,
+            ignore_depends_on_past=False,
+            ignore_task_deps=self.ignore_task_deps,
+            flag_upstream_failed=True,
+        )
+
+    def _process_task_instance(
+        self,
+        key,
+        ti,
+        ti_status,
+        executor,
+        pickle_id,
+        waiting_for_executor_result,
+        session,
+        commit=True,
+    ):
+        if not self._optimize:
+            ti.refresh_from_db()
+
+        task = self.dag.get_task(ti.task_id)
+        ti.task = task
+
+        self.log.debug("Task instance to run %s state %s", ti, ti.state)
+
+        # guard against externally modified tasks instances or
+        # in case max concurrency has been reached at task runtime
+        if ti.state == State.NONE:
+            self.log.warning(
+                "FIXME: task instance {} state was set to None "
+                "externally. This should not happen"
+            )
+            ti.set_state(State.SCHEDULED, session=session)
+
+        # The task was already marked successful or skipped by a
+        # different Job. Don't rerun it.
+        if ti.state == State.SUCCESS:
+            ti_status.succeeded.add(key)
+            self.log.debug("Task instance %s succeeded. Don't rerun.", ti)
+            ti_status.to_run.pop(key)
+            if key in ti_status.running:
+                ti_status.running.pop(key)
+            return
+        elif ti.state == State.SKIPPED:
+            ti_status.skipped.add(key)
+            self.log.debug("Task instance %s skipped. Don't rerun.", ti)
+            ti_status.to_run.pop(key)
+            if key in ti_status.running:
+                ti_status.running.pop(key)
+            return
+        elif ti.state == State.FAILED:
+            self.log.error("Task instance %s failed", ti)
+            ti_status.failed.add(key)
+            ti_status.to_run.pop(key)
+            if key in ti_status.running:
+                ti_status.running.pop(key)
+            return
+        elif ti.state == State.UPSTREAM_FAILED:
+            self.log.error("Task instance %s upstream failed", ti)
+            ti_status.failed.add(key)
+            ti_status.to_run.pop(key)
+            if key in ti_status.running:
+                ti_status.running.pop(key)
+            return
+
+        dagrun_dep_context = self._get_dep_context()
+
+        # Is the task runnable? -- then run it
+        # the dependency checker can change states of tis
+        if ti.are_dependencies_met(
+            dep_context=dagrun_dep_context, session=session, verbose=self.verbose
+        ):
+            ti.refresh_from_db(lock_for_update=True, session=session)
+            if ti.state == State.SCHEDULED or ti.state == State.UP_FOR_RETRY:
+                if executor.has_task(ti):
+                    self.log.debug(
+                        "Task Instance %s already in executor "
+                        "waiting for queue to clear",
+                        ti,
+                    )
+                else:
+                    self.log.debug("Sending %s to executor", ti)
+                    # if ti.state == State.UP_FOR_RETRY:
+                    #     ti._try_number += 1
+                    # Skip scheduled state, we are executing immediately
+                    ti.state = State.QUEUED
+                    session.merge(ti)
+
+                    cfg_path = None
+                    if executor.__class__ in (
+                        executors.LocalExecutor,
+                        executors.SequentialExecutor,
+                    ):
+                        cfg_path = tmp_configuration_copy()
+
+                    executor.queue_task_instance(
+                        ti,
+                        mark_success=self.mark_success,
+                        pickle_id=pickle_id,
+                        ignore_task_deps=self.ignore_task_deps,
+                        ignore_depends_on_past=dagrun_dep_context.ignore_depends_on_past,
+                        pool=self.pool,
+                        cfg_path=cfg_path,
+                    )
+
+                    ti_status.to_run.pop(key)
+                    ti_status.running[key] = ti
+                    waiting_for_executor_result[key] = ti
+            if commit:
+                session.commit()
+            return
+
+        if ti.state == State.UPSTREAM_FAILED:
+            self.log.error("Task instance %s upstream failed", ti)
+            ti_status.failed.add(key)
+            ti_status.to_run.pop(key)
+            if key in ti_status.running:
+                ti_status.running.pop(key)
+            return
+
+        # special case
+        if ti.state == State.UP_FOR_RETRY:
+            self.log.debug("Task instance %s retry period not " "expired yet", ti)
+            if key in ti_status.running:
+                ti_status.running.pop(key)
+            ti_status.to_run[key] = ti
+            return
+
+        # all remaining tasks
+        self.log.debug("Adding %s to not_ready", ti)
+        ti_status.not_ready.add(key)
+
     def _update_databand_task_run_states(self, run):
         # we are going to update UPSTREAM_FAILED only
         # this is the only state we want to propogate into Databand
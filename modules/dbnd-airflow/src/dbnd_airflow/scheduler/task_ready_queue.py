@@ -0,0 +1,116 @@
+import heapq
+
+from collections import defaultdict
+
+from airflow.utils.state import State
+
+
+_FINISHED_STATES = set(State.finished())
+_UNKNOWN_STATE = object()
+
+
+class TaskReadyQueue(object):
+    """
+    Tracks which tasks of the dag run have to be evaluated by the scheduler.
+
+    Keeps the amount of unfinished upstreams of every task (in-degree) and the last seen state.
+    Only "ready" tasks (all upstreams are finished) and tasks with changed state
+    (or changed upstream state) are returned as candidates, in topological order.
+    """
+
+    def __init__(self, dag, task_ids):
+        task_ids = set(task_ids)
+        self._order = {
+            task.task_id: idx for idx, task in enumerate(dag.topological_sort())
+        }
+        self._downstream = defaultdict(list)
+        self._pending_upstreams = {}
+        for task_id in task_ids:
+            upstream_ids = [
+                upstream_id
+                for upstream_id in dag.get_task(task_id).upstream_task_ids
+                if upstream_id in task_ids
+            ]
+            for upstream_id in upstream_ids:
+                self._downstream[upstream_id].append(task_id)
+            self._pending_upstreams[task_id] = len(upstream_ids)
+
+        self._states = {}
+        self.ready = {
+            task_id
+            for task_id, pending in self._pending_upstreams.items()
+            if not pending
+        }
+        # first pass evaluates everything
+        self._changed = set(task_ids)
+
+        # heap of the current pass, tasks changed during the pass are pushed into it
+        self._heap = None
+        self._in_heap = set()
+        self._current_order = -1
+
+    def pending_upstreams(self, task_id):
+        return self._pending_upstreams[task_id]
+
+    def update_state(self, task_id, state):
+        """
+        Returns True if the state of the task has changed since the last update
+        """
+        prev_state = self._states.get(task_id, _UNKNOWN_STATE)
+        if prev_state == state:
+            return False
+        self._states[task_id] = state
+
+        was_finished = prev_state in _FINISHED_STATES
+        is_finished = state in _FINISHED_STATES
+        if is_finished:
+            self.ready.discard(task_id)
+        elif not self._pending_upstreams[task_id]:
+            self.ready.add(task_id)
+
+        downstream_ids = self._downstream[task_id]
+        if was_finished != is_finished:
+            delta = -1 if is_finished else 1
+            for downstream_id in downstream_ids:
+                self._pending_upstreams[downstream_id] += delta
+                if self._pending_upstreams[downstream_id]:
+                    self.ready.discard(downstream_id)
+                elif self._states.get(downstream_id) not in _FINISHED_STATES:
+                    self.ready.add(downstream_id)
+
+        self._mark_changed(task_id)
+        # trigger rules of downstream tasks depend on the state of this task
+        for downstream_id in downstream_ids:
+            self._mark_changed(downstream_id)
+        return True
+
+    def _mark_changed(self, task_id):
+        if self._heap is not None and self._order[task_id] > self._current_order:
+            # it's not evaluated yet in the current pass
+            if task_id not in self._in_heap:
+                self._in_heap.add(task_id)
+                heapq.heappush(self._heap, (self._order[task_id], task_id))
+        else:
+            self._changed.add(task_id)
+
+    def iter_candidates(self):
+        """
+        Yields tasks to evaluate in topological order (upstream first).
+        Tasks changed by update_state during the iteration are yielded in the same pass
+        if they are not evaluated yet.
+        """
+        self._in_heap = self._changed | self.ready
+        self._heap = [(self._order[task_id], task_id) for task_id in self._in_heap]
+        heapq.heapify(self._heap)
+        self._changed = set()
+        try:
+            while self._heap:
+                self._current_order, task_id = heapq.heappop(self._heap)
+                self._in_heap.discard(task_id)
+                yield task_id
+        finally:
+            # unprocessed tasks (the pass was interrupted) will be evaluated next time
+            self._changed.update(self._in_heap)
+            self._heap = None
+            self._in_heap = set()
+            self._current_order = -1
@@ -17,3 +17,62 @@ class KubernetesMetricsLogger(object):
 
         timestamp = datetime.datetime.utcnow().isoformat()
         task.log_system_metric("pod_finished_execution", timestamp)
+
+
+def get_pod_event_time(pod_data):
+    """
+    The latest state transition time of the pod (conditions and container states),
+    it's the closest we can get to the time the event was created at
+    """
+    status = pod_data.status
+    times = [status.start_time, pod_data.metadata.deletion_timestamp]
+    for condition in status.conditions or []:
+        times.append(condition.last_transition_time)
+    for container_status in status.container_statuses or []:
+        state = container_status.state
+        if state.running:
+            times.append(state.running.started_at)
+        if state.terminated:
+            times.append(state.terminated.finished_at)
+    times = [t for t in times if t]
+    return max(times) if times else None
+
+
+class PodEventLagStats(object):
+    """
+    Lag between the pod state transition and the moment we've processed its event
+    """
+
+    def __init__(self):
+        self.events = 0
+        self.lag_events = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    def on_event(self, pod_data):
+        from dbnd._core.utils.timezone import utcnow
+
+        self.events += 1
+        try:
+            event_time = get_pod_event_time(pod_data)
+        except Exception:
+            event_time = None
+        if event_time is None:
+            return None
+
+        lag = max((utcnow() - event_time).total_seconds(), 0.0)
+        self.lag_events += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        return lag
+
+    @property
+    def avg_lag(self):
+        return self.total_lag / self.lag_events if self.lag_events else 0.0
+
+    def __str__(self):
+        return "events=%s avg_lag=%.2fs max_lag=%.2fs" % (
+            self.events,
+            self.avg_lag,
+            self.max_lag,
+        )
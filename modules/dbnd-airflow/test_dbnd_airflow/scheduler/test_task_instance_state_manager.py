@@ -0,0 +1,121 @@
+import time
+
+import mock
+
+from airflow import DAG
+from airflow.models import TaskInstance
+from airflow.operators.dummy_operator import DummyOperator
+from airflow.utils import timezone
+from airflow.utils.state import State
+
+from dbnd_airflow.dbnd_task_executor.task_instance_state_manager import (
+    AirflowTaskInstanceStateManager,
+)
+
+
+def _create_task_instances(session, dag_id):
+    dag = DAG(dag_id, start_date=timezone.datetime(2020, 1, 1))
+    execution_date = timezone.utcnow()
+    task_instances = []
+    for i in range(3):
+        ti = TaskInstance(
+            DummyOperator(task_id="t%s" % i, dag=dag), execution_date=execution_date
+        )
+        ti.state = State.SCHEDULED
+        session.merge(ti)
+        task_instances.append(ti)
+    session.commit()
+    return task_instances
+
+
+def _set_state(session, ti, state):
+    session.query(TaskInstance).filter(
+        TaskInstance.dag_id == ti.dag_id,
+        TaskInstance.task_id == ti.task_id,
+        TaskInstance.execution_date == ti.execution_date,
+    ).update({TaskInstance.state: state}, synchronize_session=False)
+    session.commit()
+
+
+class TestAirflowTaskInstanceStateManager(object):
+    def test_incremental_refresh(self, af_session):
+        tis = _create_task_instances(af_session, "test_ti_state_incremental")
+        t0, t1, t2 = tis
+        dag_id, execution_date = t0.dag_id, t0.execution_date
+        manager = AirflowTaskInstanceStateManager()
+
+        def refresh():
+            return manager.refresh_task_instances_state(
+                tis, dag_id, execution_date, session=af_session
+            )
+
+        assert refresh() == {"t0", "t1", "t2"}
+        assert refresh() == set()
+
+        _set_state(af_session, t0, State.RUNNING)
+        assert refresh() == {"t0"}
+        assert t0.state == State.RUNNING
+
+        _set_state(af_session, t0, State.SUCCESS)
+        _set_state(af_session, t1, State.FAILED)
+        assert refresh() == {"t0", "t1"}
+        assert (t0.state, t1.state, t2.state) == (
+            State.SUCCESS,
+            State.FAILED,
+            State.SCHEDULED,
+        )
+        assert manager.get_aggregated_state_status(
+            dag_id, execution_date, ["t0", "t1", "t2"]
+        ) == {State.SUCCESS: 1, State.FAILED: 1, State.SCHEDULED: 1}
+
+        # cleared externally
+        _set_state(af_session, t0, None)
+        assert refresh() == {"t0"}
+        assert t0.state is None
+
+    def test_adaptive_polling(self, af_session):
+        tis = _create_task_instances(af_session, "test_ti_state_adaptive")
+        dag_id, execution_date = tis[0].dag_id, tis[0].execution_date
+        manager = AirflowTaskInstanceStateManager(
+            min_poll_interval=60, max_poll_interval=600
+        )
+
+        def refresh(force=False):
+            return manager.refresh_task_instances_state(
+                tis, dag_id, execution_date, session=af_session, force=force
+            )
+
+        assert len(refresh()) == 3
+        _set_state(af_session, tis[0], State.RUNNING)
+        # polling is skipped, it's too early
+        assert refresh() == set()
+        assert tis[0].state == State.SCHEDULED
+        assert refresh(force=True) == {"t0"}
+        assert tis[0].state == State.RUNNING
+
+    def test_full_refresh(self, af_session):
+        tis = _create_task_instances(af_session, "test_ti_state_full_refresh")
+        t0, t1, t2 = tis
+        dag_id, execution_date = t0.dag_id, t0.execution_date
+        manager = AirflowTaskInstanceStateManager(full_refresh_interval=60)
+
+        def refresh():
+            return manager.refresh_task_instances_state(
+                tis, dag_id, execution_date, session=af_session
+            )
+
+        refresh()
+        _set_state(af_session, t0, State.SUCCESS)
+        assert refresh() == {"t0"}
+
+        # marked failed, finished task instances are not read by incremental refresh
+        _set_state(af_session, t0, State.FAILED)
+        assert refresh() == set()
+        with mock.patch("time.time", return_value=time.time() + 60):
+            assert refresh() == {"t0"}
+        assert t0.state == State.FAILED
+
+        # in memory changes of task instances are overridden
+        t1.state = State.UPSTREAM_FAILED
+        assert refresh() == set()
+        assert t1.state == State.SCHEDULED
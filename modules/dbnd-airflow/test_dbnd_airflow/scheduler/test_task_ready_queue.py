@@ -0,0 +1,98 @@
+import attr
+
+from airflow.utils.state import State
+
+from dbnd import config
+from dbnd.testing.helpers_pytest import assert_run_task
+from dbnd_airflow.scheduler.task_ready_queue import TaskReadyQueue
+from test_dbnd_airflow.databand_airflow.test_parallel_execution import (
+    ParallelTasksPipeline,
+    SleepyTask,
+)
+
+
+@attr.s
+class _Task(object):
+    task_id = attr.ib()
+    upstream_task_ids = attr.ib(factory=set)
+
+
+class _Dag(object):
+    def __init__(self, edges, task_ids):
+        self.tasks = {task_id: _Task(task_id) for task_id in task_ids}
+        for upstream, downstream in edges:
+            self.tasks[downstream].upstream_task_ids.add(upstream)
+
+    def get_task(self, task_id):
+        return self.tasks[task_id]
+
+    def topological_sort(self):
+        # task ids are given in topological order
+        return sorted(self.tasks.values(), key=lambda t: t.task_id)
+
+
+def _diamond_queue():
+    #   b
+    # a   d
+    #   c
+    dag = _Dag([("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")], "abcd")
+    queue = TaskReadyQueue(dag, "abcd")
+    for task_id in "abcd":
+        queue.update_state(task_id, State.SCHEDULED)
+    return queue
+
+
+class TestTaskReadyQueue(object):
+    def test_first_pass_evaluates_all(self):
+        queue = _diamond_queue()
+        assert list(queue.iter_candidates()) == ["a", "b", "c", "d"]
+        assert queue.ready == {"a"}
+
+        # nothing has changed, only ready tasks are evaluated
+        assert list(queue.iter_candidates()) == ["a"]
+
+    def test_upstream_finished(self):
+        queue = _diamond_queue()
+        list(queue.iter_candidates())
+
+        queue.update_state("a", State.SUCCESS)
+        assert queue.ready == {"b", "c"}
+        assert list(queue.iter_candidates()) == ["a", "b", "c"]
+
+        queue.update_state("b", State.SUCCESS)
+        assert queue.pending_upstreams("d") == 1
+        assert list(queue.iter_candidates()) == ["b", "c", "d"]
+
+        queue.update_state("c", State.FAILED)
+        assert queue.ready == {"d"}
+        assert list(queue.iter_candidates()) == ["c", "d"]
+
+    def test_changes_during_pass(self):
+        queue = _diamond_queue()
+        list(queue.iter_candidates())
+
+        evaluated = []
+        for task_id in queue.iter_candidates():
+            evaluated.append(task_id)
+            if task_id == "a":
+                queue.update_state("a", State.SUCCESS)
+        assert evaluated == ["a", "b", "c"]
+
+    def test_task_is_rerun(self):
+        queue = _diamond_queue()
+        queue.update_state("a", State.SUCCESS)
+        assert queue.pending_upstreams("b") == 0
+
+        # cleared externally
+        queue.update_state("a", State.SCHEDULED)
+        assert queue.pending_upstreams("b") == 1
+        assert queue.ready == {"a"}
+
+
+class TestReadyQueueScheduling(object):
+    def test_ready_queue_dag_run(self):
+        with config({"airflow": {"scheduler_ready_queue": True}}):
+            task = ParallelTasksPipeline(
+                num_of_tasks=3, override={SleepyTask.sleep_time: 0}
+            )
+            assert_run_task(task)
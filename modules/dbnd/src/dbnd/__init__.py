@@ -7,7 +7,7 @@ from dbnd._core.configuration.config_store import ConfigMergeSettings
 from dbnd._core.context.bootstrap import dbnd_bootstrap
 from dbnd._core.task_build import task_namespace
 from dbnd._core.task_build.task_registry import register_config_cls, register_task
-from dbnd._core.cli.main import main as dbnd_main, dbnd_cmd, dbnd_run_cmd
+from dbnd._core.cli.lazy_main import main as dbnd_main, dbnd_cmd, dbnd_run_cmd
 from dbnd._core.commands import log_metric, log_dataframe
 from dbnd._core.configuration.config_readers import override
 from dbnd._core.configuration.dbnd_config import config, config_deco
@@ -45,12 +45,14 @@ def run_task_submit(ctx, task_id):
 
 @execute.command(name="task_execute")
 @click.option("--task-id", required=True)
+# task is executed by local_parallel executor, so it can be submitted to remote engine
+@click.option("--allow-resubmit", is_flag=True, default=False)
 @click.pass_context
-def run_task_execute(ctx, task_id):
+def run_task_execute(ctx, task_id, allow_resubmit):
     """Execute a task"""
     with ctx.obj["run"].run_context() as dr:
         task_run = dr.get_task_run_by_id(task_id)
-        task_run.runner.execute(allow_resubmit=False)
+        task_run.runner.execute(allow_resubmit=allow_resubmit)
 
 
 @execute.command(name="driver")
@@ -0,0 +1,29 @@
+"""
+Entry points of dbnd cli that don't import the cli on `import dbnd`
+(all cli commands are imported with dbnd._core.cli.main, it's slow)
+"""
+
+
+def main():
+    from dbnd._core.cli.main import main as _main
+
+    return _main()
+
+
+def dbnd_cmd(command, args):
+    """
+    Invokes the passed dbnd command with CLI args emulation.
+
+    Parameters:
+        command (str): the command to be invoked
+        args (Union[list, str]): list with CLI args to be emulated (if str is passed, it will be splitted)
+    Returns:
+        str: result of command execution
+    """
+    from dbnd._core.cli.main import dbnd_cmd as _dbnd_cmd
+
+    return _dbnd_cmd(command, args)
+
+
+def dbnd_run_cmd(args):
+    return dbnd_cmd("run", args)
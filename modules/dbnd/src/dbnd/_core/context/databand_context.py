@@ -154,13 +154,14 @@ class DatabandContext(SingletonContext):
         output_config = self.settings.output  # type: OutputConfig
         if output_config.hdf_format == "table":
             import pandas as pd
-            from targets.marshalling import MARSHALERS
+            from targets.marshalling import register_marshaller
             from targets.marshalling.pandas import DataFrameToHdf5Table
 
-            MARSHALERS[pd.DataFrame][FileFormat.hdf5] = DataFrameToHdf5Table()
+            register_marshaller(pd.DataFrame, FileFormat.hdf5, DataFrameToHdf5Table())
 
     def _on_exit(self):
         pm.hook.dbnd_on_exit_context(ctx=self)
+        self.tracking_store.flush()
 
     def is_interactive(self):
         return self.name == "interactive"
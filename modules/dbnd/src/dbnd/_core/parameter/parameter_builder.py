@@ -1,8 +1,5 @@
 import logging
 
-import numpy
-import pandas as pd
-
 import attr
 
 from dbnd._core.configuration.config_path import ConfigPath
@@ -359,6 +356,8 @@ class ParameterFactory(object):
 
     @property
     def pandas_dataframe(self):
+        import pandas as pd
+
         return self[pd.DataFrame]
 
     @property
@@ -371,6 +370,8 @@ class ParameterFactory(object):
 
     @property
     def numpy_array(self):
+        import numpy
+
         return self[numpy.ndarray]
 
     @property
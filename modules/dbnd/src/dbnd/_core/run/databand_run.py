@@ -36,6 +36,7 @@ from dbnd._core.errors.base import (
 from dbnd._core.parameter.parameter_builder import output, parameter
 from dbnd._core.plugin.dbnd_plugins import is_airflow_enabled
 from dbnd._core.run.describe_run import DescribeRun
+from dbnd._core.run.run_snapshot import load_run_snapshot, save_run_snapshot
 from dbnd._core.run.run_tracker import RunTracker
 from dbnd._core.run.target_identity_source_map import TargetIdentitySourceMap
 from dbnd._core.run.task_runs_builder import TaskRunsBuilder
@@ -60,7 +61,6 @@ from dbnd._core.utils.basics.singleton_context import SingletonContext
 from dbnd._core.utils.date_utils import unique_execution_date
 from dbnd._core.utils.traversing import flatten
 from dbnd._core.utils.uid_utils import get_uuid
-from dbnd._vendor.cloudpickle import cloudpickle
 from dbnd._vendor.namesgenerator import get_random_name
 from targets import FileTarget, Target
 from targets.caching import TARGET_CACHE
@@ -420,6 +420,7 @@ class DatabandRun(SingletonContext):
                 self.driver_task.host_engine.cleanup_after_run()
             except Exception:
                 logger.exception("Failed to shutdown the current run, continuing")
+            self.tracker.flush()
 
         return self
 
@@ -432,14 +433,34 @@ class DatabandRun(SingletonContext):
 
         return task
 
-    def save_run(self, target_file=None):
+    def save_run(self, target_file=None, task_ids=None):
         """
         dumps current run and context to file
+        (only tasks required to execute task_ids, if they are set)
         """
         t = target_file or self.driver_dump
         logger.info("Saving current run into %s", t)
-        with t.open("wb") as fp:
-            cloudpickle.dump(obj=self, file=fp)
+        save_run_snapshot(
+            self,
+            target_file=t,
+            task_ids=task_ids,
+            compression_level=self.run_config.snapshot_compression_level,
+        )
+
+    def save_task_run_snapshot(self, task_run):
+        # type: (TaskRun) -> FileTarget
+        """
+        dumps the run for the execution of the task run at another process/engine,
+        returns the file to be used with `dbnd execute --dbnd-run`
+        """
+        if not self.run_config.task_snapshot:
+            return self.driver_dump
+
+        t = self.driver_task.remote_driver_root.file(
+            "%s.snapshot.pickle" % task_run.task_af_id
+        )
+        self.save_run(target_file=t, task_ids=[task_run.task.task_id])
+        return t
 
     @contextlib.contextmanager
     def run_context(self):
@@ -454,11 +475,10 @@ class DatabandRun(SingletonContext):
     def load_run(self, dump_file, disable_tracking_api):
         # type: (FileTarget, bool) -> DatabandRun
         logger.info("Loading dbnd run from %s", dump_file)
-        with dump_file.open("rb") as fp:
-            databand_run = cloudpickle.load(file=fp)
-            if disable_tracking_api:
-                databand_run.context.tracking_store.disable_tracking_api()
-                logger.info("Tracking has been disabled")
+        databand_run = load_run_snapshot(dump_file)
+        if disable_tracking_api:
+            databand_run.context.tracking_store.disable_tracking_api()
+            logger.info("Tracking has been disabled")
         try:
             if databand_run.context.settings.core.pickle_handler:
                 pickle_handler = load_python_callable(
@@ -516,6 +536,8 @@ class DatabandRun(SingletonContext):
                 targets_in_use.add(target)
 
         TARGET_CACHE.clear_for_targets(targets_to_clean - targets_in_use)
+        # values still required by downstream tasks are the last to be evicted
+        TARGET_CACHE.pin_targets(targets_in_use)
 
     def get_context_spawn_env(self):
         env = {}
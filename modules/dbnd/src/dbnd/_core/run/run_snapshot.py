@@ -0,0 +1,211 @@
+import gzip
+import json
+import logging
+import pickle
+import struct
+import time
+import typing
+
+from dbnd._vendor.cloudpickle import cloudpickle
+
+
+if typing.TYPE_CHECKING:
+    from typing import Iterable, Optional
+
+    from dbnd._core.run.databand_run import DatabandRun
+    from targets import FileTarget
+
+logger = logging.getLogger(__name__)
+
+# snapshot file: magic, header length, json header, (gzipped) cloudpickle of the run
+# files without the magic are plain cloudpickle dumps (older versions)
+SNAPSHOT_MAGIC = b"DBND-RUN-SNAPSHOT\n"
+SNAPSHOT_VERSION = 1
+_HEADER_LEN = struct.Struct(">I")
+
+
+class TaskNotInSnapshot(object):
+    """
+    Placeholder of the task (or task run) that was not saved into the run snapshot.
+    """
+
+    def __init__(self, task_id):
+        self.task_id = task_id
+
+    def __getattr__(self, item):
+        raise AttributeError(
+            "Task %s is not a part of the run snapshot (can't access '%s'), "
+            "use [run]task_snapshot=False to save the whole run" % (self.task_id, item)
+        )
+
+    def __eq__(self, other):
+        return isinstance(other, TaskNotInSnapshot) and self.task_id == other.task_id
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self.task_id)
+
+    def __repr__(self):
+        return "TaskNotInSnapshot(%s)" % self.task_id
+
+
+def _get_snapshot_task_ids(run, task_ids):
+    # type: (DatabandRun, Iterable[str]) -> set
+    """
+    The tasks required to execute the given tasks:
+    the tasks, their direct upstreams and children, the root and the driver tasks
+    """
+    snapshot_task_ids = {run.driver_task.task_id}
+    if run.root_task_run:
+        snapshot_task_ids.add(run.root_task_run.task.task_id)
+    for task_id in task_ids:
+        snapshot_task_ids.add(task_id)
+        task_run = run.get_task_run_by_id(task_id)
+        task = task_run.task if task_run else run._get_task_by_id(task_id)
+        snapshot_task_ids.update(task.ctrl.task_dag.upstream_task_ids)
+        snapshot_task_ids.update(task.task_meta.children)
+    return snapshot_task_ids
+
+
+class _SnapshotPickler(cloudpickle.CloudPickler):
+    """
+    Tasks and task runs that are not required are saved by their task_id only,
+    so nothing they reference is pickled. The live run is not changed while it's dumped,
+    other threads can keep using it.
+    """
+
+    def __init__(self, file, keep_task_ids):
+        cloudpickle.CloudPickler.__init__(self, file)
+        self.keep_task_ids = keep_task_ids
+
+    def persistent_id(self, obj):
+        from dbnd._core.task.task import Task
+        from dbnd._core.task_run.task_run import TaskRun
+
+        if isinstance(obj, TaskRun):
+            task_id = obj.task.task_id
+        elif isinstance(obj, Task):
+            task_id = obj.task_id
+        else:
+            return None
+        if task_id in self.keep_task_ids:
+            return None
+        return task_id
+
+
+def _remove_missing_tasks(run):
+    # type: (DatabandRun) -> None
+    def _is_missing(obj):
+        return isinstance(obj, TaskNotInSnapshot)
+
+    run.task_runs = [tr for tr in run.task_runs if not _is_missing(tr)]
+    run.task_runs_by_id = {
+        k: tr for k, tr in run.task_runs_by_id.items() if not _is_missing(tr)
+    }
+    run.task_runs_by_af_id = {
+        k: tr for k, tr in run.task_runs_by_af_id.items() if not _is_missing(tr)
+    }
+    task_cache = run.context.task_instance_cache
+    task_cache.task_instances = {
+        k: t for k, t in task_cache.task_instances.items() if not _is_missing(t)
+    }
+    task_cache.task_obj_instances = {
+        k: t for k, t in task_cache.task_obj_instances.items() if not _is_missing(t)
+    }
+
+
+def _dump(run, fp, keep_task_ids):
+    if keep_task_ids is None:
+        cloudpickle.dump(obj=run, file=fp)
+    else:
+        _SnapshotPickler(fp, keep_task_ids).dump(run)
+
+
+def _load(fp):
+    missing = {}
+
+    def _persistent_load(task_id):
+        if task_id not in missing:
+            missing[task_id] = TaskNotInSnapshot(task_id)
+        return missing[task_id]
+
+    unpickler = pickle.Unpickler(fp)
+    unpickler.persistent_load = _persistent_load
+    run = unpickler.load()
+    if missing:
+        _remove_missing_tasks(run)
+    return run
+
+
+def save_run_snapshot(run, target_file, task_ids=None, compression_level=6):
+    # type: (DatabandRun, FileTarget, Optional[Iterable[str]], int) -> None
+    """
+    Dumps the run and its context into target_file.
+    If task_ids are set, only the tasks required to execute them are dumped.
+    """
+    start = time.time()
+    keep_task_ids = None
+    if task_ids is not None:
+        keep_task_ids = _get_snapshot_task_ids(run, task_ids)
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "compression": "gzip" if compression_level else None,
+        "task_ids": sorted(task_ids) if task_ids is not None else None,
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    raw_size = None
+    with target_file.open("wb") as fp:
+        fp.write(SNAPSHOT_MAGIC)
+        fp.write(_HEADER_LEN.pack(len(header_bytes)))
+        fp.write(header_bytes)
+        if compression_level:
+            with gzip.GzipFile(
+                fileobj=fp, mode="wb", compresslevel=compression_level
+            ) as gz:
+                _dump(run, gz, keep_task_ids)
+                raw_size = gz.tell()
+        else:
+            _dump(run, fp, keep_task_ids)
+
+    logger.info(
+        "Run snapshot with %s tasks has been saved into %s in %.2fs%s",
+        len(keep_task_ids) if keep_task_ids is not None else len(run.task_runs),
+        target_file,
+        time.time() - start,
+        " (%s bytes before compression)" % raw_size if raw_size else "",
+    )
+
+
+def load_run_snapshot(dump_file):
+    # type: (FileTarget) -> DatabandRun
+    start = time.time()
+    with dump_file.open("rb") as fp:
+        magic = fp.read(len(SNAPSHOT_MAGIC))
+        if magic != SNAPSHOT_MAGIC:
+            # plain cloudpickle dump
+            run = cloudpickle.loads(magic + fp.read())
+        else:
+            (header_len,) = _HEADER_LEN.unpack(fp.read(_HEADER_LEN.size))
+            header = json.loads(fp.read(header_len).decode("utf-8"))
+            if header["version"] > SNAPSHOT_VERSION:
+                logger.warning(
+                    "Run snapshot %s has newer version %s, trying to load it anyway",
+                    dump_file,
+                    header["version"],
+                )
+            if header.get("compression") == "gzip":
+                with gzip.GzipFile(fileobj=fp, mode="rb") as gz:
+                    run = _load(gz)
+            else:
+                run = _load(fp)
+
+    logger.info(
+        "Run snapshot with %s tasks has been loaded from %s in %.2fs",
+        len(run.task_runs),
+        dump_file,
+        time.time() - start,
+    )
+    return run
@@ -49,6 +49,9 @@ class RunTracker(RunCtrl):
             return
         self.tracking_store.add_task_runs(run=self.run, task_runs=task_runs)
 
+    def flush(self):
+        self.tracking_store.flush()
+
     def set_task_run_states(self, task_runs):
         # type: (List[TaskRun]) -> None
         if not self.run.is_tracked:
@@ -3,6 +3,7 @@ import typing
 
 from typing import List
 
+from dbnd._core.run.tasks_complete_check import TasksCompleteChecker
 from dbnd._core.settings import EngineConfig, RunConfig
 from dbnd._core.task_build.task_context import TaskContextPhase
 from dbnd._core.task_build.task_registry import build_task_from_config
@@ -22,22 +23,27 @@ if typing.TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-def find_tasks_to_skip_complete(root_tasks, all_tasks):
-    completed_status = {}  # if True = should run, if False or None - should not
-
+def find_tasks_to_skip_complete(
+    root_tasks, all_tasks, parallelism=1, listing_threshold=0
+):
     logger.info("Looking for completed tasks..")
 
-    def check_if_completed(task):
-        task_id = task.task_id
-        if task_id in completed_status:
-            return
-        completed_status[task_id] = completed = task._complete()
-        if not completed:
-            for c in task.ctrl.task_dag.upstream:
-                check_if_completed(c)
-
-    for t in root_tasks:
-        check_if_completed(t)
+    checker = TasksCompleteChecker(
+        parallelism=parallelism, listing_threshold=listing_threshold
+    )
+    # if True = should run, if False or None - should not
+    completed_status = checker.find_completed(root_tasks)
+    stats = checker.stats
+    logger.info(
+        "Checked %s tasks (%s levels) in %.2fs: "
+        "%s exists calls, %s listing calls, %s custom complete calls",
+        stats.tasks,
+        stats.levels,
+        stats.duration,
+        stats.exists_calls,
+        stats.listing_calls,
+        stats.complete_calls,
+    )
 
     # only if completed_status is False task is not skipped
     # otherwise - it wasn't discovered or it's completed
@@ -102,7 +108,10 @@ class TaskRunsBuilder(object):
         task_skipped_as_not_required = set()
         if run_config.skip_completed:
             tasks_completed, task_skipped_as_not_required = find_tasks_to_skip_complete(
-                roots, enabled_tasks
+                roots,
+                enabled_tasks,
+                parallelism=run_config.skip_completed_parallelism,
+                listing_threshold=run_config.skip_completed_listing_threshold,
             )
 
         # # if any of the tasks is spark add policy
@@ -0,0 +1,202 @@
+import logging
+import os
+import posixpath
+import time
+import typing
+
+from collections import defaultdict
+from multiprocessing.pool import ThreadPool
+
+import attr
+
+from dbnd._core.utils.traversing import flatten
+from targets.dir_target import DirTarget
+from targets.file_target import FileTarget
+from targets.fs import FileSystems
+
+
+if typing.TYPE_CHECKING:
+    from typing import Dict, List
+    from dbnd._core.task.task import Task
+
+logger = logging.getLogger(__name__)
+
+
+def _has_default_complete(task):
+    from dbnd._core.task.task import Task
+
+    task_complete = getattr(type(task), "_complete", None)
+    return getattr(task_complete, "__func__", task_complete) is getattr(
+        Task._complete, "__func__", Task._complete
+    )
+
+
+def _is_wildcard(path):
+    return "*" in path or "?" in path or "[" in path or "{" in path
+
+
+def _get_exists_probe(target):
+    """
+    returns FileTarget that can be checked by fs.exists_many() together with
+    other files of the same folder, None otherwise
+    """
+    if not hasattr(target.fs, "exists_many"):
+        return None
+    if isinstance(target, DirTarget):
+        return target.flag_target
+    if type(target) is FileTarget and not _is_wildcard(target.path):
+        return target
+    return None
+
+
+def _parent_path(target):
+    if target.fs_name == FileSystems.local:
+        return os.path.dirname(target.path)
+    return posixpath.dirname(target.path)
+
+
+@attr.s
+class TasksCompleteCheckStats(object):
+    levels = attr.ib(default=0)  # type: int
+    tasks = attr.ib(default=0)  # type: int
+    targets = attr.ib(default=0)  # type: int
+    exists_calls = attr.ib(default=0)  # type: int
+    listing_calls = attr.ib(default=0)  # type: int
+    complete_calls = attr.ib(default=0)  # type: int
+    duration = attr.ib(default=0.0)  # type: float
+
+
+class TasksCompleteChecker(object):
+    """
+    Resolves "completeness" of the DAG level by level (starting from root tasks).
+    All outputs of the same level are checked concurrently, outputs sharing the same
+    parent folder are resolved by one fs.exists_many() call (if the fs supports it).
+    Only upstream of incomplete tasks is traversed.
+    """
+
+    def __init__(self, parallelism=1, listing_threshold=0):
+        self.parallelism = max(parallelism or 1, 1)
+        # minimal amount of outputs in the same folder to use listing, 0 - disabled
+        self.listing_threshold = listing_threshold
+        self.stats = TasksCompleteCheckStats()
+
+    def _map(self, pool, func, items):
+        if pool is None:
+            return [func(i) for i in items]
+        return pool.map(func, items)
+
+    def find_completed(self, root_tasks):
+        # type: (List[Task]) -> Dict[str, bool]
+        completed_status = {}
+        start_time = time.time()
+
+        pool = ThreadPool(self.parallelism) if self.parallelism > 1 else None
+        try:
+            level = list({t.task_id: t for t in root_tasks}.values())
+            while level:
+                level_start_time = time.time()
+                level_status = self._check_level(pool, level)
+                completed_status.update(level_status)
+
+                next_level = {}
+                for task in level:
+                    if level_status[task.task_id]:
+                        continue
+                    for upstream in task.ctrl.task_dag.upstream:
+                        if upstream.task_id not in completed_status:
+                            next_level[upstream.task_id] = upstream
+
+                self.stats.levels += 1
+                logger.debug(
+                    "Checked %s tasks at level %s in %.2fs",
+                    len(level),
+                    self.stats.levels,
+                    time.time() - level_start_time,
+                )
+                level = list(next_level.values())
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        self.stats.tasks = len(completed_status)
+        self.stats.duration = time.time() - start_time
+        return completed_status
+
+    def _check_level(self, pool, tasks):
+        level_status = {}
+
+        targets_by_task = {}
+        custom_complete_tasks = []
+        for task in tasks:
+            outputs = (
+                flatten(task.task_outputs) if _has_default_complete(task) else None
+            )
+            if outputs:
+                targets_by_task[task.task_id] = outputs
+            else:
+                # custom logic, or no outputs (_complete will warn about it)
+                custom_complete_tasks.append(task)
+
+        def _complete(task):
+            return task.task_id, task._complete()
+
+        self.stats.complete_calls += len(custom_complete_tasks)
+        level_status.update(self._map(pool, _complete, custom_complete_tasks))
+
+        targets_exist = self._targets_exist(
+            pool, flatten(list(targets_by_task.values()))
+        )
+        for task_id, outputs in targets_by_task.items():
+            level_status[task_id] = all(targets_exist[id(o)] for o in outputs)
+        return level_status
+
+    def _targets_exist(self, pool, targets):
+        """
+        :return: id(target) -> exists
+        """
+        targets = list({id(t): t for t in targets}.values())
+        self.stats.targets += len(targets)
+
+        groups = defaultdict(list)
+        if self.listing_threshold:
+            for t in targets:
+                probe = _get_exists_probe(t)
+                if probe is not None:
+                    groups[(probe.fs_name, _parent_path(probe))].append((t, probe))
+
+        listing_jobs = [
+            (parent, group)
+            for (_, parent), group in groups.items()
+            if len(group) >= self.listing_threshold
+        ]
+        listed = set(id(t) for _, group in listing_jobs for t, _ in group)
+        jobs = listing_jobs + [
+            (None, [(t, None)]) for t in targets if id(t) not in listed
+        ]
+
+        exists = {}
+        for result, exists_calls in self._map(pool, self._run_exists_job, jobs):
+            exists.update(result)
+            self.stats.exists_calls += exists_calls
+        self.stats.listing_calls += len(listing_jobs)
+        return exists
+
+    def _run_exists_job(self, job):
+        """
+        :return: list of (id(target), exists), number of exists() calls
+        """
+        parent, group = job
+        if parent is None:
+            t, _ = group[0]
+            return [(id(t), t.exists())], 1
+
+        fs = group[0][1].fs
+        try:
+            # files of a single folder, fs doesn't list anything outside of it
+            probes_exist = fs.exists_many([probe.path for _, probe in group])
+        except Exception as ex:
+            logger.info("Failed to list %s, checking one by one: %s", parent, ex)
+            return [(id(t), t.exists()) for t, _ in group], len(group)
+
+        return [(id(t), e) for (t, _), e in zip(group, probes_exist)], 0
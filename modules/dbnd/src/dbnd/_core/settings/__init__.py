@@ -7,6 +7,7 @@ from dbnd._core.settings.core import (
     DatabandSystemConfig,
     FeaturesConfig,
     DynamicTaskConfig,
+    ValueMetaConfig,
 )
 from dbnd._core.settings.describe import DescribeConfig
 from dbnd._core.settings.engine import EngineConfig
@@ -31,6 +32,7 @@ class DatabandSettings(object):
         self.core = CoreConfig()
         self.features = FeaturesConfig()
         self.dynamic_task = DynamicTaskConfig()
+        self.value_meta = ValueMetaConfig()
 
         self.run = RunConfig()
         self.git = GitConfig()
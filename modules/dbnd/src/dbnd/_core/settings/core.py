@@ -106,6 +106,49 @@ class CoreConfig(Config):
         default=True, description="Raise error when failed to track data"
     )[bool]
     tracker_api = parameter(default="db", description="Tracking Stores to be used")[str]
+    tracker_api_async = parameter(
+        default=False,
+        description="Send tracking API calls from a background thread, in batches",
+    )[bool]
+    tracker_api_async_queue_size = parameter(
+        default=10000,
+        description="Max amount of not sent tracking calls, "
+        "new calls are dropped if the queue is full",
+    )[int]
+    tracker_api_async_batch_size = parameter(
+        default=500, description="Max amount of tracking calls sent together"
+    )[int]
+    tracker_api_async_flush_interval = parameter(
+        default=1.0, description="How long (seconds) to wait for a batch to fill up"
+    )[float]
+    tracker_api_pool_size = parameter(
+        default=10, description="Max amount of keep-alive connections to the api server"
+    )[int]
+    tracker_api_retries = parameter(
+        default=2,
+        description="How many times to retry api call on connection error "
+        "or 502/503/504 response (with jittered exponential backoff)",
+    )[int]
+    tracker_api_gzip_threshold = parameter(
+        default=None,
+        description="Compress api request bodies bigger than this size (bytes) with gzip, "
+        "disabled if not set (requires server support)",
+    )[int]
+    tracker_file_metrics_buffer_size = parameter(
+        default=64 * 1024,
+        description="File tracker: amount of bytes of metrics to keep in memory "
+        "before writing them to the metrics files (0 to write every metric)",
+    )[int]
+    tracker_file_metrics_flush_interval = parameter(
+        default=1.0,
+        description="File tracker: write buffered metrics if they are older than this (seconds)",
+    )[float]
+    tracker_file_metrics_compact = parameter(
+        default=False,
+        description="File tracker: write all metrics of the task run into one file "
+        "instead of a file per metric",
+    )[bool]
+
     auto_create_local_db = parameter(
         default=True,
         description="Automatically create local SQLite db if it's not present",
@@ -168,7 +211,11 @@ class CoreConfig(Config):
         from dbnd._core.tracking.tracking_store_api import TrackingStoreApi
 
         if name == "file":
-            return FileTrackingStore()
+            return FileTrackingStore(
+                metrics_buffer_size=self.tracker_file_metrics_buffer_size,
+                metrics_flush_interval=self.tracker_file_metrics_flush_interval,
+                metrics_compact=self.tracker_file_metrics_compact,
+            )
         elif name == "console":
             return ConsoleStore()
         elif name == "debug":
@@ -204,8 +251,17 @@ class CoreConfig(Config):
                 )
                 return
 
+            from dbnd._core.utils.http.http_transport import HttpTransport
+
+            transport = HttpTransport(
+                pool_size=self.tracker_api_pool_size,
+                retries=self.tracker_api_retries,
+                gzip_threshold=self.tracker_api_gzip_threshold,
+            )
             # TODO Add auth actually
-            channel = TrackingApiClient(api_base_url=databand_url, auth=None)
+            channel = TrackingApiClient(
+                api_base_url=databand_url, auth=None, transport=transport
+            )
         elif tracker_api == "db":
             assert_web_enabled(
                 "It is required when trying to use local db connection (tracker_api=db)."
@@ -218,6 +274,18 @@ class CoreConfig(Config):
             channel = DirectDbChannel()
         else:
             raise friendly_error.config.wrong_tracking_api_name(tracker_api)
+
+        if self.tracker_api_async:
+            from dbnd._core.tracking.channels.tracking_async_channel import (
+                AsyncTrackingChannel,
+            )
+
+            channel = AsyncTrackingChannel(
+                channel,
+                max_queue_size=self.tracker_api_async_queue_size,
+                batch_size=self.tracker_api_async_batch_size,
+                flush_interval=self.tracker_api_async_flush_interval,
+            )
         return TrackingStoreApi(channel=channel)
 
     def get_tracking_store(self):
@@ -270,3 +338,77 @@ class FeaturesConfig(Config):
     in_memory_cache_target_value = parameter(
         default=True, description="Cache targets values in memory during execution"
     )[bool]
+    in_memory_cache_max_size = parameter(
+        default=None,
+        description="Memory budget (in bytes) of targets values cache, "
+        "least recently used values are evicted once it's exceeded. Unlimited if not set",
+    )[int]
+    partitions_prefetch = parameter(
+        default=0,
+        description="Amount of partitions of a directory target to read in background "
+        "while the current one is processed (both for loading values and for reading lines). "
+        "Partitions are read one by one if not set",
+    )[int]
+    remote_read_chunk_size = parameter(
+        default=8 * 1024 * 1024,
+        description="Size (in bytes) of a single range request "
+        "when a file is read from remote storage (S3, GCS, Azure Blob)",
+    )[int]
+    remote_read_ahead = parameter(
+        default=1,
+        description="Amount of chunks to fetch in background "
+        "while a remote file is read sequentially. Disabled if set to 0",
+    )[int]
+    remote_s3_read_concurrency = parameter(
+        default=4,
+        description="Amount of chunks to fetch in background (concurrently) "
+        "while a file is read from S3, used instead of remote_read_ahead. "
+        "Disabled if set to 0",
+    )[int]
+    remote_write_part_size = parameter(
+        default=8 * 1024 * 1024,
+        description="Size (in bytes) of a part of multipart upload "
+        "when a file is written to remote storage (S3), at least 5MB",
+    )[int]
+    remote_write_concurrency = parameter(
+        default=4,
+        description="Amount of parts of multipart upload to upload concurrently "
+        "while a file is written to remote storage (S3)",
+    )[int]
+    remote_listing_cache_ttl = parameter(
+        default=30,
+        description="Time (in seconds) to answer exists/isdir checks of S3 paths "
+        "from the listings done during the run (the listings are dropped on our own writes). "
+        "Only the objects found in a listing are taken from it, listdir is never cached. "
+        "Disabled if set to 0",
+    )[int]
+
+
+class ValueMetaConfig(Config):
+    """
+    (Advanced) Configuration of data values meta calculation (preview, schema, hash)
+    """
+
+    _conf__task_family = "value_meta"
+
+    hash_mode = (
+        parameter.choices(["auto", "full", "sampled", "none"])
+        .help(
+            "How to calculate data hash: full - hash all rows, "
+            "sampled - hash hash_sample_size rows spread over the data, "
+            "none - don't calculate, auto - sampled for data bigger than hash_sample_size. "
+            "Changes outside of the sample are not detected by sampled hash"
+        )
+        .value("full")
+    )
+    hash_sample_size = parameter(
+        description="Amount of rows used for sampled data hash"
+    ).value(100000)
+    preview_rows = parameter(
+        description="Amount of first rows used for data preview"
+    ).value(20)
+    time_budget = parameter(
+        default=None,
+        description="Max time (seconds) to spend on value meta calculation, "
+        "meta parts that were not calculated within it are dropped",
+    )[float]
@@ -90,6 +90,12 @@ class LoggingConfig(config.Config):
         "Default: 16MB.",
     )[int]
 
+    send_body_to_server_interval_s = parameter(
+        default=30.0,
+        description="How often (in seconds) to send the log of the running task to server, "
+        "the log is sent only if it has grown. Use 0 to send it only when the task is finished",
+    )[float]
+
     remote_logging_disabled = parameter.help(
         "for tasks using a cloud environment, don't copy the task log to cloud storage"
     ).value(False)
@@ -27,6 +27,15 @@ class OutputConfig(Config):
         default=VersionAlias.context_uid,
         description="deploy prefix to use for remote deployments",
     )[VersionStr]
+    deploy_by_content_hash = parameter(
+        default=True,
+        description="Use the hash of the file content as a deploy prefix, "
+        "so files that didn't change are not uploaded again (deploy_id is used for folders)",
+    )[bool]
+    deploy_parallelism = parameter(
+        default=4,
+        description="Amount of files to check and upload concurrently on remote deployments",
+    )[int]
 
     def get_config(self, value_type):
         # type: (Type) -> TargetConfig
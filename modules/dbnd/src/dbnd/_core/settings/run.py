@@ -26,9 +26,14 @@ class RunConfig(config.Config):
     task_executor_type = parameter(
         default=None,
         description="Alternate executor type: "
-        " local/airflow_inprocess/airflow_multiprocess_local/airflow_kubernetes,"
+        " local/local_parallel/airflow_inprocess/airflow_multiprocess_local/airflow_kubernetes,"
         "  see docs for more options",
     )[str]
+    parallel_pool_size = parameter(
+        default=None,
+        description="Max amount of tasks executed at the same time by 'local_parallel' executor"
+        " (amount of CPUs by default)",
+    )[int]
 
     submit_driver = parameter(
         description="override env.submit_driver for specific environment"
@@ -73,12 +78,29 @@ class RunConfig(config.Config):
     skip_completed = parameter(
         description="Mark jobs as succeeded without running them"
     ).value(True)
+    skip_completed_parallelism = parameter(
+        description="Amount of threads used to check if tasks outputs exist (skip_completed)"
+    ).value(8)
+    skip_completed_listing_threshold = parameter(
+        description="Check existence of outputs of the same folder by a single request "
+        "(S3 only) if there are at least that many outputs in the folder (0 to disable)"
+    ).value(10)
     fail_fast = parameter(
         description="Skip all remaining tasks if a task has failed"
     ).value(True)
     enable_prod = parameter(description="Enable production tasks").value(False)
     is_archived = parameter(description="Save this run in the archive").value(False)
 
+    snapshot_compression_level = parameter(
+        default=6,
+        description="gzip compression level of the run dump (0 to disable compression)",
+    )[int]
+    task_snapshot = parameter(
+        default=True,
+        description="Tasks executed at another process/engine load a dump of the run "
+        "with the task, its direct upstreams and children only (instead of the whole run)",
+    )[bool]
+
     heartbeat_interval_s = parameter(
         description="How often a run should send a heartbeat to the server. Set -1 to disable"
     )[int]
@@ -88,6 +110,15 @@ class RunConfig(config.Config):
     heartbeat_sender_log_to_file = parameter(
         description="create a separate log file for the heartbeat sender and don't log the run process stdout"
     )[bool]
+    heartbeat_sender_mode = (
+        parameter.choices(["thread", "process"])
+        .help(
+            "How to send heartbeats: thread - from a background thread of the run process "
+            "(reuses the tracking store of the run), "
+            "process - from a separate `dbnd send-heartbeat` process"
+        )
+        .value("thread")
+    )
 
     enable_concurent_sqlite = parameter(
         description="Enable concurrent execution with sqlite db (use only for debug!)"
@@ -1,5 +1,7 @@
 import inspect
 import logging
+import os
+import threading
 import typing
 
 from collections import OrderedDict
@@ -18,7 +20,7 @@ from dbnd._core.parameter.parameter_definition import (
     _ParameterKind,
 )
 from dbnd._core.task_build.task_const import _SAME_AS_PYTHON_MODULE
-from dbnd._core.utils.basics.nothing import is_defined
+from dbnd._core.utils.basics.nothing import NOTHING, is_defined
 from dbnd._core.utils.structures import combine_mappings
 from dbnd._core.utils.uid_utils import get_uuid
 
@@ -107,9 +109,40 @@ class TaskDefinition(object):
         # class T(BaseT):
         #     some_base_t_property = new_value
 
-        self.task_source_code = _get_task_source_code(self.task_class)
-        self.task_module_code = _get_task_module_source_code(self.task_class)
-        self.task_source_file = _get_source_file(self.task_class)
+        # source code is read on the first access only (tracking, task code signature)
+        self._task_source_code = NOTHING
+        self._task_module_code = NOTHING
+        self._task_source_file = NOTHING
+
+    @property
+    def task_source_code(self):
+        if not is_defined(self._task_source_code):
+            self._task_source_code = _get_task_source_code(self.task_class)
+        return self._task_source_code
+
+    @task_source_code.setter
+    def task_source_code(self, value):
+        self._task_source_code = value
+
+    @property
+    def task_module_code(self):
+        if not is_defined(self._task_module_code):
+            self._task_module_code = _get_task_module_source_code(self.task_class)
+        return self._task_module_code
+
+    @task_module_code.setter
+    def task_module_code(self, value):
+        self._task_module_code = value
+
+    @property
+    def task_source_file(self):
+        if not is_defined(self._task_source_file):
+            self._task_source_file = _get_source_file(self.task_class)
+        return self._task_source_file
+
+    @task_source_file.setter
+    def task_source_file(self, value):
+        self._task_source_file = value
 
     def _calculate_task_class_values(self, classdict):
         # reflect inherited attributes
@@ -233,9 +266,33 @@ def _get_task_source_code(task):
     return "Error while getting task source"
 
 
+# module file -> (mtime, source), all tasks of the module share the same source
+_MODULE_SOURCE_CACHE = {}
+_MODULE_SOURCE_CACHE_LOCK = threading.Lock()
+
+
+def _get_module_source_code(module):
+    source_file = inspect.getsourcefile(module)
+    try:
+        mtime = os.path.getmtime(source_file)
+    except (OSError, TypeError):
+        # not a real file (zip, notebook), linecache handles it
+        return inspect.getsource(module)
+
+    with _MODULE_SOURCE_CACHE_LOCK:
+        cached = _MODULE_SOURCE_CACHE.get(source_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    source = inspect.getsource(module)
+    with _MODULE_SOURCE_CACHE_LOCK:
+        _MODULE_SOURCE_CACHE[source_file] = (mtime, source)
+    return source
+
+
 def _get_task_module_source_code(task):
     try:
-        return inspect.getsource(inspect.getmodule(task))
+        return _get_module_source_code(inspect.getmodule(task))
     except TypeError:
         logger.debug("Failed to module source for %s", task)
     except Exception:
@@ -14,6 +14,7 @@ from dbnd._core.plugin.dbnd_airflow_operator_plugin import (
 from dbnd._core.task_build.task_definition import TaskDefinition
 from dbnd._core.task_build.task_factory import TaskFactory
 from dbnd._core.task_build.task_registry import get_task_registry
+from targets.utils.data_hash import SIGNATURE_HASH_CACHE
 
 
 logger = logging.getLogger(__name__)
@@ -94,7 +95,8 @@ class TaskMetaclass(abc.ABCMeta):
                 task_args=args,
                 task_kwargs=kwargs,
             )
-            return tmb.create_dbnd_task()
+            with SIGNATURE_HASH_CACHE.build_pass():
+                return tmb.create_dbnd_task()
 
     @classmethod
     def disable_instance_cache(cls):
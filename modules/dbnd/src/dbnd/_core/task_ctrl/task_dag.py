@@ -2,6 +2,8 @@ import logging
 import re
 import typing
 
+from collections import deque
+
 from dbnd._core.errors import DatabandError, friendly_error
 from dbnd._core.task.task import Task
 from dbnd._core.task_ctrl.task_ctrl import TaskSubCtrl
@@ -10,7 +12,7 @@ from dbnd._core.utils.traversing import flatten
 
 
 if typing.TYPE_CHECKING:
-    from typing import Collection, Set
+    from typing import Collection, Iterable, List, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -40,11 +42,15 @@ def _task_list(task_or_task_list):
 
 
 class _TaskDagNode(TaskSubCtrl):
+    # incremented on every new edge in any task graph, invalidates cached subdags
+    _dag_version = 0
+
     def __init__(self, task):
         super(_TaskDagNode, self).__init__(task)
 
         self._upstream_tasks = set()
         self._downstream_tasks = set()
+        self._subdag_cache = None  # type: Tuple[int, frozenset]  # version, task_ids
 
     def initialize_dag_node(self):
         # connect to all required tasks
@@ -125,26 +131,20 @@ class _TaskDagNode(TaskSubCtrl):
         return self._upstream_tasks if upstream else self._downstream_tasks
 
     def subdag_tasks(self, should_run_only=False):
-        return self._get_all_tasks(upstream=True, should_run_only=should_run_only)
-
-    def _get_all_tasks(self, upstream=False, should_run_only=False):
-        seen = set()
-        result = []
-        to_process = [self.task]
-        # should be iterative, we don't like recursive as we can have huge nesting
-        while to_process:
-            current = to_process.pop(0)
-            seen.add(current.task_id)
-            if should_run_only and not current.ctrl.should_run():
-                continue
-            t_dag = current.ctrl.task_dag
-            result.append(current)
-            for t_connected_task_id in t_dag._direction(upstream):
-                if t_connected_task_id in seen:
-                    continue
-                to_process.append(self.get_task_by_task_id(t_connected_task_id))
-
-        return set(result)
+        if should_run_only:
+            # should_run can change between calls, we don't cache it
+            return _get_all_tasks([self.task], should_run_only=True)
+
+        cache = self._subdag_cache
+        if cache is None or cache[0] != _TaskDagNode._dag_version:
+            task_ids = frozenset(t.task_id for t in _get_all_tasks([self.task]))
+            cache = (_TaskDagNode._dag_version, task_ids)
+            self._subdag_cache = cache
+        # task objects are resolved on every call:
+        # a task can be replaced by a new object with the same task_id
+        subdag = self._task_id_to_tasks(cache[1] - {self.task.task_id})
+        subdag.add(self.task)
+        return subdag
 
     def set_relatives(self, task_or_task_list, upstream=False):
         task_list = _task_list(task_or_task_list)
@@ -165,15 +165,13 @@ class _TaskDagNode(TaskSubCtrl):
                 logger.debug("Re adding new implementation %s to %s", task, self.task)
         else:
             connected.add(task.task_id)
+            _TaskDagNode._dag_version += 1
 
     def topological_sort(self):
         """
         Sorts tasks in topographical order, such that a task comes after any of its
         upstream dependencies.
 
-        Heavily inspired by:
-        http://blog.jupo.org/2012/04/06/topological-sorting-acyclic-directed-graphs/
-
         :return: list of tasks in topological order
         """
 
@@ -199,49 +197,102 @@ class _TaskDagNode(TaskSubCtrl):
         return selected
 
 
+def _get_all_tasks(tasks, upstream=True, should_run_only=False):
+    # type: (Iterable[Task], bool, bool) -> Set[Task]
+    seen = set()
+    to_process = deque()
+    for task in tasks:
+        if task.task_id not in seen:
+            seen.add(task.task_id)
+            to_process.append(task)
+
+    result = set()
+    # should be iterative, we don't like recursive as we can have huge nesting
+    while to_process:
+        current = to_process.popleft()
+        if should_run_only and not current.ctrl.should_run():
+            continue
+        result.add(current)
+        t_dag = current.ctrl.task_dag
+        for t_connected_task_id in t_dag._direction(upstream):
+            if t_connected_task_id in seen:
+                continue
+            seen.add(t_connected_task_id)
+            to_process.append(t_dag.get_task_by_task_id(t_connected_task_id))
+
+    return result
+
+
+class TaskDagIndex(object):
+    """
+    Snapshot of the graph between given tasks: tasks are kept in a list,
+    edges are kept as lists of indexes into it.
+    Edges to tasks outside of the given tasks are ignored.
+    """
+
+    def __init__(self, tasks):
+        # type: (Iterable[Task]) -> None
+        self.tasks = []  # type: List[Task]
+        self.task_index = {}
+        for task in tasks:
+            if task.task_id not in self.task_index:
+                self.task_index[task.task_id] = len(self.tasks)
+                self.tasks.append(task)
+
+        self.upstream = [[] for _ in self.tasks]  # type: List[List[int]]
+        self.downstream = [[] for _ in self.tasks]  # type: List[List[int]]
+        for i, task in enumerate(self.tasks):
+            for upstream_task_id in task.ctrl.task_dag.upstream_task_ids:
+                j = self.task_index.get(upstream_task_id)
+                if j is not None:
+                    self.upstream[i].append(j)
+                    self.downstream[j].append(i)
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def upstream_task_ids(self, task_id):
+        # type: (str) -> List[str]
+        return [self.tasks[j].task_id for j in self.upstream[self.task_index[task_id]]]
+
+    def downstream_task_ids(self, task_id):
+        # type: (str) -> List[str]
+        return [
+            self.tasks[j].task_id for j in self.downstream[self.task_index[task_id]]
+        ]
+
+    def topological_sort(self, root_task=None):
+        # type: (Task) -> Tuple[Task]
+        """
+        Kahn's algorithm, a task comes after all its upstream tasks.
+        """
+        in_degree = [len(upstream) for upstream in self.upstream]
+        ready = deque(i for i, degree in enumerate(in_degree) if degree == 0)
+        graph_sorted = []
+        while ready:
+            i = ready.popleft()
+            graph_sorted.append(self.tasks[i])
+            for j in self.downstream[i]:
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    ready.append(j)
+
+        if len(graph_sorted) != len(self.tasks):
+            # everything that is left is either in the cycle or downstream of it
+            graph_unsorted = {
+                self.tasks[i] for i, degree in enumerate(in_degree) if degree
+            }
+            raise friendly_error.graph.cyclic_graph_detected(root_task, graph_unsorted)
+        return tuple(graph_sorted)
+
+
 def topological_sort(tasks, root_task=None):
     # special case
     if len(tasks) == 0:
         return tuple()
 
-    graph_unsorted = set(tasks)
-
-    graph_sorted = []
-
-    # Run until the unsorted graph is empty.
-    while graph_unsorted:
-        # Go through each of the node/edges pairs in the unsorted
-        # graph. If a set of edges doesn't contain any nodes that
-        # haven't been resolved, that is, that are still in the
-        # unsorted graph, remove the pair from the unsorted graph,
-        # and append it to the sorted graph. Note here that by using
-        # using the items() method for iterating, a copy of the
-        # unsorted graph is used, allowing us to modify the unsorted
-        # graph as we move through it. We also keep a flag for
-        # checking that that graph is acyclic, which is true if any
-        # nodes are resolved during each pass through the graph. If
-        # not, we need to bail out as the graph therefore can't be
-        # sorted.
-        acyclic = False
-        for node in list(graph_unsorted):
-            for edge in node.ctrl.task_dag.upstream:
-                if edge in graph_unsorted:
-                    break
-            # no edges in upstream tasks
-            else:
-                # we found at least one node in graph
-                acyclic = True
-                graph_unsorted.remove(node)
-                graph_sorted.append(node)
-
-        if not acyclic:
-            raise friendly_error.graph.cyclic_graph_detected(root_task, graph_unsorted)
-
-    return tuple(graph_sorted)
+    return TaskDagIndex(tasks).topological_sort(root_task=root_task)
 
 
 def all_subdags(tasks):
-    result = set()
-    for sub_root in tasks:
-        result = result.union(set(sub_root.task_dag.subdag_tasks()))
-    return result
+    return _get_all_tasks(tasks, upstream=True)
@@ -4,15 +4,23 @@ import os
 import signal
 import subprocess
 import sys
+import threading
+import typing
 
 from time import sleep, time
 
+import attr
+
 from dbnd._core.constants import RunState
 from dbnd._core.tracking.tracking_store import TrackingStore
 from dbnd._core.utils.basics.format_exception import format_exception_as_str
 from dbnd._vendor.psutil.vendorized_psutil import pid_exists
 
 
+if typing.TYPE_CHECKING:
+    from typing import Optional
+
+
 logger = logging.getLogger(__name__)
 
 TERMINATE_WAIT_TIMEOUT = 5
@@ -22,75 +30,234 @@ TERMINATE_WAIT_TIMEOUT = 5
 def start_heartbeat_sender(task_run):
     run = task_run.run
     settings = run.context.settings
-    core = settings.core
     heartbeat_interval_s = settings.run.heartbeat_interval_s
 
-    if heartbeat_interval_s > 0:
-        sp = None
-        heartbeat_log_fp = None
+    if heartbeat_interval_s <= 0:
+        logger.info(
+            "run heartbeat sender disabled (set task.heartbeat_interval_s to value > 0)"
+        )
+        yield
+        return
+
+    if settings.run.heartbeat_sender_mode == "thread":
+        heartbeat = _heartbeat_thread(run, heartbeat_interval_s)
+    else:
+        heartbeat = _heartbeat_process(task_run, heartbeat_interval_s)
+    with heartbeat:
+        yield
+
+
+@contextlib.contextmanager
+def _heartbeat_thread(run, heartbeat_interval_s):
+    logger.info(
+        "Starting heartbeat sender thread with a send interval of %s seconds",
+        heartbeat_interval_s,
+    )
+    HEARTBEAT_THREAD.add_run(
+        run.run_uid, run.context.tracking_store, heartbeat_interval_s
+    )
+    try:
+        yield
+    finally:
+        stats = HEARTBEAT_THREAD.remove_run(run.run_uid)
+        if stats:
+            logger.info("[heartbeat sender] heartbeat stats: %s", stats)
+
+
+@contextlib.contextmanager
+def _heartbeat_process(task_run, heartbeat_interval_s):
+    run = task_run.run
+    settings = run.context.settings
+    core = settings.core
+
+    sp = None
+    heartbeat_log_fp = None
+    try:
         try:
-            try:
-                cmd = [
-                    sys.executable,
-                    "-m",
-                    "dbnd",
-                    "send-heartbeat",
-                    "--run-uid",
-                    str(run.run_uid),
-                    "--driver-pid",
-                    str(os.getpid()),
-                    "--heartbeat-interval",
-                    str(heartbeat_interval_s),
-                    "--tracker",
-                    ",".join(core.tracker),
-                    "--tracker-api",
-                    core.tracker_api,
-                ]
-                if core.databand_url:
-                    cmd += ["--databand-url", core.databand_url]
-
-                if settings.run.heartbeat_sender_log_to_file:
-                    heartbeat_log_file = task_run.log.local_heartbeat_log_file
-                    heartbeat_log_fp = heartbeat_log_file.open("w")
-                    stdout = heartbeat_log_fp
-                    logger.info(
-                        "Starting heartbeat with log at %s using cmd: %s",
-                        heartbeat_log_file,
-                        subprocess.list2cmdline(cmd),
-                    )
-                else:
-                    stdout = None
-                    logger.info(
-                        "Starting heartbeat using cmd: %s", subprocess.list2cmdline(cmd)
-                    )
+            cmd = [
+                sys.executable,
+                "-m",
+                "dbnd",
+                "send-heartbeat",
+                "--run-uid",
+                str(run.run_uid),
+                "--driver-pid",
+                str(os.getpid()),
+                "--heartbeat-interval",
+                str(heartbeat_interval_s),
+                "--tracker",
+                ",".join(core.tracker),
+                "--tracker-api",
+                core.tracker_api,
+            ]
+            if core.databand_url:
+                cmd += ["--databand-url", core.databand_url]
 
-                sp = subprocess.Popen(cmd, stdout=stdout, stderr=subprocess.STDOUT)
-            except Exception as ex:
+            if settings.run.heartbeat_sender_log_to_file:
+                heartbeat_log_file = task_run.log.local_heartbeat_log_file
+                heartbeat_log_fp = heartbeat_log_file.open("w")
+                stdout = heartbeat_log_fp
                 logger.info(
-                    "Failed to spawn heartbeat process, you can disable it via [task]heartbeat_interval_s=0  .\n %s",
-                    ex,
+                    "Starting heartbeat with log at %s using cmd: %s",
+                    heartbeat_log_file,
+                    subprocess.list2cmdline(cmd),
+                )
+            else:
+                stdout = None
+                logger.info(
+                    "Starting heartbeat using cmd: %s", subprocess.list2cmdline(cmd)
                 )
-                raise ex
-            yield
-        finally:
-            if sp:
-                sp.terminate()
-
-                try:
-                    sp.wait(timeout=TERMINATE_WAIT_TIMEOUT)
-                except Exception:
-                    logger.warning(
-                        "waited %s seconds for the heartbeat sender to exit but it still hasn't exited",
-                        TERMINATE_WAIT_TIMEOUT,
-                    )
 
-            if heartbeat_log_fp:
-                heartbeat_log_fp.close()
-    else:
-        logger.info(
-            "run heartbeat sender disabled (set task.heartbeat_interval_s to value > 0)"
-        )
+            sp = subprocess.Popen(cmd, stdout=stdout, stderr=subprocess.STDOUT)
+        except Exception as ex:
+            logger.info(
+                "Failed to spawn heartbeat process, you can disable it via [task]heartbeat_interval_s=0  .\n %s",
+                ex,
+            )
+            raise ex
         yield
+    finally:
+        if sp:
+            sp.terminate()
+
+            try:
+                sp.wait(timeout=TERMINATE_WAIT_TIMEOUT)
+            except Exception:
+                logger.warning(
+                    "waited %s seconds for the heartbeat sender to exit but it still hasn't exited",
+                    TERMINATE_WAIT_TIMEOUT,
+                )
+
+        if heartbeat_log_fp:
+            heartbeat_log_fp.close()
+
+
+@attr.s
+class HeartbeatStats(object):
+    sent = attr.ib(default=0)  # type: int
+    failed = attr.ib(default=0)  # type: int
+    total_latency_s = attr.ib(default=0.0)  # type: float
+    max_latency_s = attr.ib(default=0.0)  # type: float
+
+    def add_heartbeat(self, latency_s):
+        self.sent += 1
+        self.total_latency_s += latency_s
+        self.max_latency_s = max(self.max_latency_s, latency_s)
+
+    def __str__(self):
+        avg_latency_s = self.total_latency_s / self.sent if self.sent else 0
+        return "%s sent (%s failed), avg latency %.3fs, max latency %.3fs" % (
+            self.sent,
+            self.failed,
+            avg_latency_s,
+            self.max_latency_s,
+        )
+
+
+@attr.s
+class _RunHeartbeat(object):
+    run_uid = attr.ib()
+    tracking_store = attr.ib()  # type: TrackingStore
+    heartbeat_interval_s = attr.ib()  # type: float
+    next_send = attr.ib(default=0)  # type: float
+    stats = attr.ib(factory=HeartbeatStats)  # type: HeartbeatStats
+
+
+class HeartbeatThread(object):
+    """
+    Sends heartbeats of all active runs of the current process from one daemon thread,
+    every run uses its own tracking store (the connection of the run is reused).
+    There is no need to watch the driver process, the thread dies together with it.
+    """
+
+    def __init__(self):
+        self._runs = {}  # run_uid -> _RunHeartbeat
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def add_run(self, run_uid, tracking_store, heartbeat_interval_s):
+        if self._pid != os.getpid():
+            # forked, the thread (and maybe the lock) of the parent are gone
+            self.__init__()
+        with self._lock:
+            self._runs[run_uid] = _RunHeartbeat(
+                run_uid=run_uid,
+                tracking_store=tracking_store,
+                heartbeat_interval_s=heartbeat_interval_s,
+            )
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._send_heartbeats, name="dbnd-heartbeat-sender"
+                )
+                self._thread.daemon = True
+                self._thread.start()
+        self._wakeup.set()
+
+    def remove_run(self, run_uid):
+        # type: (...) -> Optional[HeartbeatStats]
+        with self._lock:
+            run_heartbeat = self._runs.pop(run_uid, None)
+        self._wakeup.set()
+        return run_heartbeat.stats if run_heartbeat else None
+
+    def _send_heartbeats(self):
+        while True:
+            self._wakeup.clear()
+            with self._lock:
+                if not self._runs:
+                    self._thread = None
+                    return
+                now = time()
+                due = [h for h in self._runs.values() if h.next_send <= now]
+
+            for run_heartbeat in due:
+                self._send_heartbeat(run_heartbeat)
+
+            with self._lock:
+                if not self._runs:
+                    self._thread = None
+                    return
+                next_send = min(h.next_send for h in self._runs.values())
+            self._wakeup.wait(max(0, next_send - time()))
+
+    def _send_heartbeat(self, run_heartbeat):
+        # type: (_RunHeartbeat) -> None
+        start = time()
+        run_heartbeat.next_send = start + run_heartbeat.heartbeat_interval_s
+        try:
+            run_state = run_heartbeat.tracking_store.heartbeat(
+                run_uid=run_heartbeat.run_uid
+            )
+        except Exception:
+            run_heartbeat.stats.failed += 1
+            logger.error(
+                "[heartbeat sender] failed to send heartbeat: %s",
+                format_exception_as_str(),
+            )
+            return
+
+        latency_s = time() - start
+        run_heartbeat.stats.add_heartbeat(latency_s)
+        logger.debug("[heartbeat sender] sent heartbeat in %.3fs", latency_s)
+        if latency_s > run_heartbeat.heartbeat_interval_s:
+            logger.warning(
+                "[heartbeat sender] heartbeat of run %s took %.1fs, "
+                "more than the heartbeat interval (%ss)",
+                run_heartbeat.run_uid,
+                latency_s,
+                run_heartbeat.heartbeat_interval_s,
+            )
+        if run_state == RunState.SHUTDOWN.value:
+            logger.info(
+                "[heartbeat sender] received run state SHUTDOWN: killing driver process"
+            )
+            os.kill(os.getpid(), signal.SIGTERM)
+
+
+# one heartbeat thread per process
+HEARTBEAT_THREAD = HeartbeatThread()
 
 
 def send_heartbeat_continuously(
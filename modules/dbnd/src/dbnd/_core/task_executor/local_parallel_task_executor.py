@@ -0,0 +1,229 @@
+import logging
+import multiprocessing
+import subprocess
+import threading
+
+from collections import defaultdict
+from multiprocessing.pool import ThreadPool
+
+from six.moves import queue
+
+from dbnd._core.constants import TaskRunState
+from dbnd._core.errors.base import DatabandRunError
+from dbnd._core.task_ctrl.task_dag import TaskDagIndex
+from dbnd._core.task_executor.local_task_executor import _collect_errors
+from dbnd._core.task_executor.task_executor import TaskExecutor
+
+
+logger = logging.getLogger(__name__)
+
+# how often we check if the run is killed while waiting for running tasks
+_WAIT_FOR_RESULT_TIMEOUT = 1
+
+
+class LocalParallelTaskExecutor(TaskExecutor):
+    """
+    Executes tasks concurrently on the local machine, without Airflow.
+    Every task whose upstream tasks have succeeded is executed in a separate
+    `dbnd execute task_execute` process, at most `run.parallel_pool_size` at a time.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(LocalParallelTaskExecutor, self).__init__(*args, **kwargs)
+        self._processes = {}
+        self._processes_lock = threading.Lock()
+
+    def do_run(self):
+        run_config = self.settings.run
+        fail_fast = run_config.fail_fast
+        pool_size = run_config.parallel_pool_size or multiprocessing.cpu_count()
+
+        dag = TaskDagIndex([tr.task for tr in self.task_runs])
+        topological_tasks = dag.topological_sort()
+        task_runs = {
+            task.task_id: self.run.get_task_run_by_id(task.task_id)
+            for task in topological_tasks
+        }
+
+        # amount of not finished upstream tasks and reversed edges
+        upstream_count = {}
+        downstream = defaultdict(list)
+        for task_id in task_runs:
+            upstream_ids = [
+                upstream_id
+                for upstream_id in dag.upstream_task_ids(task_id)
+                if not task_runs[upstream_id].is_reused
+            ]
+            upstream_count[task_id] = len(upstream_ids)
+            for upstream_id in upstream_ids:
+                downstream[upstream_id].append(task_id)
+
+        # keep topological order, so it behaves like the sequential executor
+        ready = [
+            t.task_id
+            for t in topological_tasks
+            if not task_runs[t.task_id].is_reused and upstream_count[t.task_id] == 0
+        ]
+        pending = set(
+            task_id for task_id, tr in task_runs.items() if not tr.is_reused
+        ) - set(ready)
+
+        logger.info(
+            "Executing %s tasks with %s parallel processes",
+            len(ready) + len(pending),
+            pool_size,
+        )
+        results = queue.Queue()
+        running = set()
+        task_failed = False
+        killed = False
+        task_runs_to_update_state = []
+
+        def _set_not_executed(task_ids, state):
+            for task_id in sorted(task_ids):
+                tr = task_runs[task_id]
+                logger.info("Setting %s to %s", task_id, state)
+                tr.set_task_run_state(state, track=False)
+                task_runs_to_update_state.append(tr)
+
+        def _on_result(result):
+            results.put(result)
+
+        pool = ThreadPool(pool_size)
+        try:
+            while ready or running:
+                if self.run.is_killed():
+                    if not killed:
+                        logger.info(
+                            "Databand Context is killed! Stopping all not started tasks"
+                        )
+                        killed = True
+                        self._kill_running_processes()
+                    _set_not_executed(ready + list(pending), TaskRunState.FAILED)
+                    ready, pending = [], set()
+                elif fail_fast and task_failed:
+                    _set_not_executed(
+                        ready + list(pending), TaskRunState.UPSTREAM_FAILED
+                    )
+                    ready, pending = [], set()
+
+                for task_id in ready:
+                    logger.debug("Executing task: %s", task_id)
+                    running.add(task_id)
+                    # the run is dumped by this thread only, while the run is not changed
+                    try:
+                        snapshot = self.run.save_task_run_snapshot(task_runs[task_id])
+                    except Exception:
+                        logger.exception(
+                            "Failed to save run snapshot for task '%s'", task_id
+                        )
+                        results.put((task_id, False))
+                        continue
+                    pool.apply_async(
+                        self._execute_task_run,
+                        args=(task_runs[task_id], snapshot),
+                        callback=_on_result,
+                    )
+                ready = []
+
+                # batch all the state changes done at this iteration
+                if task_runs_to_update_state:
+                    self.run.tracker.set_task_run_states(task_runs_to_update_state)
+                    task_runs_to_update_state = []
+
+                if not running:
+                    break
+
+                try:
+                    task_id, success = results.get(timeout=_WAIT_FOR_RESULT_TIMEOUT)
+                except queue.Empty:
+                    continue
+                running.discard(task_id)
+
+                # task state was already reported to the tracker by the task process,
+                # states are changed by this thread only (pool threads just wait for processes)
+                task_runs[task_id].set_task_run_state(
+                    TaskRunState.SUCCESS if success else TaskRunState.FAILED,
+                    track=False,
+                )
+
+                if success:
+                    for downstream_id in downstream[task_id]:
+                        upstream_count[downstream_id] -= 1
+                        if (
+                            upstream_count[downstream_id] == 0
+                            and downstream_id in pending
+                        ):
+                            pending.discard(downstream_id)
+                            ready.append(downstream_id)
+                else:
+                    task_failed = True
+                    upstream_failed = self._all_downstream(task_id, downstream)
+                    upstream_failed &= pending
+                    pending -= upstream_failed
+                    _set_not_executed(upstream_failed, TaskRunState.UPSTREAM_FAILED)
+        finally:
+            pool.close()
+            pool.join()
+
+        if task_runs_to_update_state:
+            self.run.tracker.set_task_run_states(task_runs_to_update_state)
+
+        if task_failed:
+            err = _collect_errors(self.run.task_runs)
+
+            if err:
+                raise DatabandRunError(err)
+
+    def _all_downstream(self, task_id, downstream):
+        result = set()
+        to_visit = list(downstream[task_id])
+        while to_visit:
+            current = to_visit.pop()
+            if current in result:
+                continue
+            result.add(current)
+            to_visit.extend(downstream[current])
+        return result
+
+    def _execute_task_run(self, task_run, snapshot):
+        # runs at the pool thread, should never raise:
+        # the main loop waits for the result of every started task
+        task_id = task_run.task.task_id
+        try:
+            cmd = self.host_engine.dbnd_executable + [
+                "execute",
+                "--dbnd-run",
+                str(snapshot),
+                "task_execute",
+                "--task-id",
+                task_id,
+                "--allow-resubmit",
+            ]
+            process = subprocess.Popen(cmd)
+            with self._processes_lock:
+                self._processes[task_id] = process
+            return_code = process.wait()
+        except Exception:
+            logger.exception("Failed to execute task '%s'", task_id)
+            return_code = -1
+        finally:
+            with self._processes_lock:
+                self._processes.pop(task_id, None)
+
+        if return_code != 0:
+            logger.error(
+                "Failed to execute task '%s': process exited with %s",
+                task_id,
+                return_code,
+            )
+        return task_id, return_code == 0
+
+    def _kill_running_processes(self):
+        with self._processes_lock:
+            for task_id, process in self._processes.items():
+                logger.info("Terminating task '%s'", task_id)
+                try:
+                    process.terminate()
+                except Exception:
+                    logger.exception("Failed to terminate task '%s'", task_id)
@@ -1,4 +1,7 @@
 import logging
+import os
+import shutil
+import threading
 import typing
 
 from contextlib import contextmanager
@@ -18,6 +21,9 @@ logger = logging.getLogger(__name__)
 
 CURRENT_TASK_HANDLER_LOG = None
 
+# the log is copied to the remote storage by chunks of this size
+LOG_COPY_CHUNK_SIZE = 1024 * 1024
+
 
 class TaskRunLogManager(TaskRunCtrl):
     def __init__(self, task_run):
@@ -38,6 +44,14 @@ class TaskRunLogManager(TaskRunCtrl):
         # file handler for task log
         # if set -> we are in the context of capturing
         self._log_task_run_into_file_active = False
+        self._live_log_preview = None
+
+    def __getstate__(self):
+        # the run can be pickled while the task log is captured (driver task),
+        # the preview thread belongs to the current process only
+        d = self.__dict__.copy()
+        d["_live_log_preview"] = None
+        return d
 
     @contextmanager
     def capture_stderr_stdout(self, logging_target=None):
@@ -87,6 +101,7 @@ class TaskRunLogManager(TaskRunCtrl):
             self._log_task_run_into_file_active = True
             CURRENT_TASK_HANDLER_LOG = handler
 
+            self._start_live_log_preview()
             with self.capture_stderr_stdout():
                 yield handler
         except Exception as task_ex:
@@ -99,13 +114,26 @@ class TaskRunLogManager(TaskRunCtrl):
             except Exception:
                 logger.error("Failed to close file handler for log %s", log_file)
             self._log_task_run_into_file_active = False
+            self._stop_live_log_preview()
             self._upload_task_log_preview()
 
+    def _start_live_log_preview(self):
+        interval = self.task.settings.log.send_body_to_server_interval_s
+        if interval <= 0 or self.task.settings.log.send_body_to_server_max_size == -1:
+            return
+        self._live_log_preview = _LiveLogPreview(self, interval)
+        self._live_log_preview.start()
+
+    def _stop_live_log_preview(self):
+        if self._live_log_preview:
+            self._live_log_preview.stop()
+            self._live_log_preview = None
+
     def _upload_task_log_preview(self):
+        # the log is streamed from the local file, it's never loaded into memory
         try:
-            log_body = self.read_log_body()
-            self.write_remote_log(log_body)
-            self.save_log_preview(log_body)
+            self.write_remote_log()
+            self.save_log_preview()
         except Exception as save_log_ex:
             logger.error("failed to save log preview for %s:%s", self, save_log_ex)
 
@@ -124,22 +152,30 @@ class TaskRunLogManager(TaskRunCtrl):
             )
             return None
 
-    def write_remote_log(self, log_body):
+    def write_remote_log(self, log_body=None):
         if self.task.settings.log.remote_logging_disabled or not self.remote_log_file:
             return
 
         try:
-            self.remote_log_file.write(log_body)
+            if log_body is not None:
+                self.remote_log_file.write(log_body)
+                return
+            with open(
+                self.local_log_file.path, "rb"
+            ) as local_log, self.remote_log_file.open("wb") as remote_log:
+                shutil.copyfileobj(local_log, remote_log, LOG_COPY_CHUNK_SIZE)
         except Exception as ex:
             # todo add remote log path to error
             logger.warning("Failed to write remote log for %s: %s", self.task, ex)
 
-    def save_log_preview(self, log_body):
+    def save_log_preview(self, log_body=None):
         max_size = self.task.settings.log.send_body_to_server_max_size
-        if max_size == 0:  # use 0 for unlimited
-            log_preview = log_body
-        elif max_size == -1:  # use -1 to disable
+        if max_size == -1:  # use -1 to disable
             log_preview = None
+        elif log_body is None:
+            log_preview = self.read_log_preview(max_size)
+        elif max_size == 0:  # use 0 for unlimited
+            log_preview = log_body
         else:
             log_preview = self._extract_log_preivew(
                 log_body=log_body, max_size=max_size
@@ -147,8 +183,85 @@ class TaskRunLogManager(TaskRunCtrl):
         if log_preview:
             self.task_run.tracker.save_task_run_log(log_preview)
 
+    def read_log_preview(self, max_size):
+        """
+        Reads the 'tail' of the local log (or the 'head' for negative max_size),
+        only the previewed part of the file is read.
+        Uses the same format as _extract_log_preivew (sizes are in bytes)
+        """
+        try:
+            log_size = os.path.getsize(self.local_log_file.path)
+            with open(self.local_log_file.path, "rb") as log_file:
+                if max_size == 0 or log_size <= abs(max_size):
+                    return _decode_log(log_file.read())
+
+                placeholder = "... (%s of %s)" % (abs(max_size), log_size)
+                preview_len = max(abs(max_size) - len(placeholder), 0)
+                if max_size > 0:
+                    log_file.seek(log_size - preview_len)
+                    return "(%s of %s) ...%s" % (
+                        preview_len,
+                        log_size,
+                        _decode_log(log_file.read(preview_len)),
+                    )
+                return "%s... (%s of %s)" % (
+                    _decode_log(log_file.read(preview_len)),
+                    preview_len,
+                    log_size,
+                )
+        except Exception as ex:
+            logger.error(
+                "Failed to read log (%s) for %s: %s",
+                self.local_log_file.path,
+                self.task,
+                ex,
+            )
+            return None
+
     def _extract_log_preivew(self, log_body=None, max_size=1000):
         is_tail_preview = (
             max_size > 0
         )  # pass negative to get log's 'head' instead of 'tail'
         return safe_short_string(log_body, abs(max_size), tail=is_tail_preview)
+
+
+def _decode_log(log_bytes):
+    # the preview can cut a multi-byte character
+    return log_bytes.decode("utf-8", "ignore")
+
+
+class _LiveLogPreview(object):
+    """
+    Sends the preview of the task log to the server while the task is running,
+    (only if the log has grown since the last time)
+    """
+
+    def __init__(self, log_manager, interval):
+        # type: (TaskRunLogManager, float) -> None
+        self.log_manager = log_manager
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._send_previews, name="dbnd-log-preview"
+        )
+        self._thread.daemon = True
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join(self.interval)
+
+    def _send_previews(self):
+        log_path = self.log_manager.local_log_file.path
+        last_size = 0
+        while not self._stopped.wait(self.interval):
+            try:
+                log_size = os.path.getsize(log_path)
+                if log_size == last_size:
+                    continue
+                last_size = log_size
+                self.log_manager.save_log_preview()
+            except Exception as ex:
+                logger.debug("Failed to send live log preview of %s: %s", log_path, ex)
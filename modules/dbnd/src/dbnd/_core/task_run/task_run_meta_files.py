@@ -10,6 +10,8 @@ class TaskRunMetaFiles(object):
     _METRICS = "metrics"
     _META_DATA_FILE_NAME = "meta.yaml"
     _DEFAULT_METRIC_SOURCE = "user"
+    # "-" can't be a part of a metric file name, so it doesn't collide with metrics
+    _COMPACT_METRICS_FILE_NAME = "metrics-compact.tsv"
 
     def _output(self, *path):
         return target(self.root, *path)
@@ -23,6 +25,14 @@ class TaskRunMetaFiles(object):
         source = source or TaskRunMetaFiles._DEFAULT_METRIC_SOURCE
         return self._output(TaskRunMetaFiles._METRICS, source, metric_key)
 
+    def get_compact_metrics_target(self, source=None):
+        source = source or TaskRunMetaFiles._DEFAULT_METRIC_SOURCE
+        return self._output(
+            TaskRunMetaFiles._METRICS,
+            source,
+            TaskRunMetaFiles._COMPACT_METRICS_FILE_NAME,
+        )
+
     def get_artifact_target(self, name):
         return self._output(TaskRunMetaFiles._ARTIFACTS, name)
 
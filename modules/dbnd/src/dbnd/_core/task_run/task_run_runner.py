@@ -46,7 +46,7 @@ class TaskRunRunner(TaskRunCtrl):
             args = task_engine.dbnd_executable + [
                 "execute",
                 "--dbnd-run",
-                str(run.driver_dump),
+                str(run.save_task_run_snapshot(task_run)),
                 "task_execute",
                 "--task-id",
                 task_run.task.task_id,
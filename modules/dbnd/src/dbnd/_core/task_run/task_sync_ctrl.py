@@ -1,25 +1,125 @@
+import json
 import logging
+import os
+import random
+import threading
+import time
 
+from multiprocessing.pool import ThreadPool
 from os import path
 
 from dbnd._core.task_run.task_run_ctrl import TaskRunCtrl
 from dbnd._core.utils.task_utils import targets_to_str
 from targets import Target, target
 from targets.fs import FileSystems
+from targets.utils.data_hash import new_hasher
 
 
 logger = logging.getLogger(__name__)
 
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class FileHashManifest(object):
+    """
+    Content hashes of local files, keyed by path, mtime and size,
+    so files that didn't change are not read again.
+    If manifest_file is set, hashes are persisted between runs.
+    """
+
+    def __init__(self, manifest_file=None):
+        self.manifest_file = manifest_file
+        self._hashes = None  # path -> [mtime, size, hash]
+        self._changed = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        hashes = {}
+        if self.manifest_file and os.path.exists(self.manifest_file):
+            try:
+                with open(self.manifest_file) as fp:
+                    hashes = json.load(fp)
+            except Exception as ex:
+                logger.warning(
+                    "Failed to read file hashes from %s: %s", self.manifest_file, ex
+                )
+        return hashes
+
+    def get_hash(self, file_path):
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        with self._lock:
+            if self._hashes is None:
+                self._hashes = self._load()
+            cached = self._hashes.get(file_path)
+        if cached and cached[0] == stat.st_mtime and cached[1] == stat.st_size:
+            return cached[2]
+
+        hasher = new_hasher()
+        with open(file_path, "rb") as fp:
+            for chunk in iter(lambda: fp.read(_HASH_CHUNK_SIZE), b""):
+                hasher.update(chunk)
+        file_hash = hasher.hexdigest()
+        with self._lock:
+            self._hashes[file_path] = [stat.st_mtime, stat.st_size, file_hash]
+            self._changed = True
+        return file_hash
+
+    def save(self):
+        with self._lock:
+            if not self._changed or not self.manifest_file:
+                return
+            hashes = dict(self._hashes)
+            self._changed = False
+        try:
+            # other processes could update the manifest in the meantime
+            current = self._load()
+            current.update(hashes)
+            with target(self.manifest_file).open("w") as fp:
+                json.dump(current, fp)
+        except Exception as ex:
+            logger.warning(
+                "Failed to save file hashes into %s: %s", self.manifest_file, ex
+            )
+
+
+_FILE_HASH_MANIFESTS = {}
+_FILE_HASH_MANIFESTS_LOCK = threading.Lock()
+
+
+def get_file_hash_manifest(manifest_file):
+    with _FILE_HASH_MANIFESTS_LOCK:
+        manifest = _FILE_HASH_MANIFESTS.get(manifest_file)
+        if manifest is None:
+            manifest = _FILE_HASH_MANIFESTS[manifest_file] = FileHashManifest(
+                manifest_file
+            )
+        return manifest
+
 
 class TaskSyncCtrl(TaskRunCtrl):
     def __init__(self, task_run):
         super(TaskSyncCtrl, self).__init__(task_run=task_run)
 
         self.remote_sync_root = self.task_env.dbnd_data_sync_root.folder("deploy")
+        # local path -> remote file, for files synced by this ctrl
+        self._synced = {}
+
+    @property
+    def file_hashes(self):
+        # type: () -> FileHashManifest
+        manifest_file = None
+        local_root = self.run.get_current_dbnd_local_root()
+        if local_root and local_root.fs.name == FileSystems.local:
+            manifest_file = os.path.join(local_root.path, "deploy", "file_hashes.json")
+        return get_file_hash_manifest(manifest_file)
 
     def sync_files(self, local_files):
         if not local_files:
             return []
+        self._sync_many(
+            [f if isinstance(f, Target) else target(f) for f in local_files if f]
+        )
         return [self.sync(f) for f in local_files]
 
     def sync(self, local_file):
@@ -51,31 +151,123 @@ class TaskSyncCtrl(TaskRunCtrl):
             return local_file
 
         file_name = path.basename(local_file.path)
-        deploy_id = self.task.settings.output.deploy_id
-        remote_file_name = "{}/{}".format(deploy_id, file_name)
+        output_config = self.task.settings.output
+        if output_config.deploy_by_content_hash and os.path.isfile(local_file.path):
+            # the same file is uploaded only once, whatever deploy it belongs to
+            prefix = self.file_hashes.get_hash(local_file.path)
+        else:
+            prefix = output_config.deploy_id
+        remote_file_name = "{}/{}".format(prefix, file_name)
         return self.remote_sync_root.partition(remote_file_name)
 
     def _sync(self, local_file):
         if self.is_remote(local_file):
             return local_file
 
-        remote_file = self.remote_file(local_file)
-        if self._exists(remote_file):
-            logger.info("File exists: '%s' -> '%s'.", local_file, remote_file)
-            return remote_file
+        remote_file = self._synced.get(local_file.path)
+        if remote_file is None:
+            self._sync_many([local_file])
+            remote_file = self._synced[local_file.path]
+        return remote_file
+
+    def _sync_many(self, local_files):
+        """
+        Uploads all the files that don't exist at remote yet.
+        Hashing, existence checks and uploads are done concurrently
+        (up to [output]deploy_parallelism files at once).
+        """
+        to_sync = {}
+        for local_file in local_files:
+            if self.is_remote(local_file) or local_file.path in self._synced:
+                continue
+            to_sync[local_file.path] = local_file
+        if not to_sync:
+            return
+
+        start_time = time.time()
+        local_files = list(to_sync.values())
+        parallelism = min(
+            self.task.settings.output.deploy_parallelism, len(local_files)
+        )
+        pool = ThreadPool(parallelism) if parallelism > 1 else None
+        try:
+            remote_files = self._map(pool, self.remote_file, local_files)
+            exists = self._exists_many(pool, remote_files)
+
+            to_upload = []
+            for local_file, remote_file, remote_exists in zip(
+                local_files, remote_files, exists
+            ):
+                if remote_exists:
+                    logger.info("File exists: '%s' -> '%s'.", local_file, remote_file)
+                else:
+                    to_upload.append((local_file, remote_file))
+            self._map(pool, self._upload_file, to_upload)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            self.file_hashes.save()
+
+        self._synced.update(
+            (local_file.path, remote_file)
+            for local_file, remote_file in zip(local_files, remote_files)
+        )
+        logger.info(
+            "Synced %s files (%s uploaded) in %.2fs",
+            len(local_files),
+            len(to_upload),
+            time.time() - start_time,
+        )
 
+    def _map(self, pool, func, items):
+        if pool is None:
+            return [func(i) for i in items]
+        return pool.map(func, items)
+
+    def _upload_file(self, local_and_remote_file):
+        local_file, remote_file = local_and_remote_file
         logger.info("Uploading: '%s' -> '%s'", local_file, remote_file)
         self._upload(local_file, remote_file)
 
-        return remote_file
-
     def _upload(self, local_file, remote_file):
-        remote_file.copy_from_local(local_file.path)
+        if remote_file.fs.atomic_upload:
+            # object stores (s3, gcs, azure) never expose a partial upload
+            remote_file.copy_from_local(local_file.path)
+            return
+
+        # upload can be interrupted on file systems without atomic writes (hdfs, local),
+        # while existing remote file is never uploaded again,
+        # so the remote file is created by rename of the complete upload
+        tmp_file = target(
+            "%s.tmp-%09d" % (remote_file.path, random.randint(0, 999999999)),
+            fs=remote_file.fs,
+        )
+        try:
+            tmp_file.copy_from_local(local_file.path)
+            remote_file.fs.move(tmp_file.path, remote_file.path)
+        except Exception:
+            try:
+                if tmp_file.exists():
+                    tmp_file.remove()
+            except Exception as ex:
+                logger.warning("Failed to remove %s: %s", tmp_file, ex)
+            raise
 
     def _exists(self, remote_file):
         return remote_file.exists()
 
+    def _exists_many(self, pool, remote_files):
+        # file systems with batch exists (s3) answer it by a single listing
+        fs = remote_files[0].fs
+        if hasattr(fs, "exists_many") and all(f.fs is fs for f in remote_files):
+            return fs.exists_many([f.path for f in remote_files])
+        return self._map(pool, self._exists, remote_files)
+
 
 class DisabledTaskSyncCtrl(TaskSyncCtrl):
     def _sync(self, local_file):
         return local_file
+
+    def _sync_many(self, local_files):
+        pass
@@ -0,0 +1,263 @@
+import atexit
+import logging
+import os
+import threading
+import time
+import typing
+
+import attr
+
+from six.moves import queue
+
+from dbnd._core.errors.base import DatabandApiError
+from dbnd.api.tracking_api import TrackingAPI
+
+
+if typing.TYPE_CHECKING:
+    from typing import Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# calls without meaningful response, we can send them in background
+ASYNC_CALLS = {
+    TrackingAPI.set_run_state.__name__,
+    TrackingAPI.set_task_reused.__name__,
+    TrackingAPI.update_task_run_attempts.__name__,
+    TrackingAPI.set_unfinished_tasks_state.__name__,
+    TrackingAPI.save_task_run_log.__name__,
+    TrackingAPI.save_external_links.__name__,
+    TrackingAPI.log_target.__name__,
+    TrackingAPI.log_targets.__name__,
+    TrackingAPI.log_metric.__name__,
+    TrackingAPI.log_metrics.__name__,
+    TrackingAPI.log_artifact.__name__,
+}
+
+# adjacent calls of the same type can be merged into one request: name -> list field
+_MERGEABLE_CALLS = {
+    TrackingAPI.update_task_run_attempts.__name__: "task_run_attempt_updates",
+    TrackingAPI.log_targets.__name__: "targets_info",
+    TrackingAPI.log_metrics.__name__: "metrics_info",
+}
+
+
+@attr.s
+class _TrackingCall(object):
+    name = attr.ib()  # type: str
+    data = attr.ib(default=None)
+    schema = attr.ib(default=None)
+    kwargs = attr.ib(default=None)
+
+    def get_data(self):
+        if self.data is None and self.schema is not None:
+            self.data = self.schema.dump(self.kwargs).data
+        return self.data
+
+
+class _FlushMarker(object):
+    def __init__(self):
+        self.done = threading.Event()
+
+
+@attr.s
+class AsyncTrackingStats(object):
+    calls = attr.ib(default=0)  # type: int
+    requests = attr.ib(default=0)  # type: int
+    failed_requests = attr.ib(default=0)  # type: int
+    failed_calls = attr.ib(default=0)  # type: int
+    dropped_calls = attr.ib(default=0)  # type: int
+
+
+class AsyncTrackingChannel(TrackingAPI):
+    """
+    Sends tracking calls of the wrapped channel from a background thread.
+    Adjacent calls are merged into one request (update_task_run_attempts, log_targets,
+    log_metric -> log_metrics if the channel supports_log_metrics), a batch is sent
+    once it reaches batch_size calls or flush_interval seconds.
+    Calls that return a value are sent synchronously, after all queued calls.
+    """
+
+    def __init__(
+        self,
+        channel,
+        max_queue_size=10000,
+        batch_size=500,
+        flush_interval=1.0,
+        put_timeout=10,
+    ):
+        super(AsyncTrackingChannel, self).__init__()
+        self.channel = channel  # type: TrackingAPI
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+
+        self.stats = AsyncTrackingStats()
+        self._log_metrics_supported = getattr(channel, "supports_log_metrics", False)
+
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def __getstate__(self):
+        # queue and thread can not be pickled, we will start new ones on first call
+        d = self.__dict__.copy()
+        d.update(_queue=None, _thread=None, _pid=None, _start_lock=None)
+        return d
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._start_lock = threading.Lock()
+
+    def _handle(self, name, data):
+        return self._submit(_TrackingCall(name=name, data=data))
+
+    def submit_with_schema(self, name, schema, kwargs):
+        """
+        Same as calling `name` with schema.dump(kwargs),
+        but the marshalling is done at the background thread as well
+        """
+        return self._submit(_TrackingCall(name=name, schema=schema, kwargs=kwargs))
+
+    def _submit(self, call):
+        # type: (_TrackingCall) -> Any
+        if call.name not in ASYNC_CALLS:
+            self.flush()
+            return getattr(self.channel, call.name)(call.get_data())
+
+        self._ensure_worker()
+        try:
+            self._queue.put(call, timeout=self.put_timeout)
+        except queue.Full:
+            self.stats.dropped_calls += 1
+            if self.stats.dropped_calls == 1 or self.stats.dropped_calls % 1000 == 0:
+                logger.warning(
+                    "Tracking queue is full, %s tracking calls were dropped so far",
+                    self.stats.dropped_calls,
+                )
+
+    def flush(self, timeout=None):
+        """
+        Waits till all the calls submitted so far are sent
+        """
+        if self._thread is None or self._pid != os.getpid():
+            return
+        marker = _FlushMarker()
+        self._queue.put(marker)
+        marker.done.wait(timeout)
+
+        if self.stats.dropped_calls or self.stats.failed_calls:
+            logger.warning(
+                "Tracking: %s calls were dropped, %s calls have failed (out of %s)",
+                self.stats.dropped_calls,
+                self.stats.failed_calls,
+                self.stats.calls,
+            )
+
+    def is_ready(self):
+        return self.channel.is_ready()
+
+    def _ensure_worker(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            # we are in new process (fork) or it's a first call
+            self._queue = queue.Queue(maxsize=self.max_queue_size)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._worker, name="dbnd-tracking-async"
+            )
+            self._thread.daemon = True
+            self._thread.start()
+            atexit.register(self.flush, timeout=self.put_timeout)
+
+    def _worker(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.time() + self.flush_interval
+            while len(batch) < self.batch_size and not isinstance(
+                batch[-1], _FlushMarker
+            ):
+                try:
+                    batch.append(
+                        self._queue.get(timeout=max(deadline - time.time(), 0))
+                    )
+                except queue.Empty:
+                    break
+            try:
+                self._send_batch(batch)
+            except Exception:
+                logger.exception("Failed to send tracking batch")
+                # never leave flush() waiting forever
+                for item in batch:
+                    if isinstance(item, _FlushMarker):
+                        item.done.set()
+
+    def _send_batch(self, batch):
+        calls = []
+        for item in batch:
+            if isinstance(item, _FlushMarker):
+                self._send_calls(calls)
+                calls = []
+                item.done.set()
+            else:
+                calls.append(item)
+        self._send_calls(calls)
+
+    def _send_calls(self, calls):
+        if not calls:
+            return
+        self.stats.calls += len(calls)
+
+        # merge adjacent calls into one request
+        requests = []  # type: List[Tuple[str, Any, int]]
+        for call in calls:
+            try:
+                name, data = call.name, call.get_data()
+            except Exception:
+                logger.exception("Failed to serialize tracking call %s", call.name)
+                self.stats.failed_calls += 1
+                continue
+
+            if name == TrackingAPI.log_metric.__name__ and self._log_metrics_supported:
+                name, data = TrackingAPI.log_metrics.__name__, {"metrics_info": [data]}
+
+            list_field = _MERGEABLE_CALLS.get(name)
+            if list_field and requests and requests[-1][0] == name:
+                prev_name, prev_data, prev_count = requests[-1]
+                prev_data[list_field] = prev_data[list_field] + data[list_field]
+                requests[-1] = (prev_name, prev_data, prev_count + 1)
+            else:
+                requests.append((name, dict(data), 1))
+
+        for name, data, count in requests:
+            self._send_request(name, data, count)
+
+    def _send_request(self, name, data, count):
+        self.stats.requests += 1
+        try:
+            getattr(self.channel, name)(data)
+        except Exception as ex:
+            if name == TrackingAPI.log_metrics.__name__:
+                self._send_metrics_one_by_one(data, ex)
+                return
+            self._on_failed_request(name, count, ex)
+
+    def _send_metrics_one_by_one(self, data, ex):
+        # we never lose metrics because of the batching: fallback to log_metric calls
+        if isinstance(ex, DatabandApiError) and ex.resp_code in (404, 405):
+            # old server, we don't batch anymore
+            logger.info("log_metrics is not supported by the server")
+            self._log_metrics_supported = False
+        else:
+            logger.warning("Failed to send log_metrics, sending one by one: %s", ex)
+        for metric_data in data["metrics_info"]:
+            self._send_request(TrackingAPI.log_metric.__name__, metric_data, 1)
+
+    def _on_failed_request(self, name, count, ex):
+        self.stats.failed_requests += 1
+        self.stats.failed_calls += count
+        logger.warning("Failed to send tracking %s (%s calls): %s", name, count, ex)
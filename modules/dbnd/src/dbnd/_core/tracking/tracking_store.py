@@ -96,6 +96,12 @@ class TrackingStore(object):
         # type: (List[LogTargetArgs]) -> None
         pass
 
+    def flush(self):
+        """
+        Waits till all tracking information is sent
+        """
+        pass
+
     def is_ready(self):
         # type: () -> bool
         pass
@@ -188,6 +194,9 @@ class CompositeTrackingStore(TrackingStore):
     def close(self):
         pass
 
+    def flush(self):
+        return self._invoke(CompositeTrackingStore.flush.__name__, {})
+
     def add_task_runs(self, **kwargs):
         return self._invoke(CompositeTrackingStore.add_task_runs.__name__, kwargs)
 
@@ -2,6 +2,7 @@ import datetime
 import logging
 import typing
 
+from dbnd._core.tracking.channels.tracking_async_channel import AsyncTrackingChannel
 from dbnd._core.tracking.tracking_store import TrackingStore
 from dbnd._core.utils.timezone import utcnow
 from dbnd.api.tracking_api import (
@@ -222,11 +223,20 @@ class TrackingStoreApi(TrackingStore):
         Marshall and call channel function
         :return:
         """
+        if isinstance(self.channel, AsyncTrackingChannel):
+            # marshalling is done at the background thread as well
+            return self.channel.submit_with_schema(
+                _channel_call.__name__, _req_schema, req_kwargs
+            )
         marsh = _req_schema.dump(req_kwargs)
         resp = _channel_call(marsh.data)
         # if resp_schema and resp:
         #     resp = resp_schema.load(resp)
         return resp
 
+    def flush(self):
+        if isinstance(self.channel, AsyncTrackingChannel):
+            self.channel.flush()
+
     def is_ready(self):
         return self.channel.is_ready()
@@ -1,11 +1,14 @@
 # ORIGIN: https://github.com/databricks/mlflow : mlflow/store/tracking_store_file.py
 from __future__ import print_function
 
+import json
 import logging
 import os
 import re
+import threading
 import time
 
+from collections import OrderedDict, defaultdict
 from datetime import datetime
 
 import yaml
@@ -23,6 +26,7 @@ from dbnd._core.tracking.tracking_info_convertor import (
 from dbnd._core.tracking.tracking_store import TrackingStore
 from dbnd.api.serialization.task import TaskDefinitionInfoSchema, TaskRunInfoSchema
 from targets import target
+from targets.fs import FileSystems
 
 
 logger = logging.getLogger(__name__)
@@ -44,10 +48,52 @@ def _parse_metric(value):
 _METRICS_RE = re.compile(r"(\d+)\s+(.+)")
 
 
+def _format_compact_metric(key, timestamp, value):
+    # one line per value, so the value is json encoded (it can be multiline)
+    return "%s\t%s\t%s\n" % (key, timestamp, json.dumps(str(value)))
+
+
 class FileTrackingStore(TrackingStore):
+    """
+    Writes metrics and artifacts into the meta folder of the task run attempt.
+
+    Metric values are appended to the metric file (a file per metric, or one
+    "compact" file per metrics source if metrics_compact is set).
+    Values are buffered in memory till there are metrics_buffer_size bytes,
+    metrics_flush_interval seconds have passed, or the task run is finished.
+    """
+
+    def __init__(
+        self, metrics_buffer_size=0, metrics_flush_interval=0, metrics_compact=False
+    ):
+        self.metrics_buffer_size = metrics_buffer_size
+        self.metrics_flush_interval = metrics_flush_interval
+        self.metrics_compact = metrics_compact
+
+        self._metrics_buffer = OrderedDict()  # path -> (target, [lines])
+        self._metrics_buffer_bytes = 0
+        self._metrics_buffer_since = None
+        self._metrics_lock = threading.RLock()
+
+    def __getstate__(self):
+        d = self.__dict__.copy()
+        d.update(
+            _metrics_buffer=OrderedDict(),
+            _metrics_buffer_bytes=0,
+            _metrics_buffer_since=None,
+            _metrics_lock=None,
+        )
+        return d
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._metrics_lock = threading.RLock()
+
     def set_task_run_state(self, task_run, state, error=None, timestamp=None):
         if state == TaskRunState.RUNNING:
             self.dump_task_run_info(task_run)
+        elif state in TaskRunState.finished_states():
+            self.flush_metrics()
 
     def dump_task_run_info(self, task_run):
 
@@ -69,15 +115,57 @@ class FileTrackingStore(TrackingStore):
             yaml.dump(info, yaml_file, default_flow_style=False)
 
     def log_metric(self, task_run, metric, source=None):
-        metric_path = task_run.meta_files.get_metric_target(metric.key, source=source)
         timestamp = int(time.mktime(metric.timestamp.timetuple()))
-        value = "%s %s\n" % (timestamp, metric.value)
-
-        data = value
+        if self.metrics_compact:
+            metric_path = task_run.meta_files.get_compact_metrics_target(source=source)
+            line = _format_compact_metric(metric.key, timestamp, metric.value)
+        else:
+            metric_path = task_run.meta_files.get_metric_target(
+                metric.key, source=source
+            )
+            line = "%s %s\n" % (timestamp, metric.value)
+
+        with self._metrics_lock:
+            buffered = self._metrics_buffer.get(metric_path.path)
+            if buffered is None:
+                buffered = self._metrics_buffer[metric_path.path] = (metric_path, [])
+            buffered[1].append(line)
+            self._metrics_buffer_bytes += len(line)
+            if self._metrics_buffer_since is None:
+                self._metrics_buffer_since = time.time()
+
+            if (
+                self._metrics_buffer_bytes >= self.metrics_buffer_size
+                or time.time() - self._metrics_buffer_since
+                >= self.metrics_flush_interval
+            ):
+                self.flush_metrics()
+
+    def flush_metrics(self):
+        with self._metrics_lock:
+            buffered_metrics = list(self._metrics_buffer.values())
+            self._metrics_buffer.clear()
+            self._metrics_buffer_bytes = 0
+            self._metrics_buffer_since = None
+
+            for metric_path, lines in buffered_metrics:
+                self._append_metric_lines(metric_path, "".join(lines))
+
+    def _append_metric_lines(self, metric_path, data):
+        if metric_path.fs_name == FileSystems.local:
+            metric_path.mkdir_parent()
+            with open(metric_path.path, "a") as metric_file:
+                metric_file.write(data)
+            return
+
+        # there is no append on remote file systems
         if metric_path.exists():
-            data = metric_path.read() + value
+            data = metric_path.read() + data
         metric_path.write(data)
 
+    def flush(self):
+        self.flush_metrics()
+
     def log_artifact(self, task_run, name, artifact, artifact_target):
         artifact_target.mkdir_parent()
 
@@ -119,20 +207,60 @@ class TaskRunMetricsFileStoreReader(object):
         all_files = [os.path.basename(str(p)) for p in metrics_root.list_partitions()]
         return all_files
 
+    def _read_compact_metrics(self, source=None):
+        """
+        Reads all metrics of the compact metrics file in one pass
+        :return: key -> [Metric] (in the logging order)
+        """
+        compact_target = self.meta.get_compact_metrics_target(source=source)
+        metrics = defaultdict(list)
+        if not compact_target.exists():
+            return metrics
+
+        for line in compact_target.read().splitlines():
+            if not line:
+                continue
+            key, timestamp, value = line.split("\t", 2)
+            metrics[key].append(
+                Metric(
+                    key=key,
+                    value=_parse_metric(json.loads(value)),
+                    timestamp=datetime.fromtimestamp(int(timestamp)),
+                )
+            )
+        return metrics
+
     def get_metric_history(self, key, source=None):
+        compact_metrics = self._read_compact_metrics(source=source)
+        if key in compact_metrics:
+            return compact_metrics[key]
+
         metric_target = self.meta.get_metric_target(key, source=source)
         if not metric_target.exists():
             raise DatabandError("Metric '%s' not found" % key)
-        metric_data = metric_target.readlines()
         rsl = []
-        for pair in metric_data:
-            ts, val = pair.strip().split(" ")
-            rsl.append(Metric(key, float(val), datetime.fromtimestamp(int(ts))))
+        for line in metric_target.readlines():
+            metric_parsed = _METRICS_RE.match(line)
+            if not metric_parsed:
+                # continuation of multiline value
+                continue
+            timestamp, val = metric_parsed.groups()
+            rsl.append(
+                Metric(
+                    key=key,
+                    value=_parse_metric(val),
+                    timestamp=datetime.fromtimestamp(int(timestamp)),
+                )
+            )
         return rsl
 
     def get_all_metrics_values(self, source=None):
-        metrics = []
+        compact_metrics = self._read_compact_metrics(source=source)
+        metrics = [history[0] for history in compact_metrics.values()]
+
         for key in self._get_all_metrics_names(source=source):
+            if key == TaskRunMetaFiles._COMPACT_METRICS_FILE_NAME:
+                continue
             try:
                 metrics.append(self.get_metric(key, source=source))
             except Exception as ex:
@@ -150,6 +278,10 @@ class TaskRunMetricsFileStoreReader(object):
             return RunInfoSchema().load(**yaml.load(yaml_file))
 
     def get_metric(self, key, source=None):
+        compact_metrics = self._read_compact_metrics(source=source)
+        if key in compact_metrics:
+            return compact_metrics[key][0]
+
         metric_target = self.meta.get_metric_target(key, source=source)
         if not metric_target.exists():
             raise DatabandRuntimeError("Metric '%s' not found" % key)
@@ -0,0 +1,98 @@
+import importlib
+import logging
+import sys
+import threading
+
+import six
+
+
+logger = logging.getLogger(__name__)
+
+
+class _HookedLoader(object):
+    def __init__(self, loader, on_load):
+        self._loader = loader
+        self._on_load = on_load
+
+    def create_module(self, spec):
+        if hasattr(self._loader, "create_module"):
+            return self._loader.create_module(spec)
+        return None
+
+    def exec_module(self, module):
+        # the original loader is restored, nobody should see our wrapper after the import
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        self._loader.exec_module(module)
+        self._on_load(module)
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+
+class _PostImportFinder(object):
+    """
+    Finder that doesn't find anything by itself,
+    it wraps the loader of the hooked modules so hooks are called right after the import
+    """
+
+    def __init__(self):
+        self.hooks = {}  # module name -> [hook]
+        self._lock = threading.RLock()
+        self._in_progress = set()
+
+    def find_spec(self, fullname, path=None, target=None):
+        if fullname not in self.hooks or fullname in self._in_progress:
+            return None
+
+        import importlib.util
+
+        self._in_progress.add(fullname)
+        try:
+            spec = importlib.util.find_spec(fullname)
+        finally:
+            self._in_progress.discard(fullname)
+        if (
+            spec is None
+            or spec.loader is None
+            or not hasattr(spec.loader, "exec_module")
+        ):
+            return spec
+        spec.loader = _HookedLoader(spec.loader, self.run_hooks)
+        return spec
+
+    def run_hooks(self, module):
+        with self._lock:
+            hooks = self.hooks.pop(module.__name__, [])
+        for hook in hooks:
+            try:
+                hook(module)
+            except Exception:
+                logger.exception("Failed to run import hook of %s", module.__name__)
+
+
+_FINDER = _PostImportFinder()
+
+
+def when_imported(module_name, hook):
+    """
+    Calls hook(module) once the module is imported (right away if it's already imported),
+    so we can patch heavy libraries without importing them.
+    """
+    module = sys.modules.get(module_name)
+    if module is None and six.PY2:
+        # python 2, no lazy hooks, we import it right away
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            return
+
+    if module is not None:
+        hook(module)
+        return
+
+    with _FINDER._lock:
+        _FINDER.hooks.setdefault(module_name, []).append(hook)
+        if _FINDER not in sys.meta_path:
+            sys.meta_path.insert(0, _FINDER)
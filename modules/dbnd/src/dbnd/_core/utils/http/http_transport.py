@@ -0,0 +1,238 @@
+import gzip
+import io
+import json
+import logging
+import random
+import re
+import threading
+import time
+
+from six.moves.urllib_parse import urlparse
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+
+logger = logging.getLogger(__name__)
+
+# upper bounds (ms) of latency histogram buckets, the last one is unbounded
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+RETRY_STATUS_CODES = (502, 503, 504)
+# on 504 the server could already apply the request (we just didn't get the response),
+# so it's retried only for the methods that are safe to repeat
+IDEMPOTENT_ONLY_RETRY_STATUS_CODES = (504,)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+_ID_PATH_SEGMENT = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12})$"
+)
+
+
+def jittered_backoff(retry_count, base, max_seconds):
+    """
+    "Full jitter" exponential backoff: random value in [0, base * 2 ** retry_count]
+    """
+    return random.uniform(0, min(max_seconds, base * (2**retry_count)))
+
+
+def jitter(seconds):
+    # "equal jitter": keeps at least half of the requested delay
+    return seconds / 2.0 + random.uniform(0, seconds / 2.0)
+
+
+def is_connect_error(ex):
+    """
+    True if we failed to connect to the server, so the request was never sent
+    """
+    if isinstance(ex, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(ex.args[0], "reason", None) if ex.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def gzip_body(body):
+    buf = io.BytesIO()
+    with gzip.GzipFile(fileobj=buf, mode="wb") as f:
+        f.write(body)
+    return buf.getvalue()
+
+
+def endpoint_key(method, url):
+    # /api/v1/jobs/123 -> GET /api/v1/jobs/{id}
+    path = urlparse(url).path or "/"
+    segments = [
+        "{id}" if _ID_PATH_SEGMENT.match(segment) else segment
+        for segment in path.split("/")
+    ]
+    return "%s %s" % (method.upper(), "/".join(segments))
+
+
+class LatencyHistogram(object):
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, duration_ms, error=False):
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if duration_ms <= bound:
+                break
+        else:
+            i = len(LATENCY_BUCKETS_MS)
+        self.buckets[i] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        if error:
+            self.errors += 1
+
+    def as_dict(self):
+        buckets = {}
+        for bound, count in zip(LATENCY_BUCKETS_MS + ("inf",), self.buckets):
+            buckets["le_%s" % bound] = count
+        return dict(
+            count=self.count,
+            errors=self.errors,
+            avg_ms=self.total_ms / self.count if self.count else 0,
+            max_ms=self.max_ms,
+            buckets=buckets,
+        )
+
+
+class HttpTransport(object):
+    """
+    Keep-alive requests session with a connection pool.
+    Retries with jittered backoff requests that were never sent (connect errors)
+    and 502/503 responses. Other connection errors and 504 responses are retried
+    for idempotent methods only, a POST could be already applied by the server.
+    gzips request bodies bigger than gzip_threshold (disabled if not set),
+    and keeps latency histogram per endpoint.
+    """
+
+    def __init__(
+        self,
+        pool_size=10,
+        retries=0,
+        backoff_base=0.5,
+        backoff_max=10,
+        gzip_threshold=None,
+        timeout=None,
+    ):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.gzip_threshold = gzip_threshold
+        self.timeout = timeout
+
+        self.latency = {}  # endpoint -> LatencyHistogram
+        self._latency_lock = threading.Lock()
+        self.session = self._create_session()
+
+    def __getstate__(self):
+        # requests session can be pickled (without connections), lock can't
+        d = self.__dict__.copy()
+        del d["_latency_lock"]
+        return d
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._latency_lock = threading.Lock()
+
+    def _create_session(self):
+        session = requests.Session()
+        # we retry by ourselves, so we can apply jitter and track every attempt
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=0
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def reset(self):
+        self.session.close()
+        self.session = self._create_session()
+
+    def request(
+        self,
+        method,
+        url,
+        json_data=None,
+        data=None,
+        headers=None,
+        retries=None,
+        **kwargs
+    ):
+        headers = dict(headers or {})
+        if json_data is not None:
+            data = json.dumps(json_data)
+            headers.setdefault("Content-Type", "application/json")
+        if data is not None and self.gzip_threshold:
+            if not isinstance(data, bytes):
+                data = data.encode("utf-8")
+            if len(data) >= self.gzip_threshold:
+                data = gzip_body(data)
+                headers["Content-Encoding"] = "gzip"
+        kwargs.setdefault("timeout", self.timeout)
+
+        if retries is None:
+            retries = self.retries
+        key = endpoint_key(method, url)
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        retry_count = 0
+        while True:
+            start = time.time()
+            try:
+                resp = self.session.request(
+                    method=method, url=url, data=data, headers=headers, **kwargs
+                )
+            except requests.exceptions.ConnectionError as ex:
+                self._observe(key, start, error=True)
+                if retry_count >= retries or not (idempotent or is_connect_error(ex)):
+                    raise
+            else:
+                retry = resp.status_code in RETRY_STATUS_CODES and (
+                    idempotent
+                    or resp.status_code not in IDEMPOTENT_ONLY_RETRY_STATUS_CODES
+                )
+                self._observe(key, start, error=not resp.ok)
+                if not retry or retry_count >= retries:
+                    return resp
+
+            sleep_seconds = jittered_backoff(
+                retry_count, self.backoff_base, self.backoff_max
+            )
+            logger.debug(
+                "Retrying %s in %.2fs (attempt %s)", key, sleep_seconds, retry_count + 1
+            )
+            time.sleep(sleep_seconds)
+            retry_count += 1
+
+    def _observe(self, key, start, error):
+        duration_ms = (time.time() - start) * 1000
+        with self._latency_lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = LatencyHistogram()
+            histogram.observe(duration_ms, error=error)
+
+    def get_latency_stats(self):
+        with self._latency_lock:
+            return {key: h.as_dict() for key, h in self.latency.items()}
+
+    def log_latency_stats(self, level=logging.DEBUG):
+        for key, stats in sorted(self.get_latency_stats().items()):
+            logger.log(
+                level,
+                "%s: %s requests (%s errors), avg %.1fms, max %.1fms",
+                key,
+                stats["count"],
+                stats["errors"],
+                stats["avg_ms"],
+                stats["max_ms"],
+            )
@@ -6,6 +6,7 @@ import requests
 
 from dbnd._core.errors import DatabandError, DatabandConfigError
 from dbnd._core.utils.http import constants
+from dbnd._core.utils.http.http_transport import HttpTransport, jitter
 
 # copypasted from sparkmagic package
 # Copyright (c) 2015  aggftw@gmail.com
@@ -23,10 +24,15 @@ class HttpClientException(DatabandError):
 class ReliableHttpClient(object):
     """Http client that is reliable in its requests. Uses requests library."""
 
-    def __init__(self, endpoint, headers, retry_policy, ignore_ssl_errors=False):
+    def __init__(
+        self, endpoint, headers, retry_policy, ignore_ssl_errors=False, transport=None
+    ):
         self._endpoint = endpoint
         self._headers = headers
         self._retry_policy = retry_policy
+        # retries are done by retry_policy
+        self._transport = transport or HttpTransport(retries=0)
+        self._auth = None
         if self._endpoint.auth == constants.AUTH_KERBEROS:
             from requests_kerberos import HTTPKerberosAuth, REQUIRED
 
@@ -54,54 +60,35 @@ class ReliableHttpClient(object):
 
     def get(self, relative_url, accepted_status_codes):
         """Sends a get request. Returns a response."""
-        return self._send_request(relative_url, accepted_status_codes, requests.get)
+        return self._send_request(relative_url, accepted_status_codes, "GET")
 
     def post(self, relative_url, accepted_status_codes, data):
         """Sends a post request. Returns a response."""
         return self._send_request(
-            relative_url, accepted_status_codes, requests.post, data
+            relative_url, accepted_status_codes, "POST", data
         )
 
     def delete(self, relative_url, accepted_status_codes):
         """Sends a delete request. Returns a response."""
-        return self._send_request(relative_url, accepted_status_codes, requests.delete)
+        return self._send_request(relative_url, accepted_status_codes, "DELETE")
 
-    def _send_request(self, relative_url, accepted_status_codes, function, data=None):
+    def _send_request(self, relative_url, accepted_status_codes, method, data=None):
         return self._send_request_helper(
-            self.compose_url(relative_url), accepted_status_codes, function, data, 0
+            self.compose_url(relative_url), accepted_status_codes, method, data, 0
         )
 
-    def _send_request_helper(
-        self, url, accepted_status_codes, function, data, retry_count
-    ):
+    def _send_request_helper(self, url, accepted_status_codes, method, data, retry_count):
         while True:
             try:
-                if self._endpoint.auth == constants.NO_AUTH:
-                    if data is None:
-                        r = function(url, headers=self._headers, verify=self.verify_ssl)
-                    else:
-                        r = function(
-                            url,
-                            headers=self._headers,
-                            data=json.dumps(data),
-                            verify=self.verify_ssl,
-                        )
-                else:
-                    if data is None:
-                        r = function(
-                            url,
-                            headers=self._headers,
-                            auth=self._auth,
-                            verify=self.verify_ssl,
-                        )
-                    else:
-                        r = function(
-                            url,
-                            headers=self._headers,
-                            auth=self._auth,
-                            data=json.dumps(data),
-                            verify=self.verify_ssl,
-                        )
+                # pooled keep-alive connections instead of new connection per request
+                r = self._transport.request(
+                    method,
+                    url,
+                    data=None if data is None else json.dumps(data),
+                    headers=self._headers,
+                    auth=self._auth,
+                    verify=self.verify_ssl,
+                )
             except requests.exceptions.RequestException as e:
                 error = True
                 r = None
@@ -116,7 +103,7 @@ class ReliableHttpClient(object):
 
             if error or status not in accepted_status_codes:
                 if self._retry_policy.should_retry(status, error, retry_count):
-                    sleep(self._retry_policy.seconds_to_sleep(retry_count))
+                    sleep(jitter(self._retry_policy.seconds_to_sleep(retry_count)))
                     retry_count += 1
                     continue
 
@@ -1,6 +1,7 @@
+import sys
+
 from collections import Mapping
 
-import pandas as pd
 import six
 
 
@@ -8,6 +9,12 @@ class DatabandDict(object):
     pass
 
 
+def _is_pandas_frame(obj):
+    # we don't want to import pandas just for this check
+    pd = sys.modules.get("pandas")
+    return pd is not None and isinstance(obj, pd.DataFrame)
+
+
 def flatten(struct):
     """
     Creates a flat list of all all items in structured output (dicts, lists, items):
@@ -97,7 +104,7 @@ def traverse(
         list_obj_constructor = None
         if isinstance(obj, (list, tuple, set)):
             list_obj_constructor = obj.__class__
-        elif isinstance(obj, pd.DataFrame):
+        elif _is_pandas_frame(obj):
             pass
         else:
             try:
@@ -8,6 +8,7 @@ import requests
 
 from dbnd._core.errors.base import DatabandApiError
 from dbnd._core.errors.friendly_error.api import api_connection_refused
+from dbnd._core.utils.http.http_transport import HttpTransport
 from dbnd._vendor.marshmallow import Schema, fields
 
 
@@ -30,27 +31,40 @@ class ApiClient(object):
 
     api_prefix = "/api/v1/"
 
-    def __init__(self, api_base_url, auth=None, user="databand", password="databand"):
+    def __init__(
+        self,
+        api_base_url,
+        auth=None,
+        user="databand",
+        password="databand",
+        transport=None,
+    ):
         self._api_base_url = api_base_url
         self.auth = auth
         self.user = user
         self.password = password
+        self.transport = transport or HttpTransport(retries=2)  # type: HttpTransport
         self.session = None
 
-    def _request(self, endpoint, method="GET", data=None, headers=None, query=None):
+    def _request(
+        self, endpoint, method="GET", data=None, headers=None, query=None, retries=None
+    ):
         if headers is None:
             headers = {}
         if not self.session:
             self._init_session()
 
         url = urljoin(self._api_base_url, endpoint)
-        try:
-            resp = self.session.request(
-                method=method, url=url, json=data, headers=headers, params=query
-            )
-        except requests.exceptions.ConnectionError:
-            self.session = None
-            raise
+        # connection errors are retried by the transport,
+        # we keep the session (csrf token, login) as is
+        resp = self.transport.request(
+            method=method,
+            url=url,
+            json_data=data,
+            headers=headers,
+            params=query,
+            retries=retries,
+        )
 
         if not resp.ok:
             raise DatabandApiError(
@@ -61,10 +75,10 @@ class ApiClient(object):
 
     def _init_session(self):
         try:
-            self.session = requests.session()
+            self.session = self.transport.session
 
             # get the csrf token cookie (if enabled on the server)
-            self.session.get(urljoin(self._api_base_url, "/app"))
+            self.transport.request("GET", urljoin(self._api_base_url, "/app"))
             csrf_token = self.session.cookies.get("dbnd_csrftoken")
             if csrf_token:
                 self.session.headers["X-CSRFToken"] = csrf_token
@@ -80,12 +94,24 @@ class ApiClient(object):
             raise
 
     def api_request(
-        self, endpoint, data, method="POST", headers=None, query=None, no_prefix=False
+        self,
+        endpoint,
+        data,
+        method="POST",
+        headers=None,
+        query=None,
+        no_prefix=False,
+        retries=None,
     ):
         url = endpoint if no_prefix else urljoin(self.api_prefix, endpoint)
         try:
             resp = self._request(
-                url, method=method, data=data, headers=headers, query=query
+                url,
+                method=method,
+                data=data,
+                headers=headers,
+                query=query,
+                retries=retries,
             )
         except requests.ConnectionError as ex:
             raise api_connection_refused(self._api_base_url + url, ex)
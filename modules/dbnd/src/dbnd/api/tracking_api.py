@@ -201,6 +201,13 @@ class LogMetricSchema(_ApiCallSchema):
 log_metric_schema = LogMetricSchema()
 
 
+class LogMetricsSchema(_ApiCallSchema):
+    metrics_info = fields.Nested(LogMetricSchema, many=True)
+
+
+log_metrics_schema = LogMetricsSchema()
+
+
 class LogArtifactSchema(_ApiCallSchema):
     task_run_attempt_uid = fields.UUID(required=True)
     name = fields.String()
@@ -329,6 +336,9 @@ class TrackingAPI(object):
     def log_metric(self, data):
         return self._handle(TrackingAPI.log_metric.__name__, data)
 
+    def log_metrics(self, data):
+        return self._handle(TrackingAPI.log_metrics.__name__, data)
+
     def log_artifact(self, data):
         return self._handle(TrackingAPI.log_artifact.__name__, data)
 
@@ -345,8 +355,13 @@ class TrackingAPI(object):
 class TrackingApiClient(TrackingAPI):
     """Json API client implementation."""
 
-    def __init__(self, api_base_url=None, auth=None):
-        self.client = ApiClient(api_base_url=api_base_url, auth=auth)
+    # log_metric calls can be merged into log_metrics (see AsyncTrackingChannel)
+    supports_log_metrics = True
+
+    def __init__(self, api_base_url=None, auth=None, transport=None):
+        self.client = ApiClient(
+            api_base_url=api_base_url, auth=auth, transport=transport
+        )
 
     def _handle(self, name, data):
         # disabled for now, should be changed back on 0.26
@@ -357,7 +372,9 @@ class TrackingApiClient(TrackingAPI):
 
     def is_ready(self):
         try:
-            self.client.api_request("/app", None, method="HEAD", no_prefix=True)
+            self.client.api_request(
+                "/app", None, method="HEAD", no_prefix=True, retries=0
+            )
             return True
         except (DatabandConnectionException, DatabandApiError):
             return False
@@ -1,4 +1,18 @@
-from dbnd.tasks.basics.pandas_tasks import PandasFrameToParquet
+import sys
+
 from dbnd.tasks.basics.sanity import dbnd_sanity_check
 from dbnd.tasks.basics.shell import bash_cmd, bash_script
 from dbnd.tasks.basics.simplest import SimplestPipeline, SimplestTask
+
+
+if sys.version_info < (3, 7):
+    from dbnd.tasks.basics.pandas_tasks import PandasFrameToParquet
+else:
+
+    def __getattr__(name):
+        # pandas is imported on first use only
+        if name == "PandasFrameToParquet":
+            from dbnd.tasks.basics.pandas_tasks import PandasFrameToParquet
+
+            return PandasFrameToParquet
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
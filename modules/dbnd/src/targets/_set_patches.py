@@ -1,5 +1,7 @@
 import logging
 
+from dbnd._core.utils.basics.import_hooks import when_imported
+
 
 logger = logging.getLogger(__name__)
 
@@ -8,14 +10,12 @@ def target_to_databand(df, target, **kwargs):
     return target.as_pandas.to(df, **kwargs)
 
 
-try:
-    from pandas import DataFrame
+def _patch_pandas(pandas):
+    pandas.DataFrame.to_target = target_to_databand
+
 
-    DataFrame.to_target = target_to_databand
-except ImportError:
-    logger.warning(
-        "'pandas' library can not be imported. This will crash at runtime if Pandas functionality is used."
-    )
+# pandas import is slow, we patch it once it's imported by the user code
+when_imported("pandas", _patch_pandas)
 
 # TODO: Dask
 # try:
@@ -1,8 +1,16 @@
+import logging
+import sys
+import threading
+
+from collections import OrderedDict
 from typing import Any, Dict
 
 import attr
 
-from targets.config import is_in_memory_cache_target_value
+from targets.config import get_in_memory_cache_max_size, is_in_memory_cache_target_value
+
+
+logger = logging.getLogger(__name__)
 
 
 @attr.s(frozen=True)
@@ -11,29 +19,117 @@ class TargetCacheKey(object):
     value_type = attr.ib(converter=str)
 
 
+@attr.s
+class TargetCacheStats(object):
+    hits = attr.ib(default=0)  # type: int
+    misses = attr.ib(default=0)  # type: int
+    evictions = attr.ib(default=0)  # type: int
+    evicted_size = attr.ib(default=0)  # type: int
+    rejected = attr.ib(default=0)  # type: int
+
+    size = attr.ib(default=0)  # type: int
+    peak_size = attr.ib(default=0)  # type: int
+
+    def as_dict(self):
+        return attr.asdict(self)
+
+
+def estimate_value_size(value):
+    """
+    best effort estimation of the memory used by the value (in bytes)
+    DataFrame/ndarray are measured by value type, everything else falls back to sys.getsizeof
+    """
+    from targets.values import get_value_type_of_obj, ObjectValueType
+
+    try:
+        value_type = get_value_type_of_obj(value, ObjectValueType())
+        return int(value_type.get_value_size(value))
+    except Exception as ex:
+        logger.debug("Failed to estimate size of %s: %s", type(value), ex)
+    try:
+        return sys.getsizeof(value)
+    except Exception:
+        return 0
+
+
 class TargetCache(object):
-    def __init__(self, cache=None):
-        self._cache = cache if cache is not None else {}
+    """
+    In memory cache of target values.
+    If max_size (or features.in_memory_cache_max_size) is set,
+    the cache will evict least recently used values once the budget is exceeded.
+    Values of pinned targets (inputs of tasks that didn't run yet) are evicted last.
+    """
+
+    def __init__(self, cache=None, max_size=None):
+        self._cache = cache if cache is not None else OrderedDict()
+        self._sizes = {}  # type: Dict[TargetCacheKey, int]
+        self._pinned_targets = set()
+        self._max_size = max_size
+
+        self._lock = threading.RLock()
+        self.stats = TargetCacheStats()
 
     def get_cache_group(self):
         # type: () -> Dict[TargetCacheKey, Any]
         return self._cache
 
+    @property
+    def max_size(self):
+        if self._max_size is not None:
+            return self._max_size
+        return get_in_memory_cache_max_size()
+
     def set(self, value, key):
         if not self.enabled:
             return
 
         cache = self.get_cache_group()
-        if cache is not None:
+        if cache is None:
+            return
+
+        max_size = self.max_size
+        with self._lock:
+            self._remove(cache, key)
+            if not max_size:
+                cache[key] = value
+                return
+
+            value_size = estimate_value_size(value)
+            if value_size > max_size:
+                logger.info(
+                    "Value of target '%s' is too big to be cached in memory "
+                    "(%s bytes, cache budget is %s bytes)",
+                    key.target,
+                    value_size,
+                    max_size,
+                )
+                self.stats.rejected += 1
+                return
+
             cache[key] = value
+            self._sizes[key] = value_size
+            self.stats.size += value_size
+            self._evict(cache, max_size)
+            self.stats.peak_size = max(self.stats.peak_size, self.stats.size)
 
-    def get(self, key):
+    def get(self, key, default=None):
         if not self.enabled:
-            return
+            return default
 
         cache = self.get_cache_group()
-        if cache is not None:
-            return cache.get(key)
+        if cache is None:
+            return default
+
+        with self._lock:
+            if key not in cache:
+                self.stats.misses += 1
+                return default
+
+            self.stats.hits += 1
+            # re-insert the value, so it becomes the most recently used one
+            value = cache.pop(key)
+            cache[key] = value
+            return value
 
     def has(self, key):
         cache = self.get_cache_group()
@@ -50,6 +146,41 @@ class TargetCache(object):
     def __contains__(self, item):
         return self.has(key=item)
 
+    def pin_targets(self, targets):
+        """
+        values of pinned targets are evicted only if there is nothing else to evict
+        """
+        with self._lock:
+            self._pinned_targets = set(str(t) for t in targets)
+
+    def is_pinned(self, key):
+        return key.target in self._pinned_targets
+
+    def _remove(self, cache, key):
+        if key in cache:
+            del cache[key]
+        value_size = self._sizes.pop(key, None)
+        if value_size:
+            self.stats.size -= value_size
+
+    def _evict(self, cache, max_size):
+        if self.stats.size <= max_size:
+            return
+
+        # cache is ordered from least to most recently used
+        # not pinned values goes first, pinned values are evicted only as a last resort
+        keys = list(cache.keys())
+        candidates = [k for k in keys if not self.is_pinned(k)] + [
+            k for k in keys if self.is_pinned(k)
+        ]
+        for key in candidates:
+            if self.stats.size <= max_size:
+                break
+            self.stats.evictions += 1
+            self.stats.evicted_size += self._sizes.get(key, 0)
+            logger.debug("Evicting cached value of '%s'", key.target)
+            self._remove(cache, key)
+
     def clear_for_targets(self, targets_to_clear):
         if not targets_to_clear:
             return
@@ -58,18 +189,26 @@ class TargetCache(object):
         if not cache:
             return
 
-        targets_to_clear = set(targets_to_clear)
-        for key in list(cache.keys()):
-            if key.target in targets_to_clear and key in cache:
-                del cache[key]
+        targets_to_clear = set(str(t) for t in targets_to_clear)
+        with self._lock:
+            for key in list(cache.keys()):
+                if key.target in targets_to_clear and key in cache:
+                    self._remove(cache, key)
 
     def clear(self):
         cache = self.get_cache_group()
         if cache:
-            cache.clear()
+            with self._lock:
+                cache.clear()
+                self._sizes.clear()
+                self.stats.size = 0
 
     def clear_all(self):
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._sizes.clear()
+            self._pinned_targets = set()
+            self.stats = TargetCacheStats()
 
     @property
     def enabled(self):
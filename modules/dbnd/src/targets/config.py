@@ -11,6 +11,8 @@ logger = logging.getLogger(__name__)
 
 _CONFIG_PARSER = None
 _DEFAULT_VALUE_PREVIEW_MAX_LEN = 10000
+_DEFAULT_REMOTE_READ_CHUNK_SIZE = 8 * 1024 * 1024
+_DEFAULT_REMOTE_WRITE_PART_SIZE = 8 * 1024 * 1024
 
 
 class TargetConfigProvider(object):
@@ -59,6 +61,69 @@ def is_in_memory_cache_target_value():
     return False
 
 
+def get_in_memory_cache_max_size():
+    dc = try_get_databand_context()
+    if dc:
+        return dc.settings.features.in_memory_cache_max_size
+    return None
+
+
+def get_partitions_prefetch():
+    dc = try_get_databand_context()
+    if dc:
+        return dc.settings.features.partitions_prefetch
+    return 0
+
+
+def get_remote_read_chunk_size():
+    dc = try_get_databand_context()
+    if dc:
+        return dc.settings.features.remote_read_chunk_size
+    return _DEFAULT_REMOTE_READ_CHUNK_SIZE
+
+
+def get_remote_read_ahead():
+    dc = try_get_databand_context()
+    if dc:
+        return dc.settings.features.remote_read_ahead
+    return 1
+
+
+def get_remote_s3_read_concurrency():
+    dc = try_get_databand_context()
+    if dc:
+        return dc.settings.features.remote_s3_read_concurrency
+    return 4
+
+
+def get_remote_write_part_size():
+    dc = try_get_databand_context()
+    if dc:
+        return dc.settings.features.remote_write_part_size
+    return _DEFAULT_REMOTE_WRITE_PART_SIZE
+
+
+def get_remote_write_concurrency():
+    dc = try_get_databand_context()
+    if dc:
+        return dc.settings.features.remote_write_concurrency
+    return 4
+
+
+def get_remote_listing_cache_ttl():
+    dc = try_get_databand_context()
+    if dc:
+        return dc.settings.features.remote_listing_cache_ttl
+    return 0
+
+
+def get_value_meta_config():
+    dc = try_get_databand_context()
+    if dc:
+        return dc.settings.value_meta
+    return None
+
+
 def get_value_preview_max_len():
     dc = try_get_databand_context()
 
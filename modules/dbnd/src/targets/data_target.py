@@ -2,7 +2,7 @@ import abc
 import logging
 
 from dbnd._core.errors import friendly_error
-from dbnd._core.utils.basics.nothing import NOTHING, is_not_defined
+from dbnd._core.utils.basics.nothing import NOTHING, is_defined, is_not_defined
 from targets import Target
 from targets.caching import TARGET_CACHE, TargetCacheKey
 from targets.errors import NotADirectory
@@ -125,9 +125,10 @@ class DataTarget(Target):
 
     def load(self, value_type, **kwargs):
         cache_key = TargetCacheKey(target=self, value_type=value_type)
-        if cache_key in TARGET_CACHE:
+        value = TARGET_CACHE.get(cache_key, default=NOTHING)
+        if is_defined(value):
             logger.info("Using cached data value for target='%s'", self)
-            return TARGET_CACHE[cache_key]
+            return value
 
         m = get_marshaller_ctrl(self, value_type)
         value = m.load(**kwargs)
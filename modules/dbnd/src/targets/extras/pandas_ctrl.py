@@ -2,8 +2,6 @@ import logging
 
 from typing import Any
 
-from pandas import DataFrame
-
 from targets.extras import DataTargetCtrl
 from targets.marshalling import get_marshaller_ctrl
 from targets.target_config import FileFormat, file
@@ -14,23 +12,30 @@ logger = logging.getLogger(__name__)
 file_table = file.with_format(FileFormat.table)
 
 
+def _data_frame_marshaller_ctrl(target, config):
+    # pandas is imported on first use only
+    from pandas import DataFrame
+
+    return get_marshaller_ctrl(target, value_type=DataFrame, config=config)
+
+
 class PandasMarshallingCtrl(DataTargetCtrl):
     def __init__(self, target):
         super(PandasMarshallingCtrl, self).__init__(target)
 
     def read(self, config=None, **kwargs):
         # type: (file, **Any) -> 'DataFrame'
-        pd_m = get_marshaller_ctrl(self.target, DataFrame, config=config)
+        pd_m = _data_frame_marshaller_ctrl(self.target, config=config)
         return pd_m.load(**kwargs)
 
     def read_partitioned(self, config=None, **kwargs):
-        pd_m = get_marshaller_ctrl(self.target, DataFrame, config=config)
+        pd_m = _data_frame_marshaller_ctrl(self.target, config=config)
         for t in pd_m.load_partitioned(**kwargs):
             yield t
 
     @target_timeit
     def to(self, df, config=None, **kwargs):
-        pd_m = get_marshaller_ctrl(self.target, value_type=DataFrame, config=config)
+        pd_m = _data_frame_marshaller_ctrl(self.target, config=config)
         return pd_m.dump(df, **kwargs)
 
     def read_csv(self, **kwargs):
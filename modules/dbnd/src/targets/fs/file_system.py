@@ -24,6 +24,8 @@ class FileSystem(object):
     name = None
     support_direct_access = False
     _exist_after_write_consistent = True
+    # copy_from_local never leaves a partial file at the destination
+    atomic_upload = False
 
     @classmethod
     def exist_after_write_consistent(cls):
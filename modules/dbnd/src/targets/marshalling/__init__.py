@@ -1,10 +1,10 @@
 from __future__ import absolute_import
 
+import importlib
 import logging
+import sys
 import typing
 
-import numpy as np
-import pandas as pd
 import six
 
 from dbnd._core.errors import friendly_error
@@ -16,22 +16,52 @@ from targets.marshalling.file import (
     StrMarshaller,
 )
 from targets.marshalling.marshaller_ctrl import MarshallerCtrl
-from targets.marshalling.numpy import NumpyArrayMarshaller, NumpyArrayPickleMarshaler
-from targets.marshalling.pandas import (
-    DataFrameDictToHdf5,
-    DataFrameToCsv,
-    DataFrameToFeather,
-    DataFrameToHdf5,
-    DataFrameToJson,
-    DataFrameToParquet,
-    DataFrameToPickle,
-    DataFrameToTable,
-    DataFrameToTsv,
-    DataFrameToExcel,
-)
 from targets.target_config import FileFormat
 from targets.types import DataList
 from targets.values import get_value_type_of_type
+
+
+# marshallers of pandas and numpy are exported from here, but imported on first use
+_LAZY_EXPORTS = {
+    "NumpyArrayMarshaller": "targets.marshalling.numpy",
+    "NumpyArrayPickleMarshaler": "targets.marshalling.numpy",
+    "DataFrameDictToHdf5": "targets.marshalling.pandas",
+    "DataFrameToCsv": "targets.marshalling.pandas",
+    "DataFrameToFeather": "targets.marshalling.pandas",
+    "DataFrameToHdf5": "targets.marshalling.pandas",
+    "DataFrameToJson": "targets.marshalling.pandas",
+    "DataFrameToParquet": "targets.marshalling.pandas",
+    "DataFrameToPickle": "targets.marshalling.pandas",
+    "DataFrameToTable": "targets.marshalling.pandas",
+    "DataFrameToTsv": "targets.marshalling.pandas",
+    "DataFrameToExcel": "targets.marshalling.pandas",
+}
+
+if sys.version_info < (3, 7):
+    from targets.marshalling.numpy import (
+        NumpyArrayMarshaller,
+        NumpyArrayPickleMarshaler,
+    )
+    from targets.marshalling.pandas import (
+        DataFrameDictToHdf5,
+        DataFrameToCsv,
+        DataFrameToFeather,
+        DataFrameToHdf5,
+        DataFrameToJson,
+        DataFrameToParquet,
+        DataFrameToPickle,
+        DataFrameToTable,
+        DataFrameToTsv,
+        DataFrameToExcel,
+    )
+else:
+
+    def __getattr__(name):
+        if name in _LAZY_EXPORTS:
+            return getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 from targets.values.version_value import VersionStr
 
 logger = logging.getLogger(__name__)
@@ -75,61 +105,110 @@ def register_basic_data_marshallers():
     for t in [typing.List[object], typing.List[str], DataList, DataList[str]]:
         MARSHALERS[t] = list_marshalers
 
-    try:
-        register_marshallers(
-            pd.DataFrame,
-            {
-                FileFormat.txt: DataFrameToCsv(),
-                FileFormat.csv: DataFrameToCsv(),
-                FileFormat.table: DataFrameToTable(),
-                FileFormat.parquet: DataFrameToParquet(),
-                FileFormat.feather: DataFrameToFeather(),
-                FileFormat.hdf5: DataFrameToHdf5(),
-                FileFormat.pickle: DataFrameToPickle(),
-                FileFormat.json: DataFrameToJson(),
-                FileFormat.tsv: DataFrameToTsv(),
-                FileFormat.excel: DataFrameToExcel(),
-            },
-        )
-        register_marshallers(
-            pd.Series,
-            {
-                FileFormat.csv: DataFrameToCsv(series=True),
-                FileFormat.table: DataFrameToTable(),
-                FileFormat.parquet: DataFrameToParquet(),
-                FileFormat.feather: DataFrameToFeather(),
-                FileFormat.hdf5: DataFrameToHdf5(),
-                FileFormat.pickle: DataFrameToPickle(),
-                FileFormat.json: DataFrameToJson(),
-            },
-        )
-        register_marshallers(
-            np.ndarray,
-            {
-                FileFormat.numpy: NumpyArrayMarshaller(),
-                FileFormat.pickle: NumpyArrayPickleMarshaler(),
-            },
-        )
-        register_marshallers(
-            typing.Dict[str, pd.DataFrame], {FileFormat.hdf5: DataFrameDictToHdf5()}
-        )
-    except ImportError:
-        pass
-
-    try:
-        from matplotlib import figure
-        from targets.marshalling.matplotlib import MatplotlibFigureMarshaller
-
-        register_marshallers(
-            figure.Figure,
-            {
-                FileFormat.png: MatplotlibFigureMarshaller(),
-                FileFormat.pdf: MatplotlibFigureMarshaller(),
-                FileFormat.pickle: ObjPickleMarshaller(),
-            },
-        )
-    except ImportError:
-        pass
+    # marshallers of heavy libraries are registered on first use,
+    # there can't be any value of the library type before the library is imported
+    _LAZY_MARSHALLERS["pandas"] = _register_pandas_marshallers
+    _LAZY_MARSHALLERS["numpy"] = _register_numpy_marshallers
+    _LAZY_MARSHALLERS["matplotlib"] = _register_matplotlib_marshallers
+
+
+# module -> function that registers marshallers of the module types
+_LAZY_MARSHALLERS = {}
+
+
+def _register_pandas_marshallers():
+    import pandas as pd
+
+    from targets.marshalling.pandas import (
+        DataFrameDictToHdf5,
+        DataFrameToCsv,
+        DataFrameToFeather,
+        DataFrameToHdf5,
+        DataFrameToJson,
+        DataFrameToParquet,
+        DataFrameToPickle,
+        DataFrameToTable,
+        DataFrameToTsv,
+        DataFrameToExcel,
+    )
+
+    register_marshallers(
+        pd.DataFrame,
+        {
+            FileFormat.txt: DataFrameToCsv(),
+            FileFormat.csv: DataFrameToCsv(),
+            FileFormat.table: DataFrameToTable(),
+            FileFormat.parquet: DataFrameToParquet(),
+            FileFormat.feather: DataFrameToFeather(),
+            FileFormat.hdf5: DataFrameToHdf5(),
+            FileFormat.pickle: DataFrameToPickle(),
+            FileFormat.json: DataFrameToJson(),
+            FileFormat.tsv: DataFrameToTsv(),
+            FileFormat.excel: DataFrameToExcel(),
+        },
+    )
+    register_marshallers(
+        pd.Series,
+        {
+            FileFormat.csv: DataFrameToCsv(series=True),
+            FileFormat.table: DataFrameToTable(),
+            FileFormat.parquet: DataFrameToParquet(),
+            FileFormat.feather: DataFrameToFeather(),
+            FileFormat.hdf5: DataFrameToHdf5(),
+            FileFormat.pickle: DataFrameToPickle(),
+            FileFormat.json: DataFrameToJson(),
+        },
+    )
+    register_marshallers(
+        typing.Dict[str, pd.DataFrame], {FileFormat.hdf5: DataFrameDictToHdf5()}
+    )
+
+
+def _register_numpy_marshallers():
+    import numpy as np
+
+    from targets.marshalling.numpy import (
+        NumpyArrayMarshaller,
+        NumpyArrayPickleMarshaler,
+    )
+
+    register_marshallers(
+        np.ndarray,
+        {
+            FileFormat.numpy: NumpyArrayMarshaller(),
+            FileFormat.pickle: NumpyArrayPickleMarshaler(),
+        },
+    )
+
+
+def _register_matplotlib_marshallers():
+    from matplotlib import figure
+    from targets.marshalling.matplotlib import MatplotlibFigureMarshaller
+
+    register_marshallers(
+        figure.Figure,
+        {
+            FileFormat.png: MatplotlibFigureMarshaller(),
+            FileFormat.pdf: MatplotlibFigureMarshaller(),
+            FileFormat.pickle: ObjPickleMarshaller(),
+        },
+    )
+
+
+def load_lazy_marshallers(modules=None):
+    """
+    Registers marshallers of already imported libraries (or of the given modules)
+    """
+    for module in list(_LAZY_MARSHALLERS):
+        if module not in sys.modules and (not modules or module not in modules):
+            continue
+        register = _LAZY_MARSHALLERS.pop(module, None)
+        if not register:
+            continue
+        try:
+            register()
+        except ImportError:
+            logger.debug("Failed to register marshallers of %s", module)
 
 
 def _marshaller_options_message(value_type, value_options, object_options):
@@ -153,6 +232,8 @@ def get_marshaller_ctrl(target, value_type, config=None):
     config = config or target.config
 
     value_type = get_value_type_of_type(value_type, inline_value_type=True)
+    if _LAZY_MARSHALLERS:
+        load_lazy_marshallers()
     marshaller_options = MARSHALERS.get(value_type.type, {})
     object_marshaller_options = MARSHALERS.get(object)
 
@@ -191,10 +272,15 @@ def get_marshaller_ctrl(target, value_type, config=None):
 
 
 def register_marshaller(value_type, file_format, marshaller_cls):
+    # lazy defaults should not override the registered marshaller later
+    if _LAZY_MARSHALLERS:
+        load_lazy_marshallers()
     MARSHALERS.setdefault(value_type, {})[file_format] = marshaller_cls
 
 
 def register_marshallers(value_type, marshaller_dict):
+    if _LAZY_MARSHALLERS:
+        load_lazy_marshallers()
     marshaller_value_type = MARSHALERS.setdefault(value_type, {})
     for file_format, marshaller_cls in six.iteritems(marshaller_dict):
         marshaller_value_type[file_format] = marshaller_cls
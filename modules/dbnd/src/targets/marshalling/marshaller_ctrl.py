@@ -3,8 +3,10 @@ import types
 import attr
 
 from dbnd._core.errors import friendly_error
+from targets.config import get_partitions_prefetch
 from targets.marshalling import StrLinesMarshaller, StrMarshaller
 from targets.marshalling.marshaller import Marshaller
+from targets.utils.prefetch import iter_prefetched
 from targets.values import ValueType
 
 
@@ -46,11 +48,10 @@ class MarshallerCtrl(object):
 
         if not self.value_type.support_merge:
             raise friendly_error.marshaller_no_merge(self, target, partitions)
-        # Concatenate all data into one DataFrame
-        # We don't want list to be stored in memory
-        # however, concat does list() on the iterator as one of the first things
-        partitions_values = [m.target_to_value(t, **kwargs) for t in partitions]
-        return self.value_type.merge_values(*partitions_values)
+        # partitions are read (and merged) one by one,
+        # so we don't keep all of them in memory together with the result
+        partitions_values = self._iter_partitions_values(partitions, **kwargs)
+        return self.value_type.merge_values_iter(partitions_values)
 
     def dump(self, value, **kwargs):
         target = self.target
@@ -91,6 +92,43 @@ class MarshallerCtrl(object):
         m.value_to_target(target=selected_target, value=value, **kwargs)
         target.mark_success()
 
-    def load_partitioned(self, **kwargs):
-        for t in self.target.list_partitions():
-            yield self.marshaller.target_to_value(t, **kwargs)
+    def load_partitioned(
+        self, select_columns=None, partition_filter=None, prefetch=None, **kwargs
+    ):
+        """
+        Lazily loads partitions of the target one by one.
+
+        :param select_columns: columns to keep from every partition
+        :param partition_filter: function applied on every partition value
+        :param prefetch: amount of next partitions to read in background,
+            features.partitions_prefetch by default
+        """
+        for value in self._iter_partitions_values(
+            self.target.list_partitions(),
+            select_columns=select_columns,
+            partition_filter=partition_filter,
+            prefetch=prefetch,
+            **kwargs
+        ):
+            yield value
+
+    def _iter_partitions_values(
+        self,
+        partitions,
+        select_columns=None,
+        partition_filter=None,
+        prefetch=None,
+        **kwargs
+    ):
+        if prefetch is None:
+            prefetch = get_partitions_prefetch()
+
+        def _load_partition(partition):
+            value = self.marshaller.target_to_value(partition, **kwargs)
+            if select_columns is not None:
+                value = value[list(select_columns)]
+            if partition_filter is not None:
+                value = partition_filter(value)
+            return value
+
+        return iter_prefetched(_load_partition, partitions, prefetch=prefetch)
@@ -7,3 +7,5 @@ class TargetMeta(object):
     data_dimensions = attr.ib()  # type: List[int]
     data_schema = attr.ib()  # type: str
     data_hash = attr.ib()  # type: str
+    # how the meta was calculated (sampling, skipped parts), if not the default way
+    meta_strategy = attr.ib(default=None)  # type: Dict[str, Any]
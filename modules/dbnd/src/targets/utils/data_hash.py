@@ -0,0 +1,88 @@
+import contextlib
+import hashlib
+import logging
+import threading
+
+from dbnd._vendor import fast_hasher
+
+
+logger = logging.getLogger(__name__)
+
+# signatures have to be the same on every machine,
+# so we don't depend on optional hashing libraries here
+if hasattr(hashlib, "blake2b"):
+
+    def new_hasher():
+        return hashlib.blake2b(digest_size=16)
+
+else:  # python 2
+
+    def new_hasher():
+        return hashlib.md5()
+
+
+def update_with_array(hasher, arr):
+    """
+    Feeds numpy array into the hasher, using its raw buffer when possible
+    """
+    import numpy as np
+
+    hasher.update(str((arr.dtype.str, arr.shape)).encode("utf-8"))
+    if arr.dtype.hasobject:
+        # objects can't be hashed by their memory
+        hasher.update(fast_hasher.hash(arr).encode("utf-8"))
+    else:
+        hasher.update(np.ascontiguousarray(arr).data)
+
+
+def hash_ndarray(arr):
+    hasher = new_hasher()
+    update_with_array(hasher, arr)
+    return hasher.hexdigest()
+
+
+class ObjectHashCache(object):
+    """
+    Memoises hash of an object by its id during a single task build pass (see build_pass()),
+    so the same DataFrame passed to all the tasks of a pipeline is hashed once.
+    In memory objects can be changed in place between the passes,
+    so nothing is cached outside of a pass and the cache is dropped when the pass ends.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+    @contextlib.contextmanager
+    def build_pass(self):
+        if getattr(self._local, "cache", None) is not None:
+            # nested task build is a part of the current pass
+            yield
+            return
+
+        self._local.cache = {}  # id -> (value, hash)
+        try:
+            yield
+        finally:
+            self._local.cache = None
+
+    def get_hash(self, value, calc_hash):
+        cache = getattr(self._local, "cache", None)
+        if cache is None:
+            return calc_hash(value)
+
+        cached = cache.get(id(value))
+        if cached is not None and cached[0] is value:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        value_hash = calc_hash(value)
+        # the value is referenced till the end of the pass, so its id is not reused
+        cache[id(value)] = (value, value_hash)
+        return value_hash
+
+
+# hashes of in memory values used in task signatures
+SIGNATURE_HASH_CACHE = ObjectHashCache()
@@ -1,3 +1,17 @@
+import io
+
+from targets.config import get_partitions_prefetch
+from targets.utils.prefetch import iter_prefetched
+
+
+def _read_to_buffer(target, mode):
+    with target.open(mode) as fp:
+        content = fp.read()
+    if isinstance(content, bytes):
+        return io.BytesIO(content)
+    return io.StringIO(content, newline="")
+
+
 class MultiTargetOpen(object):
     """FileInput([files[, inplace[, backup[, bufsize[, mode[, openhook]]]]]])
 
@@ -9,9 +23,13 @@ class MultiTargetOpen(object):
     input line, and a __getitem__() method which implements the
     sequence behavior. The sequence must be accessed in strictly
     sequential order; random access and readline() cannot be mixed.
+
+    If prefetch is set (features.partitions_prefetch by default), the next
+    `prefetch` files are read into memory buffers by background threads
+    while the current one is consumed.
     """
 
-    def __init__(self, targets=None, mode="r"):
+    def __init__(self, targets=None, mode="r", prefetch=None):
 
         self._targets = targets
 
@@ -22,6 +40,12 @@ class MultiTargetOpen(object):
 
         self._file_idx = 0
         self._file = None
+
+        if prefetch is None:
+            prefetch = get_partitions_prefetch()
+        self._prefetch = prefetch
+        self._prefetched_files = None
+
         # restrict mode argument to reading modes
         if mode not in ("r", "rU", "U", "rb"):
             raise ValueError(
@@ -37,6 +61,9 @@ class MultiTargetOpen(object):
             self.nextfile()
         finally:
             self._file_idx = 0
+            if self._prefetched_files is not None:
+                self._prefetched_files.close()
+                self._prefetched_files = None
 
     def __iter__(self):
         return self
@@ -101,11 +128,23 @@ class MultiTargetOpen(object):
         self._filelineno = 0
 
         # This may raise IOError
-        self._file = self._filename.open(self._mode)
+        self._file = self._open_next()
 
         self._readline = self._file.readline  # hide FileInput._readline
         return self._readline()
 
+    def _open_next(self):
+        if not self._prefetch or self._prefetch <= 0:
+            return self._filename.open(self._mode)
+
+        if self._prefetched_files is None:
+            self._prefetched_files = iter_prefetched(
+                lambda t: _read_to_buffer(t, self._mode),
+                self._targets[self._file_idx - 1 :],
+                prefetch=self._prefetch,
+            )
+        return next(self._prefetched_files)
+
     def filename(self):
         return self._filename
 
@@ -0,0 +1,39 @@
+import logging
+
+from collections import deque
+from multiprocessing.pool import ThreadPool
+
+
+logger = logging.getLogger(__name__)
+
+
+def iter_prefetched(func, items, prefetch=0):
+    """
+    Yields func(item) for every item, in the original order.
+    If prefetch is set, the next `prefetch` items are processed in background threads
+    while the consumer handles the current result,
+    so at most `prefetch` + 1 results are kept in memory.
+    """
+    if not prefetch or prefetch <= 0:
+        for item in items:
+            yield func(item)
+        return
+
+    items = iter(items)
+    pending = deque()
+    pool = ThreadPool(prefetch)
+    try:
+        for item in items:
+            pending.append(pool.apply_async(func, (item,)))
+            if len(pending) >= prefetch:
+                break
+
+        while pending:
+            result = pending.popleft().get()
+            for item in items:
+                pending.append(pool.apply_async(func, (item,)))
+                break
+            yield result
+    finally:
+        # consumer can stop in the middle, we don't wait for not needed results
+        pool.terminate()
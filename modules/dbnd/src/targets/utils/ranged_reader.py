@@ -0,0 +1,156 @@
+import io
+import logging
+
+from multiprocessing.pool import ThreadPool
+
+from targets.config import get_remote_read_ahead, get_remote_read_chunk_size
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class RangedReader(io.RawIOBase):
+    """
+    Read-only seekable file over a remote object of a known size.
+    The content is fetched by `read_range(start, end)` calls (`end` is inclusive,
+    as in HTTP Range header) of `chunk_size` bytes, so only the chunks that are
+    actually read are downloaded and nothing is stored on the local disk.
+
+    If read_ahead is set, the next `read_ahead` chunks are fetched by background threads
+    while the current one is consumed (only while the file is read sequentially),
+    so at most `read_ahead` + 1 chunks are kept in memory.
+    """
+
+    def __init__(
+        self, read_range, size, chunk_size=DEFAULT_CHUNK_SIZE, read_ahead=0, name=None
+    ):
+        super(RangedReader, self).__init__()
+        self._read_range = read_range
+        self.size = size
+        self.chunk_size = max(int(chunk_size), 1)
+        self.read_ahead = read_ahead or 0
+        self.name = name
+
+        # stats
+        self.requests = 0
+        self.bytes_fetched = 0
+
+        self._pos = 0
+        self._chunk_idx = None
+        self._chunk = b""
+        self._pending = {}  # chunk index -> AsyncResult of read ahead
+        self._pool = None
+
+    def __repr__(self):
+        return "RangedReader(%s)" % self.name
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError("invalid whence (%r)" % whence)
+        if pos < 0:
+            raise ValueError("negative seek position %r" % pos)
+        self._pos = pos
+        return pos
+
+    def readinto(self, b):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        if self._pos >= self.size:
+            return 0
+
+        chunk_idx, offset = divmod(self._pos, self.chunk_size)
+        data = memoryview(self._get_chunk(chunk_idx))[offset : offset + len(b)]
+        read = len(data)
+        b[:read] = data
+        self._pos += read
+        return read
+
+    def readall(self):
+        parts = []
+        while True:
+            data = self.read(self.chunk_size)
+            if not data:
+                break
+            parts.append(data)
+        return b"".join(parts)
+
+    def close(self):
+        if self._pool is not None:
+            # we don't wait for read ahead that is not needed anymore
+            self._pool.terminate()
+            self._pool = None
+        self._pending = {}
+        self._chunk = b""
+        super(RangedReader, self).close()
+
+    def _get_chunk(self, chunk_idx):
+        if chunk_idx == self._chunk_idx:
+            return self._chunk
+
+        sequential = chunk_idx == (
+            self._chunk_idx + 1 if self._chunk_idx is not None else 0
+        )
+        pending = self._pending.pop(chunk_idx, None)
+        self._chunk = pending.get() if pending else self._fetch(chunk_idx)
+        self._chunk_idx = chunk_idx
+        if self.read_ahead:
+            self._schedule_read_ahead(chunk_idx, sequential)
+        return self._chunk
+
+    def _schedule_read_ahead(self, chunk_idx, sequential):
+        if not sequential:
+            # random access (Parquet footer, etc), read ahead would be wasted
+            self._pending = {}
+            return
+
+        chunks_count = (self.size + self.chunk_size - 1) // self.chunk_size
+        wanted = range(
+            chunk_idx + 1, min(chunk_idx + 1 + self.read_ahead, chunks_count)
+        )
+        self._pending = {i: r for i, r in self._pending.items() if i in wanted}
+        for i in wanted:
+            if i not in self._pending:
+                if self._pool is None:
+                    self._pool = ThreadPool(self.read_ahead)
+                self._pending[i] = self._pool.apply_async(self._fetch, (i,))
+
+    def _fetch(self, chunk_idx):
+        start = chunk_idx * self.chunk_size
+        end = min(start + self.chunk_size, self.size) - 1
+        logger.debug("Reading bytes %s-%s of %s", start, end, self.name)
+        data = self._read_range(start, end)
+        self.requests += 1
+        self.bytes_fetched += len(data)
+        return data
+
+
+def open_ranged_reader(read_range, size, chunk_size=None, read_ahead=None, name=None):
+    """
+    Returns buffered binary file object that reads the remote object on demand,
+    see RangedReader. Chunk size and read ahead are taken from [features] config if not set.
+    """
+    if chunk_size is None:
+        chunk_size = get_remote_read_chunk_size()
+    if read_ahead is None:
+        read_ahead = get_remote_read_ahead()
+    raw = RangedReader(
+        read_range, size=size, chunk_size=chunk_size, read_ahead=read_ahead, name=name
+    )
+    return io.BufferedReader(raw)
@@ -47,7 +47,7 @@ class StrValueType(ValueType):
     type_str_extras = ("unicode",)
     support_merge = True
 
-    def merge_values(self, *values):
+    def merge_values(self, *values, **kwargs):
         return "".join(values)
 
     def is_type_of(self, value):
@@ -2,7 +2,7 @@ from __future__ import absolute_import
 
 import numpy
 
-from dbnd._vendor import fast_hasher
+from targets.utils.data_hash import SIGNATURE_HASH_CACHE, hash_ndarray
 from targets.values.builtins_values import DataValueType
 
 
@@ -12,7 +12,10 @@ class NumpyArrayValueType(DataValueType):
     support_merge = True
 
     def to_signature(self, x):
-        return fast_hasher.hash(x)
+        return SIGNATURE_HASH_CACHE.get_hash(x, hash_ndarray)
+
+    def get_value_size(self, value):
+        return value.nbytes
 
     def merge_values(self, *values, **kwargs):
         import numpy as np
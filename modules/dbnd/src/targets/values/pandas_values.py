@@ -1,9 +1,15 @@
 from __future__ import absolute_import
 
+import logging
 import os
+import threading
+import time
+
+from collections import OrderedDict
 
 from typing import Dict, Tuple
 
+import numpy as np
 import pandas as pd
 import six
 
@@ -12,13 +18,69 @@ from pandas.core.util.hashing import hash_pandas_object
 from dbnd._core.errors import friendly_error
 from dbnd._core.utils import json_utils
 from dbnd._vendor import fast_hasher
-from targets.config import get_value_preview_max_len
+from targets.config import get_value_meta_config, get_value_preview_max_len
 from targets.target_config import FileFormat
+from targets.target_meta import TargetMeta
+from targets.utils.data_hash import SIGNATURE_HASH_CACHE, new_hasher, update_with_array
 from targets.values.builtins_values import DataValueType
 from targets.values.structure import DictValueType
 from targets.values.value_type import _isinstances
 
 
+logger = logging.getLogger(__name__)
+
+# (columns, dtypes) -> (columns list, dtypes dict) of the data schema
+_SCHEMA_CACHE_SIZE = 256
+_SCHEMA_CACHE = OrderedDict()
+_SCHEMA_CACHE_LOCK = threading.Lock()
+
+
+def _get_columns_and_dtypes(df):
+    try:
+        key = (tuple(df.columns), tuple(df.dtypes))
+        hash(key)
+    except TypeError:
+        key = None
+
+    if key is not None:
+        with _SCHEMA_CACHE_LOCK:
+            cached = _SCHEMA_CACHE.pop(key, None)
+            if cached is not None:
+                _SCHEMA_CACHE[key] = cached
+                return cached
+
+    value = (list(df.columns), {col: str(type_) for col, type_ in df.dtypes.items()})
+    if key is not None:
+        with _SCHEMA_CACHE_LOCK:
+            _SCHEMA_CACHE[key] = value
+            while len(_SCHEMA_CACHE) > _SCHEMA_CACHE_SIZE:
+                _SCHEMA_CACHE.popitem(last=False)
+    return value
+
+
+def _hash_pandas_value(value):
+    # hash of raw column buffers, faster than pickling the whole frame
+    hasher = new_hasher()
+    if isinstance(value, pd.Series):
+        columns = [(value.name, value)]
+    else:
+        columns = [(name, value.iloc[:, i]) for i, name in enumerate(value.columns)]
+
+    if isinstance(value.index, pd.RangeIndex):
+        hasher.update(repr(value.index).encode("utf-8"))
+    else:
+        update_with_array(hasher, hash_pandas_object(value.index).values)
+
+    for name, column in columns:
+        hasher.update(repr((name, str(column.dtype))).encode("utf-8"))
+        column_values = column.values
+        if isinstance(column_values, np.ndarray) and not column_values.dtype.hasobject:
+            update_with_array(hasher, column_values)
+        else:
+            update_with_array(hasher, hash_pandas_object(column, index=False).values)
+    return hasher.hexdigest()
+
+
 class DataFrameValueType(DataValueType):
     type = pd.DataFrame
     type_str = "DataFrame"
@@ -28,10 +90,13 @@ class DataFrameValueType(DataValueType):
 
     def to_signature(self, x):
         shape = "[%s]" % (",".join(map(str, x.shape)))
-        return "%s:%s" % (shape, fast_hasher.hash(x))
+        return "%s:%s" % (shape, SIGNATURE_HASH_CACHE.get_hash(x, _hash_pandas_value))
 
     def to_preview(self, df):  # type: (pd.DataFrame) -> str
-        return df.to_string(index=False, max_rows=20, max_cols=1000)[
+        # we don't want to format the whole frame, only rows we are going to show
+        conf = get_value_meta_config()
+        preview_rows = conf.preview_rows if conf else 20
+        return df.head(preview_rows).to_string(index=False, max_cols=1000)[
             : get_value_preview_max_len()
         ]
 
@@ -39,18 +104,94 @@ class DataFrameValueType(DataValueType):
         return value.shape
 
     def get_data_schema(self, df):  # type: (pd.DataFrame) -> str
-        schema = {
+        return json_utils.dumps(self._get_data_schema(df))
+
+    def _get_data_schema(self, df):
+        columns, dtypes = _get_columns_and_dtypes(df)
+        return {
             "type": self.type_str,
-            "columns": list(df.columns),
+            "columns": columns,
             "size": int(df.size),
             "shape": df.shape,
-            "dtypes": {col: str(type_) for col, type_ in df.dtypes.items()},
+            "dtypes": dtypes,
         }
-        return json_utils.dumps(schema)
+
+    def _get_hash_mode(self, value):
+        conf = get_value_meta_config()
+        hash_mode = conf.hash_mode if conf else "full"
+        sample_size = conf.hash_sample_size if conf else 100000
+        if hash_mode == "auto":
+            hash_mode = "sampled" if len(value) > sample_size else "full"
+        return hash_mode, sample_size
 
     def get_data_hash(self, value):
+        hash_mode, sample_size = self._get_hash_mode(value)
+        return self._calc_data_hash(value, hash_mode, sample_size)
+
+    def _calc_data_hash(self, value, hash_mode, sample_size):
+        if hash_mode == "none":
+            return None
+        if hash_mode == "sampled" and len(value) > sample_size:
+            # rows spread evenly over the frame, shape makes frames of different sizes differ
+            positions = np.linspace(0, len(value) - 1, sample_size).astype(np.int64)
+            sample = value.iloc[positions]
+            return fast_hasher.hash(
+                (value.shape, hash_pandas_object(sample, index=True).values)
+            )
         return fast_hasher.hash(hash_pandas_object(value, index=True).values)
 
+    def get_value_meta(self, value, with_preview=True):
+        conf = get_value_meta_config()
+        time_budget = conf.time_budget if conf else None
+        hash_mode, sample_size = self._get_hash_mode(value)
+
+        start = time.time()
+        skipped = []
+
+        def _in_budget(part):
+            if time_budget is not None and time.time() - start > time_budget:
+                skipped.append(part)
+                return False
+            return True
+
+        data_dimensions = list(self.get_data_dimensions(value))
+        schema = self._get_data_schema(value)
+        preview = None
+        if with_preview and _in_budget("preview"):
+            preview = self.to_preview(value)
+        data_hash = None
+        if hash_mode != "none" and _in_budget("hash"):
+            data_hash = self._calc_data_hash(value, hash_mode, sample_size)
+
+        meta_strategy = None
+        if hash_mode != "full" or skipped:
+            meta_strategy = {"hash": hash_mode}
+            if hash_mode == "sampled":
+                meta_strategy["hash_sample_size"] = sample_size
+            if skipped:
+                meta_strategy["skipped"] = skipped
+                logger.info(
+                    "Value meta calculation exceeded time budget of %ss, skipped: %s",
+                    time_budget,
+                    skipped,
+                )
+            schema["meta_strategy"] = meta_strategy
+
+        return TargetMeta(
+            value_preview=preview,
+            data_dimensions=data_dimensions,
+            data_schema=json_utils.dumps(schema),
+            data_hash=data_hash,
+            meta_strategy=meta_strategy,
+        )
+
+    def get_value_size(self, value):
+        # Series returns int, DataFrame returns Series of columns sizes
+        size = value.memory_usage(deep=True, index=True)
+        if isinstance(size, pd.Series):
+            size = size.sum()
+        return int(size)
+
     def merge_values(self, *values, **kwargs):
         # Concatenate all data into one DataFrame
         # We don't want list to be stored in memory
@@ -81,6 +222,63 @@ class DataFrameValueType(DataValueType):
             values, verify_integrity=True, ignore_index=not meaningful_index
         )
 
+    def merge_values_iter(self, values, **kwargs):
+        # pd.concat needs all the frames in memory together with the result.
+        # Here every frame is split into columns copies as soon as it's read,
+        # so the frame can be released before the next one is read,
+        # and the result is built column by column.
+        values = iter(values)
+        columns = None
+        columns_parts = None
+        index_parts = []
+        for df in values:
+            if columns is None:
+                if not df.columns.is_unique or isinstance(df.columns, pd.MultiIndex):
+                    return self.merge_values(df, *values, **kwargs)
+                columns = df.columns
+                columns_parts = [[] for _ in columns]
+            elif not columns.equals(df.columns):
+                # different schemas, let pandas to align them
+                merged = self._merge_columns_parts(
+                    columns, columns_parts, index_parts, **kwargs
+                )
+                return self.merge_values(merged, df, *values, **kwargs)
+
+            index_parts.append(df.index)
+            for i, column_parts in enumerate(columns_parts):
+                column_parts.append(df.iloc[:, i].copy())
+            del df
+
+        if columns is None:
+            # nothing to merge, pd.concat will raise
+            return self.merge_values(**kwargs)
+        return self._merge_columns_parts(columns, columns_parts, index_parts, **kwargs)
+
+    def _merge_columns_parts(self, columns, columns_parts, index_parts, **kwargs):
+        # same as _is_default_index of the frames
+        meaningful_index = kwargs.get("set_index") or not any(
+            isinstance(index, pd.RangeIndex) or index.name is None
+            for index in index_parts
+        )
+        if meaningful_index:
+            index = index_parts[0].append(index_parts[1:])
+            if not index.is_unique:
+                raise ValueError(
+                    "Indexes have overlapping values: %s"
+                    % list(index[index.duplicated()].unique())
+                )
+        else:
+            index = pd.RangeIndex(sum(len(i) for i in index_parts))
+
+        data = {}
+        for i, column in enumerate(columns):
+            column_value = pd.concat(columns_parts[i], ignore_index=True)
+            columns_parts[i] = None
+            column_value.index = index
+            data[column] = column_value
+        # the frame is built at once (adding columns one by one fragments it)
+        return pd.DataFrame(data, index=index, columns=columns)
+
 
 class PandasSeriesValueType(DataFrameValueType):
     type = pd.Series
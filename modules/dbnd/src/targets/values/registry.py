@@ -2,6 +2,7 @@ import inspect
 import itertools
 import logging
 import re
+import sys
 import typing
 
 from typing import Optional
@@ -20,6 +21,25 @@ def f_name(f):
 logger = logging.getLogger(__name__)
 
 
+class LazyValueTypes(object):
+    """
+    Placeholder for value types of a heavy library (pandas, numpy, ...)
+    We load them on first use only: once the library is imported (there can't be any value or type
+    of the library before that), or once one of the type names is requested by type string.
+    """
+
+    def __init__(self, module, loader, type_names):
+        self.module = module
+        self.loader = loader  # () -> List[ValueType]
+        self.type_names = type_names
+
+    def is_requested(self, type_str):
+        return any(name in type_str for name in self.type_names)
+
+    def __repr__(self):
+        return "LazyValueTypes(%s)" % self.module
+
+
 class ValueTypeRegistry(object):
     def __init__(self, known_value_types):
         self.value_types = []
@@ -29,16 +49,61 @@ class ValueTypeRegistry(object):
         # now for every parameter we also have text representation of the type
         # will be used for annotations
         self.type_str_to_parameter = {}
-        for value_type in known_value_types:
-            self.register_value_type(value_type)
+
+        # lazy value types are loaded in place, as the order of value types matters
+        self._known_value_types = list(known_value_types)
+        self._lazy_value_types = [
+            v for v in self._known_value_types if isinstance(v, LazyValueTypes)
+        ]
+        for value_type in self._known_value_types:
+            if not isinstance(value_type, LazyValueTypes):
+                self.register_value_type(value_type)
 
         self._type_handler_from_type = TypeHandlerFromType(self)
         self._type_handler_from_type_str = TypeHandlerFromDocAnnotation(self)
 
+    def _load_lazy_value_types(self, type_str=None, load_all=False):
+        to_load = [
+            lazy
+            for lazy in self._lazy_value_types
+            if load_all
+            or lazy.module in sys.modules
+            or (type_str and lazy.is_requested(type_str))
+        ]
+        if not to_load:
+            return
+
+        for lazy in to_load:
+            self._lazy_value_types.remove(lazy)
+            try:
+                loaded = lazy.loader()
+            except ImportError:
+                logger.debug("Failed to load value types of %s", lazy.module)
+                loaded = []
+            idx = self._known_value_types.index(lazy)
+            self._known_value_types[idx : idx + 1] = loaded
+            for value_type in loaded:
+                self._register_type_str(value_type)
+
+        # rebuild lists with the right order, value types registered at runtime go last
+        known_value_types = [
+            v for v in self._known_value_types if not isinstance(v, LazyValueTypes)
+        ]
+        known_ids = set(id(v) for v in known_value_types)
+        value_types = known_value_types + [
+            v for v in self.value_types if id(v) not in known_ids
+        ]
+        self.value_types = value_types
+        self.discoverable_value_types = [v for v in value_types if v.discoverable]
+
     def register_value_type(self, value_type):
         self.value_types.append(value_type)
         if value_type.discoverable:
             self.discoverable_value_types.append(value_type)
+        self._register_type_str(value_type)
+        return value_type
+
+    def _register_type_str(self, value_type):
         try:
             # for t in [value_type.type]:
 
@@ -56,12 +121,13 @@ class ValueTypeRegistry(object):
                     self.type_str_to_parameter[t] = value_type
         except Exception as ex:
             raise Exception("Failed to process %s: %s" % (value_type, ex))
-        return value_type
 
     def get_value_type_of_obj(self, value, default=None):
         # do we want to automatically parse str_list?
         # right now we do that, but as for obj_list
         # we can keep deterministic conversion only
+        if self._lazy_value_types:
+            self._load_lazy_value_types()
 
         for item in self.discoverable_value_types:
             if item.is_type_of(value):
@@ -73,15 +139,20 @@ class ValueTypeRegistry(object):
             return type_
         elif isinstance(type_, type) and issubclass(type_, ValueType):
             return type_()
+        if self._lazy_value_types:
+            self._load_lazy_value_types()
         return self._type_handler_from_type.get_value_type_of_type(
             type_=type_, inline_value_type=inline_value_type
         )
 
     def get_value_type_of_type_str(self, type_str):
         # type: (str) -> Optional[ValueType]
+        if self._lazy_value_types:
+            self._load_lazy_value_types(type_str=type_str)
         return self._type_handler_from_type_str.get_value_type_of_type_str(type_str)
 
     def list_known_types(self):
+        self._load_lazy_value_types(load_all=True)
         return list(self.type_str_to_parameter.keys())
 
 
@@ -262,7 +262,7 @@ class ListValueType(_StructureValueType, Iterable):
     def _parse_from_str_simple(self, value):
         return value.split(",")
 
-    def merge_values(self, *values):
+    def merge_values(self, *values, **kwargs):
         return list(itertools.chain(*values))
 
 
@@ -3,6 +3,7 @@ import copy
 import hashlib
 import logging
 import re
+import sys
 
 from typing import Any, Optional, Tuple, Union
 
@@ -55,6 +56,12 @@ class ValueType(object):
     def merge_values(self, *values, **kwargs):
         pass
 
+    def merge_values_iter(self, values, **kwargs):
+        """
+        Merges values produced by iterator (partitions are read one by one).
+        """
+        return self.merge_values(*list(values), **kwargs)
+
     def is_type_of(self, value):
         return self.type is not None and type(value) == self.type
 
@@ -275,6 +282,12 @@ class ValueType(object):
     def get_data_hash(self, value):
         return fast_hasher.hash(value)
 
+    def get_value_size(self, value):  # type: (Any) -> int
+        """
+        estimated memory footprint of the value in bytes
+        """
+        return sys.getsizeof(value)
+
     def get_value_meta(self, value, with_preview=True):
         data_dimensions = self.get_data_dimensions(value)
         if data_dimensions is not None:
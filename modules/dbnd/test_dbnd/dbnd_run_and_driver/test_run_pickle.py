@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 
 import logging
+import os
 import zlib
 
 from typing import List
@@ -8,14 +9,25 @@ from typing import List
 import pandas as pd
 import pytest
 
-from dbnd import new_dbnd_context, output, override, parameter, pipeline, task
-from dbnd._core.constants import TaskExecutorType
+from dbnd import (
+    PipelineTask,
+    new_dbnd_context,
+    output,
+    override,
+    parameter,
+    pipeline,
+    task,
+)
+from dbnd._core.constants import TaskExecutorType, TaskRunState
 from dbnd._core.run.databand_run import DatabandRun
+from dbnd._core.run.run_snapshot import SNAPSHOT_MAGIC
 from dbnd._core.settings import CoreConfig, RunConfig
+from dbnd._core.task_ctrl.task_dag import topological_sort
 from dbnd._vendor.cloudpickle import cloudpickle
 from dbnd.tasks import PythonTask
 from dbnd.testing.helpers import initialized_run
 from test_dbnd.factories import TTask
+from test_dbnd.scenarios.pipelines.pipe_4tasks import B_F4Task, MainPipeline
 
 
 logger = logging.getLogger(__name__)
@@ -64,6 +76,14 @@ def pipeline_with_generics(selected_partners):
     return partner_data
 
 
+class TTwoLevelPipeline(PipelineTask):
+    t_output = output
+
+    def band(self):
+        main = MainPipeline()
+        self.t_output = B_F4Task(a1_input=main.c_output).o_output
+
+
 class TestRunPickle(object):
     def _save_graph(self, task):
         with new_dbnd_context(
@@ -97,6 +117,60 @@ class TestRunPickle(object):
         actual = DatabandRun.load_run(r.driver_dump, False)
         assert actual
 
+    def test_save_task_run_snapshot(self):
+        task = generate_huge_task(200)
+        with new_dbnd_context(
+            conf={
+                RunConfig.task_executor_type: override(TaskExecutorType.local),
+                CoreConfig.tracker: override(["console"]),
+            }
+        ) as dc:
+            r = dc.dbnd_run_task(task_or_task_name=task)
+            r.save_run()
+
+        task_run = r.get_task_run_by_id(task.task_id)
+        snapshot = r.save_task_run_snapshot(task_run)
+        assert snapshot != r.driver_dump
+        with snapshot.open("rb") as fp:
+            assert fp.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+        # only the task, its upstream, root and driver are saved
+        assert os.path.getsize(snapshot.path) * 2 < os.path.getsize(r.driver_dump.path)
+        # the live run is not changed by the dump
+        assert len(r.task_runs) > 200
+
+        loaded_run = DatabandRun.load_run(
+            dump_file=snapshot, disable_tracking_api=False
+        )
+        assert loaded_run.get_task_run_by_id(task.task_id)
+        assert len(loaded_run.task_runs) < 10
+
+    def test_task_execute_from_task_run_snapshot(self):
+        with new_dbnd_context(
+            conf={
+                RunConfig.task_executor_type: override(TaskExecutorType.local),
+                CoreConfig.tracker: override(["console"]),
+            }
+        ):
+            with initialized_run(TTwoLevelPipeline(task_version="now")) as r:
+                tasks = topological_sort(
+                    [tr.task for tr in r.task_runs if not tr.is_system]
+                )
+                # every task is executed from its own snapshot (as `task_execute`)
+                for t in tasks:
+                    snapshot = r.save_task_run_snapshot(r.get_task_run_by_id(t.task_id))
+                    assert snapshot != r.driver_dump
+
+                    loaded_run = DatabandRun.load_run(
+                        dump_file=snapshot, disable_tracking_api=False
+                    )
+                    assert len(loaded_run.task_runs) < len(r.task_runs)
+                    with loaded_run.run_context() as dr:
+                        task_run = dr.get_task_run_by_id(t.task_id)
+                        task_run.runner.execute(allow_resubmit=False)
+                        assert task_run.task_run_state == TaskRunState.SUCCESS
+
+                assert r.root_task.t_output.read() == "done B\n"
+
     def _benchmark_pipeline_save(
         self, benchmark, pipeline, pickle_func=cloudpickle.dumps
     ):
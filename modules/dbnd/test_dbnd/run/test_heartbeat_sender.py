@@ -0,0 +1,66 @@
+import threading
+
+from dbnd import config, dbnd_run_cmd
+from dbnd._core.constants import RunState
+from dbnd._core.task_executor import heartbeat_sender
+from dbnd._core.task_executor.heartbeat_sender import HeartbeatThread
+
+
+class _HeartbeatStore(object):
+    def __init__(self, run_state=RunState.RUNNING.value):
+        self.run_state = run_state
+        self.heartbeats = []
+        self.sent = threading.Event()
+
+    def heartbeat(self, run_uid):
+        self.heartbeats.append(run_uid)
+        self.sent.set()
+        return self.run_state
+
+
+class TestHeartbeatThread(object):
+    def test_heartbeat_of_every_run(self):
+        heartbeat_thread = HeartbeatThread()
+        first, second = _HeartbeatStore(), _HeartbeatStore()
+        heartbeat_thread.add_run("first", first, 0.01)
+        heartbeat_thread.add_run("second", second, 0.01)
+        assert first.sent.wait(5) and second.sent.wait(5)
+
+        stats = heartbeat_thread.remove_run("first")
+        assert stats.sent >= 1
+        assert not stats.failed
+        heartbeat_thread.remove_run("second")
+
+        assert set(first.heartbeats) == {"first"}
+        assert set(second.heartbeats) == {"second"}
+
+    def test_shutdown_kills_driver(self, monkeypatch):
+        killed = []
+        monkeypatch.setattr(
+            heartbeat_sender.os, "kill", lambda pid, sig: killed.append(pid)
+        )
+        heartbeat_thread = HeartbeatThread()
+        store = _HeartbeatStore(run_state=RunState.SHUTDOWN.value)
+        heartbeat_thread.add_run("run", store, 10)
+        assert store.sent.wait(5)
+        sender = heartbeat_thread._thread
+        heartbeat_thread.remove_run("run")
+        sender.join(5)
+
+        assert killed == [heartbeat_sender.os.getpid()]
+
+    def test_run_with_heartbeat_thread(self, monkeypatch):
+        heartbeat_thread = heartbeat_sender.HEARTBEAT_THREAD
+        added = []
+        add_run = heartbeat_thread.add_run
+        monkeypatch.setattr(
+            heartbeat_thread,
+            "add_run",
+            lambda run_uid, *args: added.append(run_uid) or add_run(run_uid, *args),
+        )
+        with config(
+            {"run": {"heartbeat_interval_s": 1, "heartbeat_sender_mode": "thread"}}
+        ):
+            dbnd_run_cmd(["dbnd_sanity_check"])
+        assert len(added) == 1
+        assert not heartbeat_thread._runs
@@ -0,0 +1,54 @@
+import pytest
+
+from dbnd import new_dbnd_context
+from dbnd._core.constants import TaskExecutorType, TaskRunState
+from dbnd._core.errors import DatabandRunError
+from test_dbnd.run.test_fail_fast import FailFastPipeline
+from test_dbnd.scenarios.pipelines.pipe_4tasks import MainPipeline
+
+
+LOCAL_PARALLEL_CONF = {
+    "run": {
+        "task_executor_type": TaskExecutorType.local_parallel,
+        "parallel_pool_size": "2",
+    },
+    "core": {"always_save_pipeline": "True"},
+}
+
+
+class TestLocalParallelExecutor(object):
+    def test_pipeline(self):
+        with new_dbnd_context(conf=LOCAL_PARALLEL_CONF):
+            run = MainPipeline(task_version="now").dbnd_run()
+
+        assert run.task_executor_type == TaskExecutorType.local_parallel
+        assert run.root_task_run.task_run_state == TaskRunState.SUCCESS
+
+    def test_fail_fast(self):
+        with new_dbnd_context(conf=LOCAL_PARALLEL_CONF):
+            with pytest.raises(DatabandRunError, match="Failed tasks are:"):
+                FailFastPipeline(task_version="now").dbnd_run()
+
+    def test_task_process_not_started(self, monkeypatch):
+        from dbnd._core.task_executor import local_parallel_task_executor
+
+        def _popen(cmd):
+            raise OSError("can't start the process")
+
+        monkeypatch.setattr(local_parallel_task_executor.subprocess, "Popen", _popen)
+        with new_dbnd_context(conf=LOCAL_PARALLEL_CONF):
+            with pytest.raises(DatabandRunError, match="Failed tasks are:"):
+                MainPipeline(task_version="now").dbnd_run()
+
+    def test_task_snapshot_failed(self, monkeypatch):
+        from dbnd._core.run.databand_run import DatabandRun
+
+        def _save_task_run_snapshot(run, task_run):
+            raise ValueError("can't pickle the run")
+
+        monkeypatch.setattr(
+            DatabandRun, "save_task_run_snapshot", _save_task_run_snapshot
+        )
+        with new_dbnd_context(conf=LOCAL_PARALLEL_CONF):
+            with pytest.raises(DatabandRunError, match="Failed tasks are:"):
+                MainPipeline(task_version="now").dbnd_run()
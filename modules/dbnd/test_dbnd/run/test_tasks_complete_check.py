@@ -0,0 +1,87 @@
+import logging
+
+import pytest
+
+from dbnd import PipelineTask, output
+from dbnd._core.run.task_runs_builder import find_tasks_to_skip_complete
+from dbnd._core.run.tasks_complete_check import TasksCompleteChecker
+from targets import target
+from targets.fs.local import LocalFileSystem
+from test_dbnd.factories import TTask, TTaskWithInput
+
+
+logger = logging.getLogger(__name__)
+
+
+class TFanInPipeline(PipelineTask):
+    result = output
+
+    def band(self):
+        tasks = [TTask(t_param=str(i)) for i in range(5)]
+        self.result = TTaskWithInput(t_input=tasks[0].t_output, task_name="fan_in")
+        for t in tasks:
+            self.result.set_upstream(t)
+
+
+class _ExistsManyFileSystem(LocalFileSystem):
+    def __init__(self):
+        super(_ExistsManyFileSystem, self).__init__()
+        self.exists_many_calls = []
+
+    def exists_many(self, paths):
+        self.exists_many_calls.append(list(paths))
+        return [self.exists(path) for path in paths]
+
+    def listdir(self, path):
+        raise AssertionError("Unexpected listing of %s" % path)
+
+
+class TestTasksCompleteCheck(object):
+    @pytest.mark.parametrize(
+        "parallelism, listing_threshold", [(1, 0), (4, 0), (4, 1), (4, 100)]
+    )
+    def test_completed_pipeline(self, parallelism, listing_threshold):
+        TFanInPipeline().dbnd_run()
+
+        pipeline = TFanInPipeline()
+        all_tasks = pipeline.ctrl.task_dag.subdag_tasks()
+        completed, skipped = find_tasks_to_skip_complete(
+            [pipeline],
+            all_tasks,
+            parallelism=parallelism,
+            listing_threshold=listing_threshold,
+        )
+        # pipeline is complete, so we don't even look at upstream tasks
+        assert completed == {pipeline}
+        assert skipped == all_tasks - {pipeline}
+
+    def test_incomplete_upstream_is_traversed(self):
+        pipeline = TFanInPipeline(task_version="now")
+        checker = TasksCompleteChecker(parallelism=4, listing_threshold=2)
+        status = checker.find_completed([pipeline])
+
+        all_tasks = pipeline.ctrl.task_dag.subdag_tasks()
+        assert set(status.keys()) <= {t.task_id for t in all_tasks}
+        assert status[pipeline.task_id] is False
+        fan_in = [t for t in all_tasks if t.task_name == "fan_in"][0]
+        assert status[fan_in.task_id] is False
+        assert checker.stats.levels >= 2
+        assert checker.stats.tasks == len(status)
+
+    def test_same_folder_outputs_are_checked_together(self, tmpdir):
+        fs = _ExistsManyFileSystem()
+        paths = [
+            str(tmpdir.join("out", "a.txt")),
+            str(tmpdir.join("out", "b.txt")),
+            str(tmpdir.join("other", "c.txt")),
+        ]
+        tmpdir.join("out", "a.txt").write("", ensure=True)
+        targets = [target(path, fs=fs) for path in paths]
+
+        checker = TasksCompleteChecker(listing_threshold=2)
+        exists = checker._targets_exist(None, targets)
+
+        assert [exists[id(t)] for t in targets] == [True, False, False]
+        assert fs.exists_many_calls == [paths[:2]]
+        assert checker.stats.listing_calls == 1
+        assert checker.stats.exists_calls == 1
@@ -5,6 +5,7 @@ import pytest
 from targets import target
 from targets.dir_target import DEFAULT_FLAG_FILE_NAME
 from targets.target_config import file, folder
+from targets.utils.open_multiple import MultiTargetOpen
 from test_dbnd.targets_tests import TargetTestBase
 
 
@@ -37,6 +38,20 @@ class TestDirTarget(TargetTestBase):
         assert actual == expected
         assert len(actual) == 4
 
+    def test_read_lines_prefetch(self, s1_root_dir, s1_file_1_csv, s1_file_2_csv):
+        t = target(s1_root_dir)
+        expected = []
+        with MultiTargetOpen(t.list_partitions(), prefetch=0) as fp:
+            for line in fp:
+                expected.append((line, str(fp.filename()), fp.lineno()))
+
+        actual = []
+        with MultiTargetOpen(t.list_partitions(), prefetch=2) as fp:
+            for line in fp:
+                actual.append((line, str(fp.filename()), fp.lineno()))
+        assert actual == expected
+        assert len(actual) == 4
+
     def test_folder_flag(self, tmpdir):
         dir_path = str(tmpdir.join("dir.csv/"))
         os.makedirs(dir_path)
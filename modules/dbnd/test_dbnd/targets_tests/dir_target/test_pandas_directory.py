@@ -2,6 +2,8 @@ from __future__ import print_function
 
 import logging
 
+import pandas as pd
+
 from pandas.util.testing import assert_frame_equal
 
 from targets import target
@@ -55,6 +57,25 @@ class TestPandasFrameTargetCtrl(TargetTestBase):
         assert len(actual) == 2 * df_len
         assert_frame_equal(actual.head(df_len), pandas_data_frame_index)
 
+    def test_folder_partitions_streaming(self, pandas_data_frame):
+        t = self.target("dir/", config=file.parquet)
+        df = pandas_data_frame
+        t.as_pandas.to_parquet((df.iloc[i : i + 1] for i in range(len(df))))
+
+        partitions = list(
+            t.as_pandas.read_partitioned(
+                select_columns=["Births"],
+                partition_filter=lambda p: p[p["Births"] > 500],
+                prefetch=2,
+            )
+        )
+        assert len(partitions) == len(df)
+        actual = pd.concat(partitions, ignore_index=True)
+        expected = df[df["Births"] > 500][["Births"]].reset_index(drop=True)
+        assert_frame_equal(actual, expected)
+
+        assert_frame_equal(t.read_df(prefetch=3), df)
+
     def test_read_pandas_csv(self, s1_dir_with_csv, simple_df):
         t = target(s1_dir_with_csv[0])
         actual = t.read_df()
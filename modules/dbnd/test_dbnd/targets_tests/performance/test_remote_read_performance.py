@@ -0,0 +1,82 @@
+import logging
+import os
+import time
+
+import pytest
+
+from targets.utils.ranged_reader import open_ranged_reader
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class _SlowRemoteObject(object):
+    """
+    Emulates remote storage: every request has latency, the content is sent with limited bandwidth
+    """
+
+    def __init__(self, size, latency=0.02, bandwidth=100 * MB):
+        self.data = os.urandom(size)
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def read_range(self, start, end):
+        time.sleep(self.latency + float(end + 1 - start) / self.bandwidth)
+        return self.data[start : end + 1]
+
+    def download(self, local_file, chunk_size=10 * MB):
+        # previous open_read: the whole object is downloaded into the local temp file
+        with open(local_file, "wb") as fp:
+            for start in range(0, len(self.data), chunk_size):
+                end = min(start + chunk_size, len(self.data)) - 1
+                fp.write(self.read_range(start, end))
+        return open(local_file, "rb")
+
+
+@pytest.mark.skip("performance tests")
+class TestRemoteReadPerformance(object):
+    @pytest.mark.parametrize("size", [50 * MB, 200 * MB])
+    def test_time_to_first_byte(self, tmpdir, size):
+        remote = _SlowRemoteObject(size)
+
+        start = time.time()
+        local_file = str(tmpdir.join("download"))
+        with remote.download(local_file) as fp:
+            fp.read(100)
+            download_ttfb = time.time() - start
+            download_disk = os.path.getsize(local_file)
+
+        start = time.time()
+        with open_ranged_reader(remote.read_range, size, chunk_size=8 * MB) as fp:
+            fp.read(100)
+            ranged_ttfb = time.time() - start
+
+        logger.info(
+            "Time to first byte of %sMB: download %.2fs (%sMB on disk), ranged %.2fs (0MB on disk)",
+            size // MB,
+            download_ttfb,
+            download_disk // MB,
+            ranged_ttfb,
+        )
+        assert ranged_ttfb < download_ttfb
+
+    @pytest.mark.parametrize("read_ahead", [0, 1, 2])
+    def test_sequential_read(self, read_ahead):
+        size = 100 * MB
+        remote = _SlowRemoteObject(size)
+
+        start = time.time()
+        with open_ranged_reader(
+            remote.read_range, size, chunk_size=8 * MB, read_ahead=read_ahead
+        ) as fp:
+            while fp.read(MB):
+                # the consumer is busy with the data
+                time.sleep(0.005)
+        logger.info(
+            "Sequential read of %sMB with read_ahead=%s: %.2fs",
+            size // MB,
+            read_ahead,
+            time.time() - start,
+        )
@@ -0,0 +1,47 @@
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dbnd._vendor import fast_hasher
+from targets.utils.data_hash import SIGNATURE_HASH_CACHE
+from targets.values.pandas_values import DataFrameValueType, _hash_pandas_value
+
+
+logger = logging.getLogger(__name__)
+
+
+def _timeit(func, repeat=3):
+    start = time.time()
+    for _ in range(repeat):
+        func()
+    return (time.time() - start) / repeat
+
+
+@pytest.mark.skip("performance tests")
+class TestSignaturePerformance(object):
+    @pytest.mark.parametrize("rows", [10**5, 10**6])
+    def test_data_frame_signature(self, rows):
+        df = pd.DataFrame(
+            {
+                "a": np.arange(rows),
+                "b": np.random.rand(rows),
+                "c": np.random.choice(["x", "y", "z"], rows),
+            }
+        )
+        old = _timeit(lambda: fast_hasher.hash(df))
+        new = _timeit(lambda: _hash_pandas_value(df))
+
+        value_type = DataFrameValueType()
+        with SIGNATURE_HASH_CACHE.build_pass():
+            value_type.to_signature(df)
+            cached = _timeit(lambda: value_type.to_signature(df))
+        logger.info(
+            "%s rows: fast_hasher %.4fs, buffers hash %.4fs, memoised %.6fs",
+            rows,
+            old,
+            new,
+            cached,
+        )
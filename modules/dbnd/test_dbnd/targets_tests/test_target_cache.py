@@ -0,0 +1,76 @@
+import mock
+import numpy as np
+import pandas as pd
+import pytest
+
+from targets.caching import TargetCache, TargetCacheKey, estimate_value_size
+
+
+def _key(name):
+    return TargetCacheKey(target="/data/%s" % name, value_type="object")
+
+
+class TestTargetCache(object):
+    @pytest.fixture(autouse=True)
+    def enabled_cache(self):
+        with mock.patch.object(TargetCache, "enabled", True):
+            yield
+
+    def test_estimate_value_size(self, pandas_data_frame):
+        arr = np.zeros(1000, dtype=np.int64)
+        assert estimate_value_size(arr) == arr.nbytes
+        assert estimate_value_size(pandas_data_frame) == int(
+            pandas_data_frame.memory_usage(deep=True).sum()
+        )
+        assert estimate_value_size("some string") > 0
+
+    def test_unbounded(self):
+        cache = TargetCache()
+        for i in range(10):
+            cache[_key(i)] = np.zeros(1000)
+        assert all(_key(i) in cache for i in range(10))
+        assert cache.stats.evictions == 0
+
+    def test_lru_eviction(self):
+        cache = TargetCache(max_size=3 * 8000)
+        for i in range(3):
+            cache[_key(i)] = np.zeros(1000)
+
+        # touch the first one, so the second one is the least recently used
+        assert cache.get(_key(0)) is not None
+        cache[_key(3)] = np.zeros(1000)
+
+        assert _key(1) not in cache
+        assert _key(0) in cache
+        assert _key(3) in cache
+        assert cache.stats.evictions == 1
+        assert cache.stats.size <= cache.max_size
+
+    def test_pinned_targets_are_evicted_last(self):
+        cache = TargetCache(max_size=2 * 8000)
+        cache[_key(0)] = np.zeros(1000)
+        cache[_key(1)] = np.zeros(1000)
+        cache.pin_targets([_key(0).target])
+
+        cache[_key(2)] = np.zeros(1000)
+        assert _key(0) in cache
+        assert _key(1) not in cache
+
+    def test_too_big_value_is_not_cached(self):
+        cache = TargetCache(max_size=100)
+        cache[_key(0)] = pd.DataFrame(data=np.zeros((100, 10)))
+        assert _key(0) not in cache
+        assert cache.stats.rejected == 1
+
+    def test_stats(self):
+        cache = TargetCache(max_size=10 * 8000)
+        cache[_key(0)] = np.zeros(1000)
+        cache.get(_key(0))
+        cache.get(_key(1))
+
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.size == 8000
+
+        cache.clear_for_targets([_key(0).target])
+        assert cache.stats.size == 0
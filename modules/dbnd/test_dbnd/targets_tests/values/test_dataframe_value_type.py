@@ -1,6 +1,11 @@
+import warnings
+
+import pandas as pd
 import six
 
+from dbnd import new_dbnd_context, pipeline, task
 from dbnd._core.utils import json_utils
+from targets.utils.data_hash import SIGNATURE_HASH_CACHE
 from targets.values.pandas_values import DataFrameValueType
 
 
@@ -22,3 +27,100 @@ class TestDataFrameValueType(object):
         schema = DataFrameValueType().get_data_schema(pandas_data_frame)
         assert isinstance(schema, six.string_types)
         assert schema == expected_schema
+
+    def test_merge_values_iter_wide(self):
+        df = pd.DataFrame({"c%s" % i: range(10) for i in range(200)})
+        parts = [df.iloc[:5], df.iloc[5:]]
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", pd.errors.PerformanceWarning)
+            merged = DataFrameValueType().merge_values_iter(iter(parts))
+        pd.testing.assert_frame_equal(merged, df)
+
+    def test_merge_values_iter_multi_index_columns(self):
+        df = pd.DataFrame(
+            [[1, 2], [3, 4]],
+            columns=pd.MultiIndex.from_tuples([("a", "x"), ("a", "y")]),
+        )
+        merged = DataFrameValueType().merge_values_iter(iter([df, df]))
+        assert isinstance(merged.columns, pd.MultiIndex)
+        pd.testing.assert_frame_equal(merged, pd.concat([df, df], ignore_index=True))
+
+    def test_value_meta_sampled_hash(self):
+        df = pd.DataFrame({"a": range(1000), "b": ["x"] * 1000})
+        with new_dbnd_context(
+            conf={"value_meta": {"hash_mode": "auto", "hash_sample_size": "100"}}
+        ):
+            meta = DataFrameValueType().get_value_meta(df)
+            same_sample = df.copy()
+            same_sample.iloc[1, 0] = -1  # not in the sample
+            assert DataFrameValueType().get_data_hash(same_sample) == meta.data_hash
+
+        assert meta.meta_strategy == {"hash": "sampled", "hash_sample_size": 100}
+        assert json_utils.loads(meta.data_schema)["meta_strategy"] == meta.meta_strategy
+        assert meta.data_dimensions == [1000, 2]
+
+    def test_value_meta_full_hash(self, pandas_data_frame):
+        meta = DataFrameValueType().get_value_meta(pandas_data_frame)
+        assert meta.meta_strategy is None
+        assert meta.data_hash
+        assert meta.value_preview
+
+    def test_value_meta_full_hash_by_default(self):
+        df = pd.DataFrame({"a": range(1000)})
+        with new_dbnd_context(conf={"value_meta": {"hash_sample_size": "100"}}):
+            meta = DataFrameValueType().get_value_meta(df)
+            changed = df.copy()
+            changed.iloc[1, 0] = -1
+            assert DataFrameValueType().get_data_hash(changed) != meta.data_hash
+        assert meta.meta_strategy is None
+
+    def test_value_meta_time_budget(self, pandas_data_frame):
+        with new_dbnd_context(
+            conf={"value_meta": {"hash_mode": "none", "time_budget": "-1"}}
+        ):
+            meta = DataFrameValueType().get_value_meta(pandas_data_frame)
+        assert meta.data_hash is None
+        assert meta.value_preview is None
+        assert meta.meta_strategy == {"hash": "none", "skipped": ["preview"]}
+
+    def test_signature(self, pandas_data_frame):
+        value_type = DataFrameValueType()
+        signature = value_type.to_signature(pandas_data_frame)
+        assert signature.startswith("[5,2]:")
+        assert value_type.to_signature(pandas_data_frame.copy()) == signature
+
+        changed = pandas_data_frame.copy()
+        changed.iloc[0, 1] = -1
+        assert value_type.to_signature(changed) != signature
+
+    def test_signature_cache(self):
+        df = pd.DataFrame({"a": range(100)})
+        misses = SIGNATURE_HASH_CACHE.misses
+        with SIGNATURE_HASH_CACHE.build_pass():
+            signature = DataFrameValueType().to_signature(df)
+            assert DataFrameValueType().to_signature(df) == signature
+        assert SIGNATURE_HASH_CACHE.misses == misses + 1
+
+        # nothing is cached between the passes, any in place change is detected
+        df.iloc[42, 0] = -1
+        with SIGNATURE_HASH_CACHE.build_pass():
+            assert DataFrameValueType().to_signature(df) != signature
+        assert SIGNATURE_HASH_CACHE.misses == misses + 2
+
+    def test_signature_cache_in_pipeline(self):
+        @task
+        def t_df(df):
+            # type: (pd.DataFrame) -> pd.DataFrame
+            return df
+
+        @pipeline
+        def t_df_pipeline(df):
+            # type: (pd.DataFrame) -> pd.DataFrame
+            t_df(df, task_name="t_df_2")
+            return t_df(df)
+
+        df = pd.DataFrame({"a": range(100)})
+        misses = SIGNATURE_HASH_CACHE.misses
+        t_df_pipeline.task(df=df)
+        # the pipeline and its tasks are built in the same pass
+        assert SIGNATURE_HASH_CACHE.misses == misses + 1
@@ -1,6 +1,15 @@
+import linecache
 import logging
+import os
+import subprocess
+import sys
+import time
+import types
+
+import pytest
 
 from dbnd import Task, task
+from dbnd._core.task_build import task_definition
 from dbnd._core.task_build.task_definition import TaskDefinition
 
 
@@ -22,3 +31,82 @@ class TestSignature(object):
 
         td = TaskDefinition(TdTask, {}, "td")
         assert td
+
+
+class TestTaskSourceCode(object):
+    def test_source_code_is_lazy(self, monkeypatch):
+        calls = []
+
+        def _get_source(task):
+            calls.append(task)
+            return "task source"
+
+        monkeypatch.setattr(task_definition, "_get_task_source_code", _get_source)
+
+        @task
+        def lazy_source_task():
+            pass
+
+        td = lazy_source_task.task.task_definition
+        assert not calls
+        assert td.task_source_code == "task source"
+        assert td.task_source_code == "task source"
+        assert len(calls) == 1
+
+        td.task_source_code = "overridden"
+        assert td.task_source_code == "overridden"
+
+    def test_module_source_code_is_shared(self):
+        @task
+        def first_task():
+            pass
+
+        @task
+        def second_task():
+            pass
+
+        first_td = first_task.task.task_definition
+        second_td = second_task.task.task_definition
+        assert "def first_task" in first_td.task_source_code
+        assert "class TestTaskSourceCode" in first_td.task_module_code
+        assert first_td.task_module_code is second_td.task_module_code
+        assert first_td.task_source_file == second_td.task_source_file
+
+    def test_module_source_code_is_refreshed(self, tmpdir):
+        module_file = tmpdir.join("source_cache_module.py")
+        module_file.write("x = 1\n")
+        module = types.ModuleType("source_cache_module")
+        module.__file__ = str(module_file)
+
+        first = task_definition._get_module_source_code(module)
+        assert first == "x = 1\n"
+        assert task_definition._get_module_source_code(module) is first
+
+        module_file.write("x = 2\n")
+        os.utime(str(module_file), (time.time() + 10, time.time() + 10))
+        linecache.checkcache(str(module_file))
+        assert task_definition._get_module_source_code(module) == "x = 2\n"
+
+    @pytest.mark.skip("performance tests")
+    def test_import_time_of_many_tasks(self, tmpdir):
+        tasks_count = 1000
+        module_file = tmpdir.join("many_tasks.py")
+        module_file.write(
+            "from dbnd import task\n\n"
+            + "".join(
+                "\n@task\ndef task_%s(a=%s, b='b'):\n    return a\n" % (i, i)
+                for i in range(tasks_count)
+            )
+        )
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                "-c",
+                "import sys, time; sys.path.insert(0, %r); import dbnd; "
+                "start = time.time(); import many_tasks; "
+                "print(time.time() - start)" % str(tmpdir),
+            ]
+        ).decode("utf-8")
+        import_time = float(output.strip().splitlines()[-1])
+        logger.info("Import of %s tasks: %.2fs", tasks_count, import_time)
+        assert import_time < tasks_count * 0.001
@@ -1,5 +1,6 @@
 from mock import Mock
 
+from dbnd._core.constants import TaskRunState
 from dbnd._core.task_run.task_run_meta_files import TaskRunMetaFiles
 from dbnd._core.task_run.task_run_tracker import TaskRunTracker
 from dbnd._core.tracking.tracking_store_file import (
@@ -37,3 +38,41 @@ class TestFileMetricsStore(object):
             "df.shape_0_": 5.0,
             "df.shape_1_": 2.0,
         }
+
+    def test_buffered_metrics(self, tmpdir):
+        metrics_folder = target(str(tmpdir))
+
+        task_run = Mock()
+        task_run.meta_files = TaskRunMetaFiles(metrics_folder)
+        t = FileTrackingStore(metrics_buffer_size=1024, metrics_flush_interval=60)
+        tr_tracker = TaskRunTracker(task_run=task_run, tracking_store=t)
+        for i in range(10):
+            tr_tracker.log_metric("a", i)
+
+        reader = TaskRunMetricsFileStoreReader(metrics_folder)
+        assert not task_run.meta_files.get_metric_target("a").exists()
+
+        t.set_task_run_state(task_run, TaskRunState.SUCCESS)
+        assert [m.value for m in reader.get_metric_history("a")] == list(range(10))
+
+    def test_compact_metrics(self, tmpdir, pandas_data_frame):
+        metrics_folder = target(str(tmpdir))
+
+        task_run = Mock()
+        task_run.meta_files = TaskRunMetaFiles(metrics_folder)
+        t = FileTrackingStore(metrics_compact=True)
+        tr_tracker = TaskRunTracker(task_run=task_run, tracking_store=t)
+        tr_tracker.log_metric("a", 1)
+        tr_tracker.log_metric("a", 2)
+        tr_tracker.log_metric("a_string", "1")
+        tr_tracker.log_metric("multiline", "first\nsecond")
+        t.flush()
+
+        reader = TaskRunMetricsFileStoreReader(metrics_folder)
+        assert reader.get_all_metrics_values() == {
+            "a": 1.0,
+            "a_string": 1.0,
+            "multiline": "first\nsecond",
+        }
+        assert [m.value for m in reader.get_metric_history("a")] == [1.0, 2.0]
+        assert reader.get_metric("multiline").value == "first\nsecond"
@@ -0,0 +1,116 @@
+import logging
+import random
+import time
+
+import pytest
+
+from dbnd._core.task_ctrl.task_dag import TaskDagIndex, all_subdags, topological_sort
+from test_dbnd.factories import TTask
+from test_dbnd.scenarios.pipelines.pipe_4tasks import MainPipeline
+
+
+logger = logging.getLogger(__name__)
+
+
+class _SyntheticDagNode(object):
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.upstream_task_ids = set()
+
+    @property
+    def ctrl(self):
+        return self
+
+    @property
+    def task_dag(self):
+        return self
+
+
+def _synthetic_dag(size, max_upstream=3, seed=42):
+    rnd = random.Random(seed)
+    nodes = [_SyntheticDagNode("task_%s" % i) for i in range(size)]
+    for i, node in enumerate(nodes[1:], start=1):
+        for _ in range(rnd.randint(1, max_upstream)):
+            node.upstream_task_ids.add(nodes[rnd.randrange(i)].task_id)
+    rnd.shuffle(nodes)
+    return nodes
+
+
+def _assert_topological(sorted_tasks, tasks):
+    assert len(sorted_tasks) == len(tasks)
+    position = {t.task_id: i for i, t in enumerate(sorted_tasks)}
+    for t in tasks:
+        for upstream_id in t.ctrl.task_dag.upstream_task_ids:
+            if upstream_id in position:
+                assert position[upstream_id] < position[t.task_id]
+
+
+class TestTaskDag(object):
+    def test_topological_sort(self):
+        pipeline = MainPipeline()
+        tasks = pipeline.ctrl.task_dag.subdag_tasks()
+        sorted_tasks = pipeline.ctrl.task_dag.topological_sort()
+
+        _assert_topological(sorted_tasks, tasks)
+        assert sorted_tasks[-1] == pipeline
+
+    def test_subdag_tasks_cache_is_invalidated(self):
+        task = TTask(t_param="subdag_cache")
+        assert task.ctrl.task_dag.subdag_tasks() == {task}
+
+        upstream = TTask(t_param="subdag_cache_upstream")
+        task.set_upstream(upstream)
+        assert task.ctrl.task_dag.subdag_tasks() == {task, upstream}
+
+    def test_subdag_tasks_resolves_replaced_tasks(self):
+        class TNoCacheTask(TTask):
+            _dbnd_no_cache = True
+
+        task = TTask(t_param="subdag_replaced")
+        task.set_upstream(TNoCacheTask(t_param="subdag_replaced_upstream"))
+        task.ctrl.task_dag.subdag_tasks()
+
+        # new object with the same task_id
+        replaced = TNoCacheTask(t_param="subdag_replaced_upstream")
+        subdag = task.ctrl.task_dag.subdag_tasks()
+        assert len(subdag) == 2
+        assert any(t is replaced for t in subdag)
+
+    def test_all_subdags(self):
+        first, second = TTask(t_param="first"), TTask(t_param="second")
+        upstream = TTask(t_param="shared_upstream")
+        first.set_upstream(upstream)
+        second.set_upstream(upstream)
+
+        assert all_subdags([first, second]) == {first, second, upstream}
+
+    def test_index_ignores_external_edges(self):
+        nodes = _synthetic_dag(100)
+        subset = nodes[:50]
+        dag = TaskDagIndex(subset + subset[:10])
+
+        assert len(dag) == 50
+        for node in subset:
+            assert set(dag.upstream_task_ids(node.task_id)) == {
+                t.task_id for t in subset if t.task_id in node.upstream_task_ids
+            }
+        _assert_topological(dag.topological_sort(), subset)
+
+    @pytest.mark.parametrize("size", [10000])
+    def test_synthetic_dag(self, size):
+        nodes = _synthetic_dag(size)
+        _assert_topological(topological_sort(nodes), nodes)
+
+
+@pytest.mark.skip("performance tests")
+class TestTaskDagPerformance(object):
+    @pytest.mark.parametrize("size", [10000, 100000])
+    def test_topological_sort_performance(self, size):
+        nodes = _synthetic_dag(size)
+
+        start = time.time()
+        sorted_tasks = topological_sort(nodes)
+        logger.info(
+            "topological_sort of %s tasks took %.3fs", size, time.time() - start
+        )
+        _assert_topological(sorted_tasks, nodes)
@@ -0,0 +1,61 @@
+import logging
+import time
+
+from dbnd import new_dbnd_context, task
+from dbnd._core.task_run.task_run_tracker import TaskRunTracker
+
+
+logger = logging.getLogger(__name__)
+
+
+@task
+def t_verbose_log(lines=1000, sleep=0.0):
+    for i in range(lines):
+        logger.info("log line %s", i)
+    time.sleep(sleep)
+    return lines
+
+
+def _run_and_collect_previews(monkeypatch, log_config, **kwargs):
+    previews = []
+    monkeypatch.setattr(
+        TaskRunTracker,
+        "save_task_run_log",
+        lambda self, log_preview: previews.append((self.task_run, log_preview)),
+    )
+    with new_dbnd_context(conf={"log": log_config}):
+        run = t_verbose_log.dbnd_run(**kwargs)
+    task_run = run.root_task_run
+    return [p for tr, p in previews if tr is task_run], task_run
+
+
+class TestTaskLogPreview(object):
+    def test_tail_preview(self, monkeypatch):
+        previews, task_run = _run_and_collect_previews(
+            monkeypatch, {"send_body_to_server_max_size": 1000}
+        )
+        assert len(previews[-1]) <= 1000
+        assert "log line 999" in previews[-1]
+        assert "log line 0\n" not in previews[-1]
+        assert previews[-1] == task_run.log.read_log_preview(1000)
+
+    def test_head_preview(self, monkeypatch):
+        previews, _ = _run_and_collect_previews(
+            monkeypatch, {"send_body_to_server_max_size": -1000}
+        )
+        assert len(previews[-1]) <= 1000
+        assert previews[-1].endswith(")")
+        assert "log line 999" not in previews[-1]
+
+    def test_full_log(self, monkeypatch):
+        previews, task_run = _run_and_collect_previews(
+            monkeypatch, {"send_body_to_server_max_size": 0}
+        )
+        assert previews[-1] == task_run.log.read_log_body()
+
+    def test_live_preview(self, monkeypatch):
+        previews, _ = _run_and_collect_previews(
+            monkeypatch, {"send_body_to_server_interval_s": 0.1}, lines=10, sleep=0.5
+        )
+        # sent while the task is running and once it's finished
+        assert len(previews) >= 2
@@ -0,0 +1,140 @@
+import json
+import os
+
+import pytest
+
+from dbnd._core.task_run.task_sync_ctrl import (
+    FileHashManifest,
+    TaskSyncCtrl,
+    get_file_hash_manifest,
+)
+from dbnd.testing.helpers import initialized_run
+from targets import target
+from targets.fs.local import LocalFileSystem
+from test_dbnd.factories import TTask
+
+
+class _CountingSyncCtrl(TaskSyncCtrl):
+    def __init__(self, task_run, remote_root, manifest_file):
+        super(_CountingSyncCtrl, self).__init__(task_run=task_run)
+        self.remote_sync_root = target(remote_root, "deploy/")
+        self.manifest_file = manifest_file
+        self.uploaded = []
+        self.exists_calls = 0
+
+    @property
+    def file_hashes(self):
+        return get_file_hash_manifest(self.manifest_file)
+
+    def _upload(self, local_file, remote_file):
+        self.uploaded.append(os.path.basename(local_file.path))
+        super(_CountingSyncCtrl, self)._upload(local_file, remote_file)
+
+    def _exists(self, remote_file):
+        self.exists_calls += 1
+        return super(_CountingSyncCtrl, self)._exists(remote_file)
+
+
+@pytest.fixture
+def manifest_file(tmpdir):
+    return str(tmpdir.join("file_hashes.json"))
+
+
+@pytest.fixture
+def local_files(tmpdir):
+    files = []
+    for name in ["a.jar", "b.jar", "c.py"]:
+        f = tmpdir.join("local", name)
+        f.write("content of %s" % name, ensure=True)
+        files.append(str(f))
+    return files
+
+
+class TestTaskSyncCtrl(object):
+    def test_sync_files_by_content_hash(self, tmpdir, local_files, manifest_file):
+        remote_root = str(tmpdir.join("remote"))
+        with initialized_run(TTask()) as r:
+            deploy = _CountingSyncCtrl(r.root_task_run, remote_root, manifest_file)
+            synced = deploy.sync_files(local_files)
+
+            assert sorted(deploy.uploaded) == ["a.jar", "b.jar", "c.py"]
+            for local_file, remote_file in zip(local_files, synced):
+                file_hash = deploy.file_hashes.get_hash(local_file)
+                assert remote_file.endswith(
+                    "/deploy/%s/%s" % (file_hash, os.path.basename(local_file))
+                )
+                assert target(remote_file).read() == target(local_file).read()
+
+            # already synced by this ctrl, no remote calls
+            exists_calls = deploy.exists_calls
+            assert deploy.sync(local_files[0]) == synced[0]
+            assert deploy.exists_calls == exists_calls
+
+            # another deploy: only changed files are uploaded
+            with open(local_files[1], "w") as fp:
+                fp.write("new content")
+            another_deploy = _CountingSyncCtrl(
+                r.root_task_run, remote_root, manifest_file
+            )
+            another_synced = another_deploy.sync_files(local_files)
+            assert another_deploy.uploaded == ["b.jar"]
+            assert another_synced[0] == synced[0]
+            assert another_synced[1] != synced[1]
+
+    def test_interrupted_upload_is_not_trusted(
+        self, tmpdir, local_files, manifest_file, monkeypatch
+    ):
+        remote_root = str(tmpdir.join("remote"))
+
+        def _interrupted_copy(fs, local_path, dest):
+            fs.mkdir_parent(dest)
+            with open(dest, "w") as fp:
+                fp.write("partial content")
+            raise IOError("Connection lost")
+
+        with initialized_run(TTask()) as r:
+            deploy = _CountingSyncCtrl(r.root_task_run, remote_root, manifest_file)
+            with monkeypatch.context() as m:
+                m.setattr(LocalFileSystem, "copy_from_local", _interrupted_copy)
+                with pytest.raises(IOError):
+                    deploy.sync_files(local_files[:1])
+            # the partial upload is removed
+            assert not [f for f in tmpdir.join("remote").visit() if f.isfile()]
+
+            another_deploy = _CountingSyncCtrl(
+                r.root_task_run, remote_root, manifest_file
+            )
+            synced = another_deploy.sync_files(local_files[:1])
+            assert another_deploy.uploaded == ["a.jar"]
+            assert target(synced[0]).read() == target(local_files[0]).read()
+
+    def test_atomic_upload_is_direct(
+        self, tmpdir, local_files, manifest_file, monkeypatch
+    ):
+        remote_root = str(tmpdir.join("remote"))
+
+        def _move(fs, path, dest, **kwargs):
+            raise AssertionError("move is not expected: %s -> %s" % (path, dest))
+
+        with initialized_run(TTask()) as r:
+            deploy = _CountingSyncCtrl(r.root_task_run, remote_root, manifest_file)
+            with monkeypatch.context() as m:
+                m.setattr(LocalFileSystem, "atomic_upload", True)
+                m.setattr(LocalFileSystem, "move", _move)
+                synced = deploy.sync_files(local_files[:1])
+            assert target(synced[0]).read() == target(local_files[0]).read()
+
+    def test_file_hash_manifest(self, local_files, manifest_file):
+        manifest = get_file_hash_manifest(manifest_file)
+        file_hash = manifest.get_hash(local_files[0])
+        manifest.save()
+
+        with open(manifest_file) as fp:
+            saved = json.load(fp)
+        assert saved[os.path.abspath(local_files[0])][2] == file_hash
+
+        # the hash is taken from the manifest while the file is not changed
+        saved[os.path.abspath(local_files[0])][2] = "cached_hash"
+        with open(manifest_file, "w") as fp:
+            json.dump(saved, fp)
+        assert FileHashManifest(manifest_file).get_hash(local_files[0]) == "cached_hash"
@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def _run_python(code):
+    return subprocess.check_output([sys.executable, "-c", code]).decode("utf-8")
+
+
+class TestDbndImport(object):
+    @pytest.mark.skipif(
+        sys.version_info < (3, 7),
+        reason="pandas/numpy marshallers are imported eagerly on py<3.7",
+    )
+    def test_import_dbnd_is_lazy(self):
+        # heavy libraries are loaded only when user code uses them
+        output = _run_python(
+            "import sys; import dbnd; "
+            "print(sorted(m for m in ('pandas', 'numpy', 'matplotlib', 'dbnd._core.cli.main') "
+            "if m in sys.modules))"
+        )
+        assert output.strip() == "[]"
+
+    def test_pandas_support_after_import(self):
+        output = _run_python(
+            "import dbnd; import pandas as pd; "
+            "from targets.values import get_value_type_of_obj; "
+            "print(get_value_type_of_obj(pd.DataFrame()).type_str); "
+            "print(hasattr(pd.DataFrame, 'to_target'))"
+        )
+        assert output.split() == ["DataFrame", "True"]
+
+    @pytest.mark.skip("performance tests")
+    def test_import_time(self):
+        output = subprocess.check_output(
+            [sys.executable, "-X", "importtime", "-c", "import dbnd"],
+            stderr=subprocess.STDOUT,
+        ).decode("utf-8")
+        # "import time: self [us] | cumulative | imported package"
+        cumulative_us = int(output.strip().splitlines()[-1].split("|")[1])
+        assert cumulative_us < 1000 * 1000
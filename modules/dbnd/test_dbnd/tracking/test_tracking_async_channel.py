@@ -0,0 +1,105 @@
+import threading
+
+from dbnd._core.errors.base import DatabandApiError
+from dbnd._core.tracking.channels.tracking_async_channel import AsyncTrackingChannel
+from dbnd.api.tracking_api import TrackingAPI
+
+
+class RecordingChannel(TrackingAPI):
+    supports_log_metrics = True
+
+    def __init__(self, fail_on=None):
+        super(RecordingChannel, self).__init__()
+        self.calls = []
+        self.fail_on = fail_on or {}
+        self.release = threading.Event()
+        self.release.set()
+
+    def _handle(self, name, data):
+        self.release.wait()
+        if name in self.fail_on:
+            raise self.fail_on[name]
+        self.calls.append((name, data))
+        return name
+
+
+def _metric(i):
+    return {"task_run_attempt_uid": "a", "metric": {"key": "m", "value": i}}
+
+
+class TestAsyncTrackingChannel(object):
+    def test_merge_adjacent_calls(self):
+        recording = RecordingChannel()
+        recording.release.clear()
+        channel = AsyncTrackingChannel(recording, flush_interval=0)
+
+        # first call will be stuck at the recording channel, all others are queued
+        channel.log_metric(_metric(0))
+        for i in range(1, 10):
+            channel.log_metric(_metric(i))
+        channel.update_task_run_attempts({"task_run_attempt_updates": [1]})
+        channel.update_task_run_attempts({"task_run_attempt_updates": [2]})
+        recording.release.set()
+        channel.flush()
+
+        names = [name for name, _ in recording.calls]
+        assert names[-1] == "update_task_run_attempts"
+        assert recording.calls[-1][1] == {"task_run_attempt_updates": [1, 2]}
+        assert set(names[:-1]) == {"log_metrics"}
+        assert sum(len(data["metrics_info"]) for _, data in recording.calls[:-1]) == 10
+        assert channel.stats.calls == 12
+        assert channel.stats.requests == len(recording.calls)
+
+    def test_sync_calls_are_sent_after_queued(self):
+        recording = RecordingChannel()
+        channel = AsyncTrackingChannel(recording)
+
+        channel.set_run_state({"state": "running"})
+        assert channel.init_run({"init_args": {}}) == "init_run"
+        assert [name for name, _ in recording.calls] == ["set_run_state", "init_run"]
+
+    def test_log_metrics_fallback(self):
+        recording = RecordingChannel(
+            fail_on={"log_metrics": DatabandApiError("POST", "log_metrics", 404, "")}
+        )
+        channel = AsyncTrackingChannel(recording)
+        channel.log_metric(_metric(1))
+        channel.log_metric(_metric(2))
+        channel.flush()
+
+        assert [name for name, _ in recording.calls] == ["log_metric", "log_metric"]
+        assert channel.stats.failed_calls == 0
+
+    def test_failed_and_dropped_calls(self):
+        recording = RecordingChannel(fail_on={"log_targets": ValueError()})
+        recording.release.clear()
+        channel = AsyncTrackingChannel(
+            recording, max_queue_size=1, put_timeout=0.01, flush_interval=0
+        )
+        for _ in range(5):
+            channel.log_targets({"targets_info": [1]})
+        recording.release.set()
+        channel.flush()
+
+        assert channel.stats.dropped_calls > 0
+        assert channel.stats.failed_calls == 5 - channel.stats.dropped_calls
+
+    def test_log_metrics_not_supported_by_channel(self):
+        recording = RecordingChannel()
+        recording.supports_log_metrics = False
+        channel = AsyncTrackingChannel(recording)
+        channel.log_metric(_metric(1))
+        channel.log_metric(_metric(2))
+        channel.flush()
+
+        assert [name for name, _ in recording.calls] == ["log_metric", "log_metric"]
+
+    def test_log_metrics_fallback_on_any_error(self):
+        recording = RecordingChannel(fail_on={"log_metrics": AttributeError()})
+        channel = AsyncTrackingChannel(recording)
+        channel.log_metric(_metric(1))
+        channel.log_metric(_metric(2))
+        channel.flush()
+
+        assert [name for name, _ in recording.calls] == ["log_metric", "log_metric"]
+        assert channel.stats.failed_calls == 0
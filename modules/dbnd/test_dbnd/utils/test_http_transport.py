@@ -0,0 +1,120 @@
+import gzip
+import io
+import pickle
+
+import mock
+import pytest
+import requests
+
+from dbnd._core.utils.http.http_transport import HttpTransport, endpoint_key
+
+
+def _response(status_code):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = b""
+    return resp
+
+
+class TestHttpTransport(object):
+    def test_endpoint_key(self):
+        assert (
+            endpoint_key("get", "http://host/api/v1/jobs/123")
+            == "GET /api/v1/jobs/{id}"
+        )
+        assert (
+            endpoint_key("post", "http://host/api/v1/run/" + "a" * 32 + "/state")
+            == "POST /api/v1/run/{id}/state"
+        )
+
+    @mock.patch("time.sleep")
+    def test_retry_and_latency(self, sleep):
+        transport = HttpTransport(retries=2)
+        with mock.patch.object(
+            transport.session,
+            "request",
+            side_effect=[
+                requests.exceptions.ConnectTimeout(),
+                _response(503),
+                _response(200),
+            ],
+        ):
+            resp = transport.request(
+                "POST", "http://host/api/v1/init_run", json_data={}
+            )
+        assert resp.status_code == 200
+        assert sleep.call_count == 2
+
+        stats = transport.get_latency_stats()["POST /api/v1/init_run"]
+        assert stats["count"] == 3
+        assert stats["errors"] == 2
+        assert sum(stats["buckets"].values()) == 3
+
+    @mock.patch("time.sleep")
+    def test_post_not_retried_if_sent(self, sleep):
+        # the server could already apply the request, it's not safe to send it again
+        transport = HttpTransport(retries=2)
+        with mock.patch.object(
+            transport.session, "request", return_value=_response(504)
+        ) as request:
+            resp = transport.request(
+                "POST", "http://host/api/v1/init_run", json_data={}
+            )
+        assert resp.status_code == 504
+        assert request.call_count == 1
+
+        with mock.patch.object(
+            transport.session,
+            "request",
+            side_effect=requests.exceptions.ConnectionError("Connection aborted."),
+        ) as request:
+            with pytest.raises(requests.exceptions.ConnectionError):
+                transport.request("POST", "http://host/api/v1/init_run", json_data={})
+        assert request.call_count == 1
+        assert not sleep.called
+
+    @mock.patch("time.sleep")
+    def test_get_retried_on_504(self, sleep):
+        transport = HttpTransport(retries=2)
+        with mock.patch.object(
+            transport.session,
+            "request",
+            side_effect=[
+                requests.exceptions.ConnectionError("Connection aborted."),
+                _response(504),
+                _response(200),
+            ],
+        ):
+            resp = transport.request("GET", "http://host/api/v1/jobs")
+        assert resp.status_code == 200
+        assert sleep.call_count == 2
+
+    def test_retries_exhausted(self):
+        transport = HttpTransport(retries=0)
+        with mock.patch.object(
+            transport.session,
+            "request",
+            side_effect=requests.exceptions.ConnectionError(),
+        ):
+            with pytest.raises(requests.exceptions.ConnectionError):
+                transport.request("GET", "http://host/app")
+
+    def test_gzip_threshold(self):
+        transport = HttpTransport(gzip_threshold=100)
+        with mock.patch.object(
+            transport.session, "request", return_value=_response(200)
+        ) as request:
+            transport.request("POST", "http://host/small", json_data={"a": 1})
+            transport.request("POST", "http://host/big", json_data={"a": "x" * 1000})
+
+        small, big = [c[1] for c in request.call_args_list]
+        assert "Content-Encoding" not in small["headers"]
+        assert big["headers"]["Content-Encoding"] == "gzip"
+        assert gzip.GzipFile(fileobj=io.BytesIO(big["data"])).read()
+
+    def test_pickle(self):
+        transport = HttpTransport(pool_size=3)
+        transport.session.headers["X-CSRFToken"] = "token"
+        restored = pickle.loads(pickle.dumps(transport))
+        assert restored.session.headers["X-CSRFToken"] == "token"
+        assert restored.pool_size == 3
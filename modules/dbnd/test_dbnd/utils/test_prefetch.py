@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+
+from targets.utils.prefetch import iter_prefetched
+
+
+class TestIterPrefetched(object):
+    @pytest.mark.parametrize("prefetch", [0, 1, 4])
+    def test_order(self, prefetch):
+        def _slow(i):
+            time.sleep(0.01 * (i % 3))
+            return i * 2
+
+        assert list(iter_prefetched(_slow, range(20), prefetch=prefetch)) == [
+            i * 2 for i in range(20)
+        ]
+
+    def test_bounded_read_ahead(self):
+        started = []
+        lock = threading.Lock()
+
+        def _record(i):
+            with lock:
+                started.append(i)
+            return i
+
+        values = iter_prefetched(_record, range(100), prefetch=3)
+        assert next(values) == 0
+        time.sleep(0.1)
+        # current item and 3 items ahead
+        assert len(started) <= 4
+        values.close()
+
+    def test_error(self):
+        def _fail(i):
+            if i == 2:
+                raise ValueError("failed")
+            return i
+
+        values = iter_prefetched(_fail, range(5), prefetch=2)
+        assert next(values) == 0
+        assert next(values) == 1
+        with pytest.raises(ValueError):
+            next(values)
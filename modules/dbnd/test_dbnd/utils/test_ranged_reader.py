@@ -0,0 +1,109 @@
+import io
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from targets.utils.ranged_reader import RangedReader, open_ranged_reader
+
+
+class _RemoteObject(object):
+    def __init__(self, data, latency=0):
+        self.data = data
+        self.latency = latency
+        self.ranges = []
+        self._lock = threading.Lock()
+
+    def read_range(self, start, end):
+        time.sleep(self.latency)
+        with self._lock:
+            self.ranges.append((start, end))
+        return self.data[start : end + 1]
+
+
+@pytest.fixture
+def remote():
+    return _RemoteObject(os.urandom(100 * 1000))
+
+
+class TestRangedReader(object):
+    @pytest.mark.parametrize("read_ahead", [0, 2])
+    def test_read_all(self, remote, read_ahead):
+        with open_ranged_reader(
+            remote.read_range, len(remote.data), chunk_size=7000, read_ahead=read_ahead
+        ) as fp:
+            assert fp.read() == remote.data
+        assert len(remote.ranges) == 15
+
+    def test_read_header(self, remote):
+        with open_ranged_reader(
+            remote.read_range, len(remote.data), chunk_size=1000, read_ahead=0
+        ) as fp:
+            assert fp.read(10) == remote.data[:10]
+        # only the first chunk is fetched
+        assert remote.ranges == [(0, 999)]
+
+    def test_seek(self, remote):
+        reader = RangedReader(
+            remote.read_range, len(remote.data), chunk_size=1000, read_ahead=0
+        )
+        with io.BufferedReader(reader) as fp:
+            fp.seek(-8, io.SEEK_END)
+            assert fp.read() == remote.data[-8:]
+            fp.seek(50500)
+            assert fp.tell() == 50500
+            assert fp.read(1000) == remote.data[50500:51500]
+            fp.seek(-10, io.SEEK_CUR)
+            assert fp.read(20) == remote.data[51490:51510]
+        assert sorted(remote.ranges) == [(50000, 50999), (51000, 51999), (99000, 99999)]
+        assert reader.bytes_fetched == 3000
+
+    def test_read_ahead(self):
+        remote = _RemoteObject(os.urandom(10 * 1000), latency=0.05)
+        reader = RangedReader(
+            remote.read_range, len(remote.data), chunk_size=1000, read_ahead=2
+        )
+        with io.BufferedReader(reader) as fp:
+            assert fp.read(1000) == remote.data[:1000]
+            time.sleep(0.2)
+            # chunks 1 and 2 are fetched in background
+            assert len(remote.ranges) == 3
+
+            start = time.time()
+            assert fp.read(2000) == remote.data[1000:3000]
+            assert time.time() - start < 0.05
+        assert len(remote.ranges) <= 5
+
+    def test_no_read_ahead_on_random_access(self, remote):
+        reader = RangedReader(
+            remote.read_range, len(remote.data), chunk_size=1000, read_ahead=2
+        )
+        with io.BufferedReader(reader) as fp:
+            fp.seek(-8, io.SEEK_END)
+            assert fp.read() == remote.data[-8:]
+            fp.seek(50500)
+            assert fp.read(100) == remote.data[50500:50600]
+            time.sleep(0.1)
+        assert sorted(remote.ranges) == [(50000, 50999), (99000, 99999)]
+
+    def test_empty(self):
+        remote = _RemoteObject(b"")
+        with open_ranged_reader(remote.read_range, 0) as fp:
+            assert fp.read() == b""
+        assert not remote.ranges
+
+    def test_parquet(self, tmpdir):
+        pytest.importorskip("pyarrow")
+        df = pd.DataFrame({"a": range(10000), "b": ["value"] * 10000})
+        parquet_file = str(tmpdir.join("data.parquet"))
+        df.to_parquet(parquet_file)
+        with open(parquet_file, "rb") as fp:
+            remote = _RemoteObject(fp.read())
+
+        with open_ranged_reader(
+            remote.read_range, len(remote.data), chunk_size=4096
+        ) as fp:
+            actual = pd.read_parquet(fp)
+        assert actual.equals(df)
@@ -1,6 +1,14 @@
+import base64
+import contextlib
 import datetime
+import json
 import logging
 import os
+import threading
+import time
+import zlib
+
+from collections import OrderedDict
 
 import flask
 import flask_appbuilder
@@ -11,7 +19,7 @@ from airflow.configuration import conf
 from airflow.jobs import BaseJob
 from airflow.models import BaseOperator, DagModel, DagRun
 from airflow.plugins_manager import AirflowPlugin
-from airflow.utils.db import provide_session
+from airflow.utils.db import create_session, provide_session
 from airflow.utils.net import get_hostname
 from airflow.utils.timezone import utcnow
 from airflow.version import version as airflow_version
@@ -22,6 +30,12 @@ import flask_admin
 
 DEFAULT_DAYS_PERIOD = 30
 
+# rows fetched from db at once while streaming
+QUERY_BATCH_SIZE = 1000
+
+# seconds to keep git status of the dag folder (git changes are not tracked by mtime)
+GIT_STATUS_TTL = 60
+
 current_dags = {}
 
 try:
@@ -38,6 +52,10 @@ class EmptyAirflowDatabase(Exception):
     pass
 
 
+class InvalidCursor(ValueError):
+    pass
+
+
 ### Plugin Business Logic ###
 
 
@@ -48,15 +66,72 @@ def _load_dags_models(session=None):
 
 
 def do_export_data(
-    dagbag, since, include_logs=False, dag_ids=None, tasks=None, session=None
+    dagbag,
+    since,
+    include_logs=False,
+    dag_ids=None,
+    tasks=None,
+    cursor=None,
+    dag_runs=None,
+    session=None,
 ):
     """
     Get first task instances which have the largest amount of objects in DB.
     Then get related DAG runs and DAG runs in the same time frame.
     All DAGs are always exported since their amount is low.
-    Amount of exported data is limited by tasks parameter which limits the number to task instances to export.
+    Amount of exported data is limited by tasks parameter which limits the number to task instances to export
+    (and dag_runs parameter for dag runs).
+    Use `next_cursor` of the result as `cursor` to get the next page.
     """
     since = since or pendulum.datetime.min
+    ed = ExportData(since=since)
+    for record_type, record in iter_export_records(
+        dagbag=dagbag,
+        since=since,
+        include_logs=include_logs,
+        dag_ids=dag_ids,
+        tasks=tasks,
+        cursor=cursor,
+        dag_runs=dag_runs,
+        session=session,
+    ):
+        if record_type == "dag":
+            ed.dags.append(record)
+        elif record_type == "dag_run":
+            ed.dag_runs.append(record)
+        elif record_type == "task_instance":
+            ed.task_instances.append(record)
+        elif record_type == "cursor":
+            ed.next_cursor = record
+    logging.info(
+        "%d task instances and %d dag runs were found.",
+        len(ed.task_instances),
+        len(ed.dag_runs),
+    )
+
+    if not ed.task_instances and not ed.dag_runs:
+        return ExportData(since=since, next_cursor=ed.next_cursor)
+    return ed
+
+
+def iter_export_records(
+    dagbag,
+    since,
+    include_logs=False,
+    dag_ids=None,
+    tasks=None,
+    cursor=None,
+    dag_runs=None,
+    session=None,
+):
+    """
+    Yields (record type, record) for dags, task instances and dag runs, and the next cursor at the end.
+    Rows are read from db in batches, so memory usage doesn't depend on the history size.
+    Dags and unfinished task instances/dag runs are exported only by the first page (no cursor),
+    finished ones are paged by (end_date, key) with `tasks`/`dag_runs` as a page size.
+    """
+    since = since or pendulum.datetime.min
+    cursor = decode_cursor(cursor)
     _load_dags_models(session)
     logging.info(
         "Collected %d dags. Trying to query task instances and dagruns from %s",
@@ -64,62 +139,125 @@ def do_export_data(
         since,
     )
 
-    task_instances, dag_runs = _get_task_instances(since, dag_ids, tasks, session)
-    logging.info("%d task instances were found." % len(task_instances))
+    if not cursor:
+        dag_models = current_dags.values()
+        if dag_ids:
+            dag_models = [dag for dag in dag_models if dag.dag_id in dag_ids]
+        for dm in dag_models:
+            dag = dagbag.get_dag(dm.dag_id)
+            if dag:
+                yield "dag", EDag.from_dag(dag, dagbag.dag_folder)
+
+    exported_dag_run_ids = set()
+    ti_key = cursor.get("ti")
+    for ti, job, dag_run in _iter_task_instances(
+        since, dag_ids, tasks, ti_key, session
+    ):
+        dag = dagbag.get_dag(ti.dag_id)
+        yield "task_instance", ETaskInstance.from_task_instance(
+            ti,
+            job,
+            include_logs,
+            dag.get_task(ti.task_id) if dag and dag.has_task(ti.task_id) else None,
+        )
+        if ti.end_date is not None:
+            ti_key = _task_instance_key(ti)
+        if dag_run.id not in exported_dag_run_ids:
+            exported_dag_run_ids.add(dag_run.id)
+            yield "dag_run", EDagRun.from_dagrun(dag_run)
 
-    task_end_dates = [
-        task.end_date for task, job in task_instances if task.end_date is not None
-    ]
-    # dag_run_end_date = max(task_end_dates) if task_end_dates else pendulum.datetime.max
-    dag_run_end_date = pendulum.datetime.max
-    dag_runs |= _get_dag_runs(since, dag_run_end_date, dag_ids, session)
-    logging.info("%d dag runs were found." % len(dag_runs))
+    dag_run_key = cursor.get("dr")
+    for dag_run in _iter_dag_runs(since, dag_ids, dag_runs, dag_run_key, session):
+        if dag_run.end_date is not None:
+            dag_run_key = _dag_run_key(dag_run)
+        if dag_run.id not in exported_dag_run_ids:
+            exported_dag_run_ids.add(dag_run.id)
+            yield "dag_run", EDagRun.from_dagrun(dag_run)
 
-    if not task_instances and not dag_runs:
-        return ExportData(since=since)
+    yield "cursor", encode_cursor(dict(ti=ti_key, dr=dag_run_key))
 
-    dag_models = current_dags.values()
-    if dag_ids:
-        dag_models = [dag for dag in dag_models if dag.dag_id in dag_ids]
-
-    ed = ExportData(
-        task_instances=[
-            ETaskInstance.from_task_instance(
-                ti,
-                job,
-                include_logs,
-                dag.get_task(ti.task_id) if dag and dag.has_task(ti.task_id) else None,
-            )
-            for ti, job in task_instances
-            for dag in [dagbag.get_dag(ti.dag_id)]
-        ],
-        dag_runs=[EDagRun.from_dagrun(dr) for dr in dag_runs],
-        dags=[
-            EDag.from_dag(dagbag.get_dag(dm.dag_id), dagbag.dag_folder)
-            for dm in dag_models
-            if dagbag.get_dag(dm.dag_id)
-        ],
-        since=since,
-    )
 
-    return ed
+def _task_instance_key(ti):
+    return [ti.end_date, ti.dag_id, ti.task_id, ti.execution_date]
 
 
-def _get_dag_runs(start_date, end_date, dag_ids, session):
-    dagruns_query = session.query(DagRun).filter(
-        or_(
-            DagRun.end_date.is_(None),
-            and_(DagRun.end_date >= start_date, DagRun.end_date <= end_date),
-        )
-    )
+def _dag_run_key(dr):
+    return [dr.end_date, dr.id]
 
+
+def encode_cursor(cursor):
+    def _serialize(value):
+        return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+    cursor = {name: [_serialize(v) for v in key] for name, key in cursor.items() if key}
+    if not cursor:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return {}
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(str(cursor)).decode("utf-8"))
+        if decoded.get("ti"):
+            end_date, dag_id, task_id, execution_date = decoded["ti"]
+            decoded["ti"] = [
+                pendulum.parse(end_date),
+                dag_id,
+                task_id,
+                pendulum.parse(execution_date),
+            ]
+        if decoded.get("dr"):
+            end_date, dag_run_id = decoded["dr"]
+            decoded["dr"] = [pendulum.parse(end_date), dag_run_id]
+    except Exception as ex:
+        raise InvalidCursor("Invalid cursor %r: %s" % (cursor, ex))
+    return decoded
+
+
+def _after_key(columns, key):
+    """
+    Keyset pagination filter: (columns) > (key), without tuple comparison (not supported by sqlite)
+    """
+    column, value = columns[0], key[0]
+    if len(columns) == 1:
+        return column > value
+    return or_(column > value, and_(column == value, _after_key(columns[1:], key[1:])))
+
+
+def _iter_paged(query, end_date_column, key_columns, start_date, page_size, after_key):
+    if not after_key:
+        # unfinished objects are exported by the first page only
+        for row in query.filter(end_date_column.is_(None)).yield_per(QUERY_BATCH_SIZE):
+            yield row
+
+    query = query.filter(end_date_column >= start_date)
+    if after_key:
+        query = query.filter(_after_key(key_columns, after_key))
+    query = query.order_by(*key_columns)
+    if page_size is not None:
+        query = query.limit(page_size)
+    for row in query.yield_per(QUERY_BATCH_SIZE):
+        yield row
+
+
+def _iter_dag_runs(start_date, dag_ids, page_size, after_key, session):
+    dagruns_query = session.query(DagRun)
     if dag_ids:
         dagruns_query = dagruns_query.filter(DagRun.dag_id.in_(dag_ids))
 
-    return set(dagruns_query.all())
+    return _iter_paged(
+        dagruns_query,
+        end_date_column=DagRun.end_date,
+        key_columns=[DagRun.end_date, DagRun.id],
+        start_date=start_date,
+        page_size=page_size,
+        after_key=after_key,
+    )
 
 
-def _get_task_instances(start_date, dag_ids, quantity, session):
+def _iter_task_instances(start_date, dag_ids, page_size, after_key, session):
     task_instances_query = (
         session.query(TaskInstance, BaseJob, DagRun)
         .outerjoin(BaseJob, TaskInstance.job_id == BaseJob.id)
@@ -128,9 +266,6 @@ def _get_task_instances(start_date, dag_ids, quantity, session):
             (TaskInstance.dag_id == DagRun.dag_id)
             & (TaskInstance.execution_date == DagRun.execution_date),
         )
-        .filter(
-            or_(TaskInstance.end_date.is_(None), TaskInstance.end_date >= start_date)
-        )
     )
 
     if dag_ids:
@@ -138,15 +273,19 @@ def _get_task_instances(start_date, dag_ids, quantity, session):
             TaskInstance.dag_id.in_(dag_ids)
         )
 
-    if quantity is not None:
-        task_instances_query = task_instances_query.order_by(
-            TaskInstance.end_date
-        ).limit(quantity)
-
-    results = task_instances_query.all()
-    tasks_and_jobs = [(task, job) for task, job, dag_run in results]
-    dag_runs = {dag_run for task, job, dag_run in results}
-    return tasks_and_jobs, dag_runs
+    return _iter_paged(
+        task_instances_query,
+        end_date_column=TaskInstance.end_date,
+        key_columns=[
+            TaskInstance.end_date,
+            TaskInstance.dag_id,
+            TaskInstance.task_id,
+            TaskInstance.execution_date,
+        ],
+        start_date=start_date,
+        page_size=page_size,
+        after_key=after_key,
+    )
 
 
 @provide_session
@@ -369,11 +508,14 @@ class EDag(object):
 
 
 class ExportData(object):
-    def __init__(self, since, dags=None, dag_runs=None, task_instances=None):
+    def __init__(
+        self, since, dags=None, dag_runs=None, task_instances=None, next_cursor=None
+    ):
         self.dags = dags or []  # type: List[EDag]
         self.dag_runs = dag_runs or []  # type: List[EDagRun]
         self.task_instances = task_instances or []  # type: List[ETaskInstance]
         self.since = since  # type: Datetime
+        self.next_cursor = next_cursor  # type: str
         self.airflow_version = airflow_version
         self.dags_path = conf.get("core", "dags_folder")
         self.logs_path = conf.get("core", "base_log_folder")
@@ -382,10 +524,17 @@ class ExportData(object):
         ).version
 
     def as_dict(self):
-        return dict(
+        result = dict(
             dags=[x.as_dict() for x in self.dags],
             dag_runs=[x.as_dict() for x in self.dag_runs],
             task_instances=[x.as_dict() for x in self.task_instances],
+            next_cursor=self.next_cursor,
+        )
+        result.update(self.as_metadata_dict())
+        return result
+
+    def as_metadata_dict(self):
+        return dict(
             since=self.since,
             airflow_version=self.airflow_version,
             dags_path=self.dags_path,
@@ -397,6 +546,55 @@ class ExportData(object):
 ### Helpers ###
 
 
+class FileCache(object):
+    """
+    LRU cache of values calculated from a file content,
+    a value is recalculated if the file mtime is changed (or after ttl seconds, if set)
+    """
+
+    def __init__(self, max_size=1000, ttl=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._cache = OrderedDict()  # (path, key) -> (mtime, calculated at, value)
+        self._lock = threading.Lock()
+
+    def get(self, path, calc, key=None):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return calc()
+
+        cache_key = (path, key)
+        now = time.time()
+        with self._lock:
+            cached = self._cache.pop(cache_key, None)
+            if cached is not None:
+                # mark as recently used
+                self._cache[cache_key] = cached
+        if (
+            cached is not None
+            and cached[0] == mtime
+            and (self.ttl is None or now - cached[1] < self.ttl)
+        ):
+            return cached[2]
+
+        value = calc()
+        with self._lock:
+            self._cache[cache_key] = (mtime, now, value)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_source_cache = FileCache()
+# git status changes are not visible by the dag folder mtime
+_git_status_cache = FileCache(max_size=100, ttl=GIT_STATUS_TTL)
+
+
 def interval_to_str(schedule_interval):
     if isinstance(schedule_interval, datetime.timedelta):
         if schedule_interval == datetime.timedelta(days=1):
@@ -424,6 +622,10 @@ def _get_log(ti, task):
 
 
 def _get_git_status(path):
+    return _git_status_cache.get(path, lambda: _calc_git_status(path))
+
+
+def _calc_git_status(path):
     try:
         from git import Repo
 
@@ -446,9 +648,7 @@ def _get_source_code(t):
         from airflow.operators.bash_operator import BashOperator
 
         if isinstance(t, PythonOperator):
-            import inspect
-
-            return inspect.getsource(t.python_callable)
+            return _get_python_source(t.python_callable)
         elif isinstance(t, BashOperator):
             return t.bash_command
     except Exception as ex:
@@ -463,11 +663,27 @@ def _get_module_code(t):
         if isinstance(t, PythonOperator):
             import inspect
 
-            return inspect.getsource(inspect.getmodule(t.python_callable))
+            return _get_python_source(inspect.getmodule(t.python_callable))
     except Exception as ex:
         pass
 
 
+def _get_python_source(obj):
+    # the same module is read for every task defined in it, so we cache by the file
+    import inspect
+
+    path = inspect.getsourcefile(obj)
+    if inspect.ismodule(obj):
+        key = obj.__name__
+    elif getattr(obj, "__code__", None) is not None:
+        key = (obj.__code__.co_name, obj.__code__.co_firstlineno)
+    else:
+        path = None
+    if not path:
+        return inspect.getsource(obj)
+    return _source_cache.get(path, lambda: inspect.getsource(obj), key=key)
+
+
 def _get_command_from_operator(t):
     # type: (BaseOperator) -> str
     from airflow.operators.python_operator import PythonOperator
@@ -485,6 +701,12 @@ def _read_dag_file(dag_file):
     # TODO: Change implementation when this is done:
     # https://github.com/apache/airflow/pull/7217
 
+    if not dag_file:
+        return None
+    return _source_cache.get(dag_file, lambda: _read_file(dag_file))
+
+
+def _read_file(dag_file):
     if dag_file and os.path.exists(dag_file):
         with open(dag_file) as file:
             try:
@@ -507,6 +729,8 @@ class ExportDataViewAppBuilder(flask_appbuilder.BaseView):
         from airflow.www_rbac.utils import json_response
         from airflow.www_rbac.views import dagbag
 
+        if _is_ndjson_request():
+            return stream_export_data_api(dagbag)
         return json_response(export_data_api(dagbag))
 
 
@@ -521,31 +745,53 @@ class ExportDataViewAdmin(flask_admin.BaseView):
         from airflow.www.utils import json_response
         from airflow.www.views import dagbag
 
+        if _is_ndjson_request():
+            return stream_export_data_api(dagbag)
         return json_response(export_data_api(dagbag))
 
 
+@contextlib.contextmanager
+def _patched_get_current_dag_model():
+    # We monkey patch `get_current` to optimize sql querying
+    old_get_current_dag = DagModel.get_current
+    try:
+        DagModel.get_current = _get_current_dag_model
+        yield
+    finally:
+        DagModel.get_current = old_get_current_dag
+
+
+def _parse_since(since):
+    if since:
+        since = pendulum.parse(str(since).replace(" 00:00", "Z"))
+    return since
+
+
 @provide_session
 def _handle_export_data(
-    dagbag, since, include_logs, dag_ids=None, tasks=None, session=None
+    dagbag,
+    since,
+    include_logs,
+    dag_ids=None,
+    tasks=None,
+    cursor=None,
+    dag_runs=None,
+    session=None,
 ):
     include_logs = bool(include_logs)
-    if since:
-        since = pendulum.parse(str(since).replace(" 00:00", "Z"))
+    since = _parse_since(since)
 
-    # We monkey patch `get_current` to optimize sql querying
-    old_get_current_dag = DagModel.get_current
-    try:
-        DagModel.get_current = _get_current_dag_model
+    with _patched_get_current_dag_model():
         result = do_export_data(
             dagbag=dagbag,
             since=since,
             include_logs=include_logs,
             dag_ids=dag_ids,
             tasks=tasks,
+            cursor=cursor,
+            dag_runs=dag_runs,
             session=session,
         )
-    finally:
-        DagModel.get_current = old_get_current_dag
 
     if result:
         result = result.as_dict()
@@ -553,15 +799,95 @@ def _handle_export_data(
     return result
 
 
-def export_data_api(dagbag):
-    since = flask.request.args.get("since")
-    include_logs = flask.request.args.get("include_logs")
-    dag_ids = flask.request.args.getlist("dag_ids")
-    tasks = flask.request.args.get("tasks", type=int)
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
 
+
+def iter_ndjson_export(
+    dagbag, since, include_logs, dag_ids=None, tasks=None, cursor=None, dag_runs=None
+):
+    """
+    Yields export as json lines: {"type": ..., "data": ...}
+    starting with "metadata" and ending with "cursor" (next cursor)
+    """
+    include_logs = bool(include_logs)
+    since = _parse_since(since) or pendulum.datetime.min
+
+    metadata = ExportData(since=since).as_metadata_dict()
+    yield json.dumps(dict(type="metadata", data=metadata), default=_json_default)
+
+    # the session should be alive while the response is streamed
+    with create_session() as session, _patched_get_current_dag_model():
+        for record_type, record in iter_export_records(
+            dagbag=dagbag,
+            since=since,
+            include_logs=include_logs,
+            dag_ids=dag_ids,
+            tasks=tasks,
+            cursor=cursor,
+            dag_runs=dag_runs,
+            session=session,
+        ):
+            if record_type != "cursor":
+                record = record.as_dict()
+            yield json.dumps(dict(type=record_type, data=record), default=_json_default)
+
+
+def _iter_encoded_lines(lines, compress=False):
+    compressor = (
+        zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+    )
+    for line in lines:
+        data = (line + "\n").encode("utf-8")
+        if compressor:
+            data = compressor.compress(data)
+            if not data:
+                continue
+        yield data
+    if compressor:
+        yield compressor.flush()
+
+
+def _is_ndjson_request():
+    return flask.request.args.get("format", "").lower() == "ndjson"
+
+
+def _get_export_args():
+    cursor = flask.request.args.get("cursor")
+    # validate before the export starts (the stream can't be turned into an error)
+    try:
+        decode_cursor(cursor)
+    except InvalidCursor as ex:
+        flask.abort(400, str(ex))
+
+    return dict(
+        since=flask.request.args.get("since"),
+        include_logs=flask.request.args.get("include_logs"),
+        dag_ids=flask.request.args.getlist("dag_ids"),
+        tasks=flask.request.args.get("tasks", type=int),
+        cursor=cursor,
+        dag_runs=flask.request.args.get("dag_runs", type=int),
+    )
+
+
+def export_data_api(dagbag):
     # do_update = flask.request.args.get("do_update", "").lower() == "true"
     # verbose = flask.request.args.get("verbose", str(not do_update)).lower() == "true"
-    return _handle_export_data(dagbag, since, include_logs, dag_ids, tasks)
+    return _handle_export_data(dagbag, **_get_export_args())
+
+
+def stream_export_data_api(dagbag):
+    compress = flask.request.args.get("gzip", "").lower() == "true"
+    lines = iter_ndjson_export(dagbag, **_get_export_args())
+    response = flask.Response(
+        flask.stream_with_context(_iter_encoded_lines(lines, compress=compress)),
+        mimetype="application/x-ndjson",
+    )
+    if compress:
+        response.headers["Content-Encoding"] = "gzip"
+    return response
 
 
 ### Plugin ###
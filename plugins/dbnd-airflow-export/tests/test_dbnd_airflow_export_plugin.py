@@ -0,0 +1,181 @@
+import base64
+import datetime
+import gzip
+import io
+import os
+
+import pytest
+
+
+pytest.importorskip("airflow")
+
+import flask
+import pendulum
+import werkzeug.exceptions
+
+from sqlalchemy import Column, DateTime, Integer, String, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+
+from dbnd_airflow_export.dbnd_airflow_export_plugin import (
+    FileCache,
+    InvalidCursor,
+    _after_key,
+    _get_export_args,
+    _iter_encoded_lines,
+    decode_cursor,
+    encode_cursor,
+)
+
+
+Base = declarative_base()
+
+
+class _Row(Base):
+    __tablename__ = "rows"
+
+    id = Column(Integer, primary_key=True)
+    end_date = Column(DateTime)
+    dag_id = Column(String(50))
+
+
+class TestCursor(object):
+    def test_encode_decode(self):
+        end_date = pendulum.datetime(2020, 1, 2, 3, 4, 5)
+        execution_date = pendulum.datetime(2020, 1, 1)
+        cursor = encode_cursor(
+            dict(ti=[end_date, "dag", "task", execution_date], dr=[end_date, 7])
+        )
+
+        decoded = decode_cursor(cursor)
+        assert decoded["ti"] == [end_date, "dag", "task", execution_date]
+        assert decoded["dr"] == [end_date, 7]
+
+    def test_empty(self):
+        assert encode_cursor(dict(ti=None, dr=None)) is None
+        assert decode_cursor(None) == {}
+        assert decode_cursor("") == {}
+
+        decoded = decode_cursor(
+            encode_cursor(dict(ti=None, dr=[pendulum.datetime(2020, 1, 1), 1]))
+        )
+        assert "ti" not in decoded
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            "not a cursor",
+            base64.urlsafe_b64encode(b"not json").decode("ascii"),
+            base64.urlsafe_b64encode(b"[1, 2]").decode("ascii"),
+            base64.urlsafe_b64encode(b'{"dr": ["not a date", 1]}').decode("ascii"),
+            base64.urlsafe_b64encode(b'{"ti": ["2020-01-01"]}').decode("ascii"),
+        ],
+    )
+    def test_decode_invalid(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+
+    def test_invalid_cursor_is_bad_request(self):
+        app = flask.Flask(__name__)
+        with app.test_request_context("/export_data?cursor=not-a-cursor"):
+            with pytest.raises(werkzeug.exceptions.BadRequest):
+                _get_export_args()
+
+
+class TestAfterKey(object):
+    def test_keyset_pages(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+
+        dates = [datetime.datetime(2020, 1, 1), datetime.datetime(2020, 1, 2)]
+        for i in range(12):
+            # a lot of ties on end_date and dag_id, the order is resolved by id
+            session.add(_Row(id=i, end_date=dates[i % 2], dag_id="dag_%s" % (i % 3)))
+        session.commit()
+
+        key_columns = [_Row.end_date, _Row.dag_id, _Row.id]
+        expected = [
+            (r.end_date, r.dag_id, r.id)
+            for r in session.query(_Row).order_by(*key_columns)
+        ]
+
+        pages = []
+        after_key = None
+        while True:
+            query = session.query(_Row)
+            if after_key:
+                query = query.filter(_after_key(key_columns, after_key))
+            page = [
+                (r.end_date, r.dag_id, r.id)
+                for r in query.order_by(*key_columns).limit(5)
+            ]
+            if not page:
+                break
+            pages.append(page)
+            after_key = list(page[-1])
+
+        assert [len(p) for p in pages] == [5, 5, 2]
+        assert [r for p in pages for r in p] == expected
+
+
+class TestFileCache(object):
+    def test_mtime_invalidation(self, tmpdir):
+        path = str(tmpdir.join("dag.py"))
+        with open(path, "w") as f:
+            f.write("v1")
+
+        calls = []
+
+        def _read():
+            calls.append(path)
+            with open(path) as f:
+                return f.read()
+
+        cache = FileCache()
+        assert cache.get(path, _read) == "v1"
+        assert cache.get(path, _read) == "v1"
+        assert len(calls) == 1
+
+        with open(path, "w") as f:
+            f.write("v2")
+        mtime = os.path.getmtime(path) + 10
+        os.utime(path, (mtime, mtime))
+        assert cache.get(path, _read) == "v2"
+        assert len(calls) == 2
+
+        # values of the same file are cached by key
+        assert cache.get(path, lambda: "func", key="func") == "func"
+        assert cache.get(path, _read) == "v2"
+        assert len(calls) == 2
+
+    def test_missing_file(self, tmpdir):
+        path = str(tmpdir.join("missing.py"))
+        cache = FileCache()
+        assert cache.get(path, lambda: 1) == 1
+        assert cache.get(path, lambda: 2) == 2
+
+    def test_max_size(self, tmpdir):
+        paths = []
+        for i in range(3):
+            path = tmpdir.join("dag_%s.py" % i)
+            path.write("")
+            paths.append(str(path))
+
+        cache = FileCache(max_size=2)
+        for path in paths:
+            cache.get(path, lambda: "cached")
+        # the least recently used is evicted
+        assert cache.get(paths[0], lambda: "new") == "new"
+        assert cache.get(paths[2], lambda: "new") == "cached"
+
+
+class TestLineEncoder(object):
+    def test_plain(self):
+        assert list(_iter_encoded_lines(iter(["a", "b"]))) == [b"a\n", b"b\n"]
+
+    def test_gzip(self):
+        lines = ["line %s" % i for i in range(1000)]
+        data = b"".join(_iter_encoded_lines(iter(lines), compress=True))
+        decompressed = gzip.GzipFile(fileobj=io.BytesIO(data)).read()
+        assert decompressed == ("\n".join(lines) + "\n").encode("utf-8")
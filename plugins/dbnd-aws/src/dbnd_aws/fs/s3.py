@@ -30,19 +30,31 @@ import logging
 import os
 import os.path
 
+from collections import defaultdict
+from multiprocessing.pool import ThreadPool
+
 import botocore
 
+from dbnd._core.current import try_get_databand_run
+from dbnd_aws.fs.s3_metadata_cache import S3Listing, S3MetadataCache
 from targets import (
-    AtomicLocalFile,
     FileAlreadyExists,
     FileSystem,
     FileSystemException,
     MissingParentDirectory,
 )
-from targets.config import get_config_section_values
+from targets.config import (
+    get_config_section_values,
+    get_remote_listing_cache_ttl,
+    get_remote_read_chunk_size,
+    get_remote_s3_read_concurrency,
+    get_remote_write_concurrency,
+    get_remote_write_part_size,
+)
 from targets.errors import FileNotFoundException, TargetError
 from targets.fs import FileSystems
 from targets.utils.path import path_to_bucket_and_key
+from targets.utils.ranged_reader import open_ranged_reader
 
 
 try:
@@ -57,6 +69,13 @@ logger = logging.getLogger(__name__)
 S3_DIRECTORY_MARKER_SUFFIX_0 = "_$folder$"
 S3_DIRECTORY_MARKER_SUFFIX_1 = "/"
 
+# listings are kept in the metadata cache (and used by exists_many())
+# only if they fit into a single list request
+MAX_CACHED_LISTING = 1000
+
+# all the parts of multipart upload except the last one should be at least 5MB
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
 
 class InvalidDeleteException(FileSystemException):
     pass
@@ -66,24 +85,6 @@ class DeprecatedBotoClientException(TargetError):
     pass
 
 
-class _StreamingBodyAdaptor(io.IOBase):
-    """
-    Adapter class wrapping botocore's StreamingBody to make a file like iterable
-    """
-
-    def __init__(self, streaming_body):
-        self.streaming_body = streaming_body
-
-    def read(self, size):
-        return self.streaming_body.read(size)
-
-    def readlines(self):
-        return self.streaming_body.readlines()
-
-    def close(self):
-        return self.streaming_body.close()
-
-
 class S3Client(FileSystem):
     """
     boto3-powered S3 client.
@@ -91,7 +92,9 @@ class S3Client(FileSystem):
 
     name = FileSystems.s3
     _exist_after_write_consistent = False
+    atomic_upload = True
     _s3 = None
+    _metadata_cache = None
 
     @classmethod
     def from_boto_resource(cls, resource):
@@ -183,6 +186,64 @@ class S3Client(FileSystem):
     def s3(self, value):
         self._s3 = value
 
+    @property
+    def metadata_cache(self):
+        # type: () -> S3MetadataCache
+        """
+        Listings of the current run, None if disabled ([features]remote_listing_cache_ttl)
+        """
+        ttl = get_remote_listing_cache_ttl()
+        if not ttl:
+            return None
+
+        run = try_get_databand_run()
+        run_uid = run.run_uid if run else None
+        cache = self._metadata_cache
+        if cache is None or cache.run_uid != run_uid or cache.ttl != ttl:
+            if cache is not None and cache.hits:
+                logger.info("%s", cache)
+            cache = self._metadata_cache = S3MetadataCache(ttl=ttl, run_uid=run_uid)
+        return cache
+
+    def _invalidate_metadata_cache(self, bucket, key):
+        if self._metadata_cache is not None:
+            self._metadata_cache.invalidate(bucket, key)
+
+    def _find_listing(self, bucket, key):
+        cache = self.metadata_cache
+        if cache is None:
+            return None
+        # the listing of the directory itself can tell that it exists
+        return cache.find(bucket, key) or cache.find(
+            bucket, self._add_path_delimiter(key)
+        )
+
+    def _list_objects(self, bucket, prefix, max_keys=None):
+        """
+        Lists all the objects with the prefix and keeps the listing in the metadata cache.
+        Returns None if there are max_keys objects or more.
+        """
+        cache = self.metadata_cache
+        generation = cache.generation if cache is not None else None
+        objects = self.s3.Bucket(bucket).objects.filter(Prefix=prefix)
+        if max_keys:
+            objects = objects.page_size(max_keys).limit(max_keys)
+        objects = list(objects)
+        if max_keys and len(objects) >= max_keys:
+            return None
+
+        if cache is None:
+            return S3Listing(prefix, objects)
+        return cache.add(bucket, prefix, objects, generation=generation)
+
+    def _isdir_in_listing(self, listing, key):
+        dir_marker = key + S3_DIRECTORY_MARKER_SUFFIX_0
+        dir_prefix = self._add_path_delimiter(key)
+        return listing.has_key(dir_marker) or listing.has_prefix(dir_prefix)
+
+    def _exists_in_listing(self, listing, key):
+        return listing.has_key(key) or self._isdir_in_listing(listing, key)
+
     def exists(self, path):
         """
         Does provided path exist on S3?
@@ -193,6 +254,11 @@ class S3Client(FileSystem):
         if self._is_root(key):
             return True
 
+        listing = self._find_listing(bucket, key)
+        if listing is not None and self._exists_in_listing(listing, key):
+            self.metadata_cache.hit()
+            return True
+
         # file
         if self._exists(bucket, key):
             return True
@@ -203,6 +269,42 @@ class S3Client(FileSystem):
         logger.debug("Path %s does not exist", path)
         return False
 
+    def exists_many(self, paths):
+        """
+        exists() of many paths: the paths of the same directory (bucket)
+        are answered from a single listing of their common prefix,
+        if it has less than MAX_CACHED_LISTING objects.
+        """
+        paths_by_bucket = defaultdict(dict)  # bucket -> key -> path
+        for path in paths:
+            bucket, key = self._path_to_bucket_and_key(path)
+            paths_by_bucket[bucket][key] = path
+
+        found = {}
+        for bucket, key_paths in paths_by_bucket.items():
+            keys = [k for k in key_paths if not self._is_root(k)]
+            listing = None
+            if len(keys) > 1:
+                prefix = os.path.commonprefix(keys)
+                prefix = prefix[: prefix.rfind("/") + 1]
+                if prefix:
+                    listing = self._list_objects(
+                        bucket, prefix, max_keys=MAX_CACHED_LISTING
+                    )
+
+            cache = self.metadata_cache
+            if listing is not None and cache is not None:
+                cache.hit(requests_saved=len(keys) - 1)
+            for key, path in key_paths.items():
+                if self._is_root(key):
+                    found[(bucket, key)] = True
+                elif listing is not None:
+                    # the listing is fresh, objects that are not there don't exist
+                    found[(bucket, key)] = self._exists_in_listing(listing, key)
+                else:
+                    found[(bucket, key)] = self.exists(path)
+        return [found[self._path_to_bucket_and_key(path)] for path in paths]
+
     def remove(self, path, recursive=True):
         """
         Remove a file or directory from S3.
@@ -223,6 +325,7 @@ class S3Client(FileSystem):
         if self._exists(bucket, key):
             self.s3.meta.client.delete_object(Bucket=bucket, Key=key)
             logger.debug("Deleting %s from bucket %s", key, bucket)
+            self._invalidate_metadata_cache(bucket, key)
             return True
 
         if self.isdir(path) and not recursive:
@@ -245,6 +348,7 @@ class S3Client(FileSystem):
             self.s3.meta.client.delete_objects(
                 Bucket=bucket, Delete={"Objects": delete_key_list}
             )
+            self._invalidate_metadata_cache(bucket, key)
             return True
 
         return False
@@ -296,16 +400,15 @@ class S3Client(FileSystem):
 
         # put the file
         self.s3.meta.client.put_object(Key=key, Bucket=bucket, Body=content, **kwargs)
+        self._invalidate_metadata_cache(bucket, key)
 
-    def put_multipart(
-        self, local_path, destination_s3_path, part_size=8388608, **kwargs
-    ):
+    def put_multipart(self, local_path, destination_s3_path, part_size=None, **kwargs):
         """
         Put an object stored locally to an S3 path
-        using S3 multi-part upload (for files > 8Mb).
+        using S3 multi-part upload (parts are uploaded concurrently).
         :param local_path: Path to source local file
         :param destination_s3_path: URL for target S3 location
-        :param part_size: Part size in bytes. Default: 8388608 (8MB)
+        :param part_size: Part size in bytes. Default: [features]remote_write_part_size (8MB)
         :param kwargs: Keyword arguments are passed to the boto function `upload_fileobj` as ExtraArgs
         """
         if "encrypt_key" in kwargs:
@@ -313,25 +416,24 @@ class S3Client(FileSystem):
                 "encrypt_key deprecated in boto3. Please refer to boto3 documentation for encryption details."
             )
 
-        # default part size for boto3 is 8Mb, changing it to fit part_size
-        # provided as a parameter
-        # transfer_config = boto3.s3.transfer.TransferConfig(
-        #     multipart_chunksize=part_size
-        # )
-
         (bucket, key) = self._path_to_bucket_and_key(destination_s3_path)
 
         # logger.debug("Uploading %s --> %s, %s" , destination_s3_path , bucket,key)
         # validate the bucket
         self._validate_bucket(bucket)
 
-        self.s3.meta.client.upload_fileobj(
-            Fileobj=open(local_path, "rb"),
-            Bucket=bucket,
-            Key=key,
-            # Config=transfer_config,
-            ExtraArgs=kwargs,
-        )
+        with open(local_path, "rb") as fp:
+            self.s3.meta.client.upload_fileobj(
+                Fileobj=fp,
+                Bucket=bucket,
+                Key=key,
+                Config=self._transfer_config(
+                    part_size or get_remote_write_part_size(),
+                    get_remote_write_concurrency(),
+                ),
+                ExtraArgs=kwargs,
+            )
+        self._invalidate_metadata_cache(bucket, key)
 
     def copy_from_local(self, local_path, dest):
         return self.put_multipart(local_path=local_path, destination_s3_path=dest)
@@ -397,6 +499,7 @@ class S3Client(FileSystem):
                         Config=transfer_config,
                         ExtraArgs=kwargs,
                     )
+            self._invalidate_metadata_cache(dst_bucket, dst_key)
 
             end = datetime.datetime.now()
             duration = end - start
@@ -417,6 +520,7 @@ class S3Client(FileSystem):
                 Config=transfer_config,
                 ExtraArgs=kwargs,
             )
+            self._invalidate_metadata_cache(dst_bucket, dst_key)
 
     def get(self, s3_path, destination_local_path):
         """
@@ -424,7 +528,22 @@ class S3Client(FileSystem):
         """
         (bucket, key) = self._path_to_bucket_and_key(s3_path)
         # download the file
-        self.s3.meta.client.download_file(bucket, key, destination_local_path)
+        self.s3.meta.client.download_file(
+            bucket,
+            key,
+            destination_local_path,
+            Config=self._transfer_config(
+                get_remote_read_chunk_size(), get_remote_s3_read_concurrency() + 1
+            ),
+        )
+
+    def _transfer_config(self, part_size, concurrency):
+        import boto3.s3.transfer
+
+        return boto3.s3.transfer.TransferConfig(
+            multipart_chunksize=max(part_size, S3_MIN_PART_SIZE),
+            max_concurrency=max(concurrency, 1),
+        )
 
     def get_as_string(self, s3_path):
         """
@@ -449,6 +568,11 @@ class S3Client(FileSystem):
         if self._is_root(key):
             return True
 
+        listing = self._find_listing(bucket, key)
+        if listing is not None and self._isdir_in_listing(listing, key):
+            self.metadata_cache.hit()
+            return True
+
         for suffix in (S3_DIRECTORY_MARKER_SUFFIX_0, S3_DIRECTORY_MARKER_SUFFIX_1):
             try:
                 self.s3.meta.client.get_object(Bucket=bucket, Key=key + suffix)
@@ -496,12 +620,9 @@ class S3Client(FileSystem):
         """
         (bucket, key) = self._path_to_bucket_and_key(path)
 
-        # grab and validate the bucket
-        s3_bucket = self.s3.Bucket(bucket)
-
         key_path = self._add_path_delimiter(key)
         key_path_len = len(key_path)
-        for item in s3_bucket.objects.filter(Prefix=key_path):
+        for item in self._iter_objects(bucket, key_path):
             last_modified_date = item.last_modified
             if (
                 # neither are defined, list all
@@ -523,6 +644,25 @@ class S3Client(FileSystem):
                 else:
                     yield self._add_path_delimiter(path) + item.key[key_path_len:]
 
+    def _iter_objects(self, bucket, prefix):
+        """
+        Streams the objects with the prefix, always from S3 (objects can be created by other processes).
+        A listing that was read to the end and has at most MAX_CACHED_LISTING objects
+        is kept in the metadata cache, to answer exists/isdir of the listed paths.
+        """
+        cache = self.metadata_cache
+        generation = cache.generation if cache is not None else None
+        objects = [] if cache is not None else None
+        for obj in self.s3.Bucket(bucket).objects.filter(Prefix=prefix):
+            if objects is not None:
+                objects.append(obj)
+                if len(objects) > MAX_CACHED_LISTING:
+                    objects = None
+            yield obj
+
+        if objects is not None:
+            cache.add(bucket, prefix, objects, generation=generation)
+
     def list(
         self, path, start_time=None, end_time=None, return_key=False
     ):  # backwards compat
@@ -570,93 +710,179 @@ class S3Client(FileSystem):
                 raise
 
     def open_read(self, path, mode="r"):
-        s3_key = self.get_key(path)
-        if not s3_key:
-            raise FileNotFoundException("Could not find file at %s" % path)
-        return ReadableS3File(s3_key)
-
-    def open_write(self, path, mode="w"):
-        return AtomicLocalFile(path, self, mode=mode)
+        """
+        Returns seekable file object, the object content is streamed by
+        ranged GETs of [features]remote_read_chunk_size bytes, while the file is
+        read sequentially [features]remote_s3_read_concurrency parts are fetched concurrently
+        """
+        (bucket, key) = self._path_to_bucket_and_key(path)
+        client = self.s3.meta.client
+        try:
+            head = client.head_object(Bucket=bucket, Key=key)
+        except botocore.exceptions.ClientError as e:
+            if e.response["Error"]["Code"] in ["NoSuchKey", "404", "Forbidden", "403"]:
+                raise FileNotFoundException("Could not find file at %s" % path)
+            raise
 
+        # the object can be overwritten while we are reading it, fail instead of mixing versions
+        etag = head["ETag"]
 
-class ReadableS3File(object):
-    def __init__(self, s3_key):
-        self.s3_key = _StreamingBodyAdaptor(s3_key.get()["Body"])
-        self.buffer = []
-        self.closed = False
-        self.finished = False
+        def _read_range(start, end):
+            return client.get_object(
+                Bucket=bucket, Key=key, Range="bytes=%d-%d" % (start, end), IfMatch=etag
+            )["Body"].read()
 
-    def read(self, size=None):
-        f = self.s3_key.read(size)
-        return f
+        return open_ranged_reader(
+            _read_range,
+            size=head["ContentLength"],
+            read_ahead=get_remote_s3_read_concurrency(),
+            name=path,
+        )
 
-    def readlines(self):
-        return [l for l in self]
+    def open_write(self, path, mode="w"):
+        return AtomicS3MultipartFile(
+            path,
+            self,
+            part_size=get_remote_write_part_size(),
+            concurrency=get_remote_write_concurrency(),
+        )
 
-    def readline(self):
-        if not hasattr(self, "_readline_iter"):
-            self._readline_iter = iter(self)
-        return next(self._readline_iter)
 
-    def close(self):
-        self.s3_key.close()
-        self.closed = True
+class AtomicS3MultipartFile(io.BufferedIOBase):
+    """
+    Streams the content into S3 object by multipart upload (nothing is stored locally):
+    every `part_size` bytes are uploaded in background while the next part is written,
+    up to `concurrency` parts are uploaded concurrently
+    (so at most concurrency + 1 parts are kept in memory).
 
-    def __del__(self):
-        self.close()
+    The object is created on close() only (small files are uploaded by a single put),
+    the upload is aborted if the file is not closed or an exception is raised in `with` block.
+    """
 
-    def __exit__(self, exc_type, exc, traceback):
-        self.close()
+    def __init__(self, path, fs, part_size, concurrency, **kwargs):
+        super(AtomicS3MultipartFile, self).__init__()
+        self.path = path
+        self.fs = fs
+        self.bucket, self.key = fs._path_to_bucket_and_key(path)
+        self.part_size = max(part_size, S3_MIN_PART_SIZE)
+        self.concurrency = max(concurrency, 1)
+        self.extra_args = kwargs
 
-    def __enter__(self):
-        return self
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = []  # AsyncResult of every uploaded part
+        self._pool = None
 
-    def _add_to_buffer(self, line):
-        self.buffer.append(line)
+    def __repr__(self):
+        return "AtomicS3MultipartFile(%s)" % self.path
 
-    def _flush_buffer(self):
-        output = b"".join(self.buffer)
-        self.buffer = []
-        return output
+    @property
+    def _client(self):
+        return self.fs.s3.meta.client
 
-    def readable(self):
+    def writable(self):
         return True
 
-    def writable(self):
-        return False
+    def write(self, b):
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        self._buffer.extend(b)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[: self.part_size])
+            del self._buffer[: self.part_size]
+            self._upload_part(part)
+        return len(b)
 
-    def seekable(self):
-        return False
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._commit()
+        except Exception:
+            self._abort()
+            raise
+        finally:
+            super(AtomicS3MultipartFile, self).close()
 
-    def flush(self):
-        return True
+    def __exit__(self, exc_type, exc, traceback):
+        "Close/commit the file if there are no exception"
+        if exc_type:
+            self._abort()
+            super(AtomicS3MultipartFile, self).close()
+            return
+        return super(AtomicS3MultipartFile, self).__exit__(exc_type, exc, traceback)
 
-    def __iter__(self):
-        key_iter = self.s3_key.__iter__()
+    def __del__(self):
+        # the content is not complete, the object should not be created
+        if not self.closed:
+            self._abort()
+            super(AtomicS3MultipartFile, self).close()
+
+    def _upload_part(self, data):
+        if self._upload_id is None:
+            self._upload_id = self._client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, **self.extra_args
+            )["UploadId"]
+            self._pool = ThreadPool(self.concurrency)
+
+        # memory is bounded: we wait for the oldest part if all the threads are busy
+        uploading = [p for p in self._parts if not p.ready()]
+        if len(uploading) >= self.concurrency:
+            uploading[0].wait()
+
+        part_number = len(self._parts) + 1
+        self._parts.append(
+            self._pool.apply_async(self._do_upload_part, (part_number, data))
+        )
 
-        has_next = True
-        while has_next:
+    def _do_upload_part(self, part_number, data):
+        response = self._client.upload_part(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self._upload_id,
+            PartNumber=part_number,
+            Body=data,
+        )
+        return {"ETag": response["ETag"], "PartNumber": part_number}
+
+    def _commit(self):
+        if self._upload_id is None:
+            # fits into a single part
+            self._client.put_object(
+                Bucket=self.bucket,
+                Key=self.key,
+                Body=bytes(self._buffer),
+                **self.extra_args
+            )
+        else:
+            if self._buffer:
+                self._upload_part(bytes(self._buffer))
+            parts = [p.get() for p in self._parts]
+            self._client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+            logger.debug("Uploaded %s in %s parts", self.path, len(parts))
+        self._buffer = bytearray()
+        self.fs._invalidate_metadata_cache(self.bucket, self.key)
+
+    def _abort(self):
+        self._buffer = bytearray()
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        if self._upload_id is not None:
             try:
-                # grab the next chunk
-                chunk = next(key_iter)
-
-                # split on newlines, preserving the newline
-                for line in chunk.splitlines(True):
-
-                    if not line.decode("utf-8").endswith(os.linesep):
-                        # no newline, so store in buffer
-                        self._add_to_buffer(line)
-                    else:
-                        # newline found, send it out
-                        if self.buffer:
-                            self._add_to_buffer(line)
-                            yield self._flush_buffer()
-                        else:
-                            yield line
-            except StopIteration:
-                # send out anything we have left in the buffer
-                output = self._flush_buffer()
-                if output:
-                    yield output
-                has_next = False
-        self.close()
+                self._client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+                )
+            except Exception as ex:
+                logger.warning(
+                    "Failed to abort multipart upload of %s: %s", self.path, ex
+                )
+            self._upload_id = None
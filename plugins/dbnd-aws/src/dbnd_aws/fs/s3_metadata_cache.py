@@ -0,0 +1,125 @@
+import bisect
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class S3Listing(object):
+    """
+    All the objects (boto3 ObjectSummary) with the prefix, sorted by key.
+    """
+
+    def __init__(self, prefix, objects, created=None):
+        self.prefix = prefix
+        self.objects = sorted(objects, key=lambda o: o.key)
+        self.keys = [o.key for o in self.objects]
+        self.created = created if created is not None else time.time()
+
+    def __repr__(self):
+        return "S3Listing(%s, %s objects)" % (self.prefix, len(self.keys))
+
+    def covers(self, key):
+        return key.startswith(self.prefix)
+
+    def has_key(self, key):
+        idx = bisect.bisect_left(self.keys, key)
+        return idx < len(self.keys) and self.keys[idx] == key
+
+    def has_prefix(self, prefix):
+        idx = bisect.bisect_left(self.keys, prefix)
+        return idx < len(self.keys) and self.keys[idx].startswith(prefix)
+
+    def objects_with_prefix(self, prefix):
+        start = end = bisect.bisect_left(self.keys, prefix)
+        while end < len(self.keys) and self.keys[end].startswith(prefix):
+            end += 1
+        return self.objects[start:end]
+
+
+class S3MetadataCache(object):
+    """
+    Prefix listings done during the run, so exists/isdir of the paths under
+    the listed prefix are answered without requests while the listing is not older than `ttl`.
+
+    Only positive answers are taken from the cache
+    (an object can be created by another process after the listing),
+    listings are dropped on every write/remove done by this process.
+    """
+
+    def __init__(self, ttl, run_uid=None):
+        self.ttl = ttl
+        self.run_uid = run_uid
+
+        # stats
+        self.hits = 0
+        self.requests_saved = 0
+        self.listings = 0
+        self.invalidations = 0
+
+        self._listings = {}  # (bucket, prefix) -> S3Listing
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def __str__(self):
+        return (
+            "S3 metadata cache: %s hits, %s requests saved, %s listings, %s invalidations"
+            % (self.hits, self.requests_saved, self.listings, self.invalidations)
+        )
+
+    @property
+    def generation(self):
+        """
+        Changes on every invalidation, taken before the listing is started
+        """
+        return self._generation
+
+    def add(self, bucket, prefix, objects, generation=None):
+        """
+        Keeps the listing, unless there was an invalidation since `generation`
+        (our own write could happen while the listing was done)
+        """
+        listing = S3Listing(prefix, objects)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return listing
+            self._listings[(bucket, prefix)] = listing
+            self.listings += 1
+        return listing
+
+    def find(self, bucket, key):
+        """
+        Returns the most recent not expired listing that has all the objects under `key`
+        """
+        found = None
+        expired_before = time.time() - self.ttl
+        with self._lock:
+            for (listing_bucket, prefix), listing in list(self._listings.items()):
+                if listing.created < expired_before:
+                    del self._listings[(listing_bucket, prefix)]
+                    continue
+                if listing_bucket != bucket or not listing.covers(key):
+                    continue
+                if found is None or listing.created > found.created:
+                    found = listing
+        return found
+
+    def hit(self, requests_saved=1):
+        with self._lock:
+            self.hits += 1
+            self.requests_saved += requests_saved
+
+    def invalidate(self, bucket, key):
+        """
+        Drops the listings that could have the key (or the objects under the key)
+        """
+        with self._lock:
+            for listing_bucket, prefix in list(self._listings):
+                if listing_bucket == bucket and (
+                    key.startswith(prefix) or prefix.startswith(key)
+                ):
+                    del self._listings[(listing_bucket, prefix)]
+                    self.invalidations += 1
+            self._generation += 1
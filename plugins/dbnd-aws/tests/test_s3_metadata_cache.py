@@ -0,0 +1,144 @@
+import time
+
+from collections import namedtuple
+
+import pytest
+
+from dbnd_aws.fs.s3_metadata_cache import S3Listing, S3MetadataCache
+
+
+_Object = namedtuple("_Object", ["key"])
+
+
+def _listing_objects(*keys):
+    return [_Object(k) for k in keys]
+
+
+class TestS3MetadataCache(object):
+    def test_listing(self):
+        listing = S3Listing(
+            "data/", _listing_objects("data/b/part-1", "data/a", "data/b/part-0")
+        )
+        assert listing.keys == ["data/a", "data/b/part-0", "data/b/part-1"]
+        assert listing.has_key("data/a")
+        assert not listing.has_key("data/b")
+        assert listing.has_prefix("data/b/")
+        assert not listing.has_prefix("data/c/")
+        assert [o.key for o in listing.objects_with_prefix("data/b/")] == [
+            "data/b/part-0",
+            "data/b/part-1",
+        ]
+
+    def test_find(self):
+        cache = S3MetadataCache(ttl=30)
+        listing = cache.add("bucket", "data/", _listing_objects("data/a"))
+        assert cache.find("bucket", "data/a") is listing
+        assert cache.find("bucket", "data/b/c") is listing
+        assert cache.find("bucket", "other/a") is None
+        assert cache.find("other_bucket", "data/a") is None
+
+    def test_expired(self):
+        cache = S3MetadataCache(ttl=30)
+        listing = cache.add("bucket", "data/", _listing_objects("data/a"))
+        listing.created = time.time() - 31
+        assert cache.find("bucket", "data/a") is None
+
+    def test_invalidate(self):
+        cache = S3MetadataCache(ttl=30)
+        cache.add("bucket", "data/", [])
+        cache.add("bucket", "data/b/", [])
+        cache.add("bucket", "other/", [])
+
+        # new object under the listed prefixes
+        cache.invalidate("bucket", "data/b/c")
+        assert cache.find("bucket", "data/b/c") is None
+        assert cache.find("bucket", "other/a") is not None
+        assert cache.invalidations == 2
+
+        # removed directory
+        cache.add("bucket", "data/b/", [])
+        cache.invalidate("bucket", "data")
+        assert cache.find("bucket", "data/b/c") is None
+
+    def test_listing_during_invalidation(self):
+        cache = S3MetadataCache(ttl=30)
+        generation = cache.generation
+        # our own write while the listing is done
+        cache.invalidate("bucket", "data/a")
+        cache.add("bucket", "data/", [], generation=generation)
+        assert cache.find("bucket", "data/a") is None
+
+    def test_stats(self):
+        cache = S3MetadataCache(ttl=30)
+        cache.hit()
+        cache.hit(requests_saved=9)
+        assert cache.hits == 2
+        assert cache.requests_saved == 10
+        assert "10 requests saved" in str(cache)
+
+
+class TestS3ClientMetadataCache(object):
+    bucket = "dbnd-test-bucket"
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        moto = pytest.importorskip("moto")
+        import boto3
+
+        from dbnd_aws.fs import s3
+
+        monkeypatch.setattr(s3, "get_remote_listing_cache_ttl", lambda: 30)
+        with moto.mock_s3():
+            resource = boto3.resource("s3", region_name="us-east-1")
+            resource.create_bucket(Bucket=self.bucket)
+            yield s3.S3Client.from_boto_resource(resource)
+
+    def url(self, key):
+        return "s3://%s/%s" % (self.bucket, key)
+
+    def test_listdir_is_cached(self, client):
+        for i in range(3):
+            client.put_string("data", self.url("data/part-%s" % i))
+
+        assert len(list(client.listdir(self.url("data")))) == 3
+        assert client.exists(self.url("data/part-0"))
+        assert client.isdir(self.url("data"))
+        assert client.metadata_cache.hits == 2
+
+        # our own write drops the listing
+        client.put_string("data", self.url("data/part-3"))
+        assert len(list(client.listdir(self.url("data")))) == 4
+
+    def test_missing_objects_are_checked(self, client):
+        client.put_string("data", self.url("data/part-0"))
+        list(client.listdir(self.url("data")))
+
+        # created by someone else after the listing
+        client.s3.meta.client.put_object(
+            Bucket=self.bucket, Key="data/part-1", Body="data"
+        )
+        assert client.exists(self.url("data/part-1"))
+
+    def test_listdir_is_not_cached(self, client):
+        client.put_string("data", self.url("data/part-0"))
+        assert len(list(client.listdir(self.url("data")))) == 1
+
+        # created by someone else after the listing
+        client.s3.meta.client.put_object(
+            Bucket=self.bucket, Key="data/part-1", Body="data"
+        )
+        assert len(list(client.listdir(self.url("data")))) == 2
+
+    def test_exists_many(self, client):
+        client.put_string("data", self.url("data/a/part-0"))
+        client.put_string("data", self.url("data/b/part-0"))
+
+        paths = [
+            self.url("data/a/part-0"),
+            self.url("data/b"),
+            self.url("data/c/part-0"),
+            self.url(""),
+        ]
+        assert client.exists_many(paths) == [True, True, False, True]
+        assert client.metadata_cache.listings == 1
+        assert client.metadata_cache.requests_saved == 2
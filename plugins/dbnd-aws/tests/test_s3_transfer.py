@@ -0,0 +1,114 @@
+import logging
+import os
+import time
+
+import pytest
+
+from targets import target
+
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+class TestS3Transfer(object):
+    bucket = "dbnd-test-bucket"
+
+    @pytest.fixture
+    def client(self):
+        moto = pytest.importorskip("moto")
+        import boto3
+
+        from dbnd_aws.fs.s3 import S3Client
+
+        with moto.mock_s3():
+            resource = boto3.resource("s3", region_name="us-east-1")
+            resource.create_bucket(Bucket=self.bucket)
+            yield S3Client.from_boto_resource(resource)
+
+    def url(self, key):
+        return "s3://%s/%s" % (self.bucket, key)
+
+    def read(self, client, key):
+        with client.open_read(self.url(key)) as fp:
+            return fp.read()
+
+    def open_write(self, client, key, part_size=5 * MB, concurrency=2):
+        from dbnd_aws.fs.s3 import AtomicS3MultipartFile
+
+        return AtomicS3MultipartFile(
+            self.url(key), client, part_size=part_size, concurrency=concurrency
+        )
+
+    def test_write_small(self, client):
+        with self.open_write(client, "small") as fp:
+            fp.write(b"data")
+        assert self.read(client, "small") == b"data"
+
+    def test_write_multipart(self, client):
+        data = os.urandom(12 * MB)
+        fp = self.open_write(client, "big")
+        for start in range(0, len(data), MB):
+            fp.write(data[start : start + MB])
+        # the object is created on close only
+        assert not client.exists(self.url("big"))
+        fp.close()
+
+        assert self.read(client, "big") == data
+        assert len(fp._parts) == 3
+
+    def test_write_aborted_on_exception(self, client):
+        with pytest.raises(ValueError):
+            with self.open_write(client, "big") as fp:
+                fp.write(os.urandom(12 * MB))
+                raise ValueError()
+
+        assert not client.exists(self.url("big"))
+        uploads = client.s3.meta.client.list_multipart_uploads(Bucket=self.bucket)
+        assert not uploads.get("Uploads")
+
+    def test_target_read_write(self, client):
+        t = target(self.url("data.txt"), fs=client)
+        with t.open("w") as fp:
+            fp.write("a,b\n1,2\n")
+        with t.open("r") as fp:
+            assert fp.read() == "a,b\n1,2\n"
+
+    def test_read_range(self, client):
+        data = os.urandom(3 * MB)
+        client.s3.meta.client.put_object(Bucket=self.bucket, Key="data", Body=data)
+
+        with client.open_read(self.url("data")) as fp:
+            fp.seek(2 * MB)
+            assert fp.read(10) == data[2 * MB : 2 * MB + 10]
+            fp.seek(0)
+            assert fp.read() == data
+
+    @pytest.mark.skip("performance tests")
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    def test_write_throughput(self, client, concurrency):
+        size = 100 * MB
+        data = os.urandom(MB)
+
+        start = time.time()
+        with self.open_write(
+            client, "throughput", part_size=8 * MB, concurrency=concurrency
+        ) as fp:
+            for _ in range(size // MB):
+                fp.write(data)
+        write_time = time.time() - start
+
+        start = time.time()
+        with client.open_read(self.url("throughput")) as fp:
+            while fp.read(MB):
+                pass
+        read_time = time.time() - start
+
+        logger.info(
+            "%sMB with concurrency=%s: write %.1fMB/s, read %.1fMB/s",
+            size // MB,
+            concurrency,
+            size / MB / write_time,
+            size / MB / read_time,
+        )
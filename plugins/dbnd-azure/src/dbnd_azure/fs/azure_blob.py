@@ -9,14 +9,13 @@ from six.moves import xrange
 from azure.storage.blob import BlockBlobService
 from dbnd_azure.fs import AZURE_BLOB_FS_NAME
 from targets import AtomicLocalFile
-from targets.config import get_local_tempfile
 from targets.errors import (
     FileAlreadyExists,
     InvalidDeleteException,
     MissingParentDirectory,
 )
 from targets.fs.file_system import FileSystem
-from targets.utils.atomic import _DeleteOnCloseFile
+from targets.utils.ranged_reader import open_ranged_reader
 
 
 try:
@@ -58,6 +57,7 @@ class AzureBlobStorageClient(FileSystem):
     """
 
     name = AZURE_BLOB_FS_NAME
+    atomic_upload = True
 
     def __init__(self, **kwargs):
         self._options = kwargs
@@ -269,14 +269,31 @@ class AzureBlobStorageClient(FileSystem):
         self.put(path=local_path, container=container_name, blob=blob_name)
 
     def open_read(self, path, mode="r"):
+        """
+        Returns seekable file object, the blob content is streamed by
+        range requests of [features]remote_read_chunk_size bytes on demand
+        (nothing is downloaded to the local disk)
+        """
         account, container, blob = self._path_to_account_container_and_blob(path)
         assert self.account == account
 
-        local_tmp_file = get_local_tempfile("download-%s" % os.path.basename(path))
-        # We can't return the tempfile reference because of a bug in python: http://bugs.python.org/issue18879
-        self.download_as_file(container, blob, local_tmp_file)
-
-        return _DeleteOnCloseFile(local_tmp_file, mode)
+        properties = self.conn.get_blob_properties(container, blob).properties
+        # the blob can be overwritten while we are reading it, fail instead of mixing versions
+        etag = properties.etag
+
+        def _read_range(start, end):
+            return self.conn.get_blob_to_bytes(
+                container,
+                blob,
+                start_range=start,
+                end_range=end,
+                if_match=etag,
+                max_connections=1,
+            ).content
+
+        return open_ranged_reader(
+            _read_range, size=properties.content_length, name=path
+        )
 
     def download(self, azure_path, location):
         account, container, blob = self._path_to_account_container_and_blob(azure_path)
@@ -1,4 +1,5 @@
 import json
+import os
 import tempfile
 
 import pytest
@@ -75,6 +76,15 @@ class TestAzureBlobClient(_AzureBlobBaseTestCase):
         content = self.client.download_as_bytes(self.container_name, "test_download")
         assert b"hello" == content
 
+    def test_open_read_seek(self):
+        content = "".join(str(i) for i in range(300))
+        self.client.put_string(content, self.container_name, "test_open_read_seek")
+        with self.client.open_read(self.container_url("test_open_read_seek")) as fp:
+            fp.seek(-10, os.SEEK_END)
+            assert fp.read() == content[-10:].encode("utf-8")
+            fp.seek(0)
+            assert fp.read(10) == content[:10].encode("utf-8")
+
     def test_rename(self):
         self.client.put_string("hello", self.container_name, "test_rename_1")
         self.client.rename(
@@ -1,3 +1,4 @@
+import contextlib
 import logging
 import pprint
 import time
@@ -21,6 +22,7 @@ from dbnd_airflow.airflow_extensions.dal import (
 from dbnd_airflow_contrib.airflow_task_instance_retry_controller import (
     AirflowTaskInstanceRetryController,
 )
+from dbnd_docker.kubernetes.kube_pod_informer import get_pod_informer
 from dbnd_docker.kubernetes.kube_resources_checker import DbndKubeResourcesChecker
 from dbnd_docker.kubernetes.kubernetes_engine_config import (
     KubernetesEngineConfig,
@@ -36,6 +38,9 @@ if typing.TYPE_CHECKING:
     from kubernetes.client import CoreV1Api
 logger = logging.getLogger(__name__)
 
+# pod is read directly if there is no update from the pods watch for so long
+POD_WATCH_RESYNC_INTERVAL = 30
+
 
 class DbndKubernetesClient(object):
     def __init__(self, kube_client, engine_config):
@@ -245,6 +250,10 @@ class DbndPodCtrl(object):
         self.namespace = pod_namespace
         self.kube_client = kube_client
 
+        # selector of the pods to watch, pods of the same run share the watch
+        self.label_selector = "dbnd=task_run"
+        self._pod_informer = None
+
     def delete_pod(self):
         if self.kube_config.keep_finished_pods:
             logger.warning(
@@ -292,22 +301,62 @@ class DbndPodCtrl(object):
                 )
             )
 
-    def get_airflow_state(self):
+    def get_airflow_state(self, pod_resp=None):
         """Process phase infomration for the JOB"""
         try:
-            pod_resp = self.get_pod_status_v1()
+            pod_resp = pod_resp or self.get_pod_status_v1()
             return self._phase_to_airflow_state(pod_resp.status.phase)
         except Exception as e:
             logger.warning("failed to read pod state for %s: %s", self.name, e)
             return None
 
+    @contextlib.contextmanager
+    def pod_watch(self):
+        """
+        While in the context, pod state updates are taken from the watch shared by
+        all pods of the run (if kubernetes.pod_watch is enabled)
+        """
+        if not self.kube_config.pod_watch:
+            yield
+            return
+
+        informer = get_pod_informer(
+            self.kube_client, self.namespace, label_selector=self.label_selector
+        )
+        informer.subscribe()
+        self._pod_informer = informer
+        try:
+            yield
+        finally:
+            self._pod_informer = None
+            informer.unsubscribe()
+
+    def _wait_for_pod_update(self, pod_status, poll_interval, timeout):
+        """
+        Returns the pod once its state is changed (or after poll_interval, if pods are polled)
+        """
+        informer = self._pod_informer
+        if informer is None:
+            time.sleep(poll_interval)
+            return self.get_pod_status_v1()
+
+        pod = informer.wait_for_update(
+            self.name,
+            pod_status,
+            timeout=max(min(timeout, POD_WATCH_RESYNC_INTERVAL), poll_interval),
+        )
+        if pod is None:
+            # no update from the watch (or it doesn't know the pod yet)
+            return self.get_pod_status_v1()
+        return pod
+
     def _wait_for_pod_started(self, _logger=logger):
         """
         will try to raise an exception if the pod fails to start (see DbndPodLauncher.check_deploy_errors)
         """
         start_time = datetime.now()
+        pod_status = self.get_pod_status_v1()
         while True:
-            pod_status = self.get_pod_status_v1()
             # PATCH:  validate deploy errors
             self.check_deploy_errors(pod_status)
 
@@ -318,8 +367,14 @@ class DbndPodCtrl(object):
             startup_delta = datetime.now() - start_time
             if startup_delta >= self.kube_config.startup_timeout:
                 raise DatabandError("Pod is still not running after %s" % startup_delta)
-            time.sleep(1)
             _logger.debug("Pod not yet started: %s", pod_status.status)
+            pod_status = self._wait_for_pod_update(
+                pod_status,
+                poll_interval=1,
+                timeout=(
+                    self.kube_config.startup_timeout - startup_delta
+                ).total_seconds(),
+            )
 
     def stream_pod_logs(self, print_func=logger.info, follow=False, tail_lines=10):
         kwargs = {
@@ -417,6 +472,18 @@ class DbndPodCtrl(object):
         Waits for pod completion
         :return:
         """
+        with self.pod_watch():
+            final_state = self._wait_for_final_state()
+
+        from airflow.utils.state import State
+
+        if final_state != State.SUCCESS:
+            raise DatabandRuntimeError(
+                "Pod returned a failure: {state}".format(state=final_state)
+            )
+        return self
+
+    def _wait_for_final_state(self):
         self._wait_for_pod_started()
         logger.info("Pod '%s' is running, reading logs..", self.name)
         self.stream_pod_logs(follow=True)
@@ -424,6 +491,7 @@ class DbndPodCtrl(object):
 
         from airflow.utils.state import State
 
+        pod_status = None
         final_state = self.get_airflow_state()
         wait_start = utcnow()
         while final_state not in {State.SUCCESS, State.FAILED}:
@@ -432,23 +500,25 @@ class DbndPodCtrl(object):
                 self.name,
                 final_state,
             )
-            if (
-                utcnow() - wait_start
-            ) > self.kube_config.submit_termination_grace_period:
+            wait_delta = utcnow() - wait_start
+            grace_period = self.kube_config.submit_termination_grace_period
+            if wait_delta > grace_period:
                 raise DatabandRuntimeError(
                     "Pod is not in a final state after {grace_period}: {state}".format(
-                        grace_period=self.kube_config.submit_termination_grace_period,
-                        state=final_state,
+                        grace_period=grace_period, state=final_state
                     )
                 )
-            time.sleep(5)
-            final_state = self.get_airflow_state()
-
-        if final_state != State.SUCCESS:
-            raise DatabandRuntimeError(
-                "Pod returned a failure: {state}".format(state=final_state)
-            )
-        return self
+            try:
+                pod_status = self._wait_for_pod_update(
+                    pod_status,
+                    poll_interval=5,
+                    timeout=(grace_period - wait_delta).total_seconds(),
+                )
+            except Exception as e:
+                logger.warning("failed to read pod state for %s: %s", self.name, e)
+                pod_status = None
+            final_state = self.get_airflow_state(pod_status)
+        return final_state
 
     def run_pod(self, task_run, pod, detach_run=False):
         # type: (TaskRun, Pod, bool) -> DbndPodCtrl
@@ -470,6 +540,9 @@ class DbndPodCtrl(object):
             )
             detach_run = False
 
+        if pod.labels and "dbnd_run_uid" in pod.labels:
+            self.label_selector = "dbnd_run_uid=%s" % pod.labels["dbnd_run_uid"]
+
         req = kc.build_kube_pod_req(pod)
         readable_req_str = readable_pod_request(req)
 
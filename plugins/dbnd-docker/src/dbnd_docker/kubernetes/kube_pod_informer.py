@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+
+from dbnd_airflow_contrib.kubernetes_metrics_logger import PodEventLagStats
+
+
+logger = logging.getLogger(__name__)
+
+# the watch is resumed with exponential backoff on errors
+WATCH_MIN_BACKOFF = 1
+WATCH_MAX_BACKOFF = 60
+# server side timeout of a single watch request, the watch is resumed after it
+WATCH_TIMEOUT_SECONDS = 300
+
+
+class DbndPodInformer(object):
+    """
+    Shared cache of the pods of the namespace (matching label_selector),
+    so pod controllers wait for the state transitions instead of polling the API server.
+
+    The pods are listed once, then watched starting at the resourceVersion of the list.
+    The watch is resumed from the last seen resourceVersion (pods are listed again
+    if it's too old) with backoff on errors.
+    """
+
+    def __init__(self, kube_client, namespace, label_selector=None):
+        self.kube_client = kube_client
+        self.namespace = namespace
+        self.label_selector = label_selector
+
+        self.resource_version = None
+        self.lag_stats = PodEventLagStats()
+        self.watch_errors = 0
+        self.lists = 0
+
+        self._pods = {}  # name -> V1Pod
+        self._condition = threading.Condition()
+        self._thread = None
+        self._subscribers = 0
+
+    def __repr__(self):
+        return "DbndPodInformer(%s, %s)" % (self.namespace, self.label_selector)
+
+    def subscribe(self):
+        with self._condition:
+            self._subscribers += 1
+            if self._thread is None:
+                self.resource_version = None
+                self._thread = threading.Thread(
+                    target=self._run, name="dbnd-kube-pod-informer"
+                )
+                self._thread.daemon = True
+                self._thread.start()
+
+    def unsubscribe(self):
+        with self._condition:
+            self._subscribers -= 1
+
+    def _stop_if_idle(self):
+        with self._condition:
+            if self._subscribers > 0:
+                return False
+            # will be started again on the next subscribe
+            self._thread = None
+            self._pods = {}
+        logger.info("Stopping %s: %s", self, self.lag_stats)
+        return True
+
+    def get_pod(self, name):
+        with self._condition:
+            return self._pods.get(name)
+
+    def wait_for_update(self, name, pod=None, timeout=None):
+        """
+        Waits until the state of the pod is different from `pod`,
+        returns the updated pod, or None if there is no update within the timeout
+        (or the pod is not known to the informer), so the caller can read it directly.
+        """
+        resource_version = pod.metadata.resource_version if pod else None
+        deadline = time.time() + timeout if timeout is not None else None
+        with self._condition:
+            while True:
+                current = self._pods.get(name)
+                if (
+                    current is not None
+                    and current.metadata.resource_version != resource_version
+                ):
+                    return current
+                remaining = deadline - time.time() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def _run(self):
+        backoff = WATCH_MIN_BACKOFF
+        while not self._stop_if_idle():
+            try:
+                if self.resource_version is None:
+                    self._list_pods()
+                self._watch_pods()
+                backoff = WATCH_MIN_BACKOFF
+                continue
+            except Exception as ex:
+                if getattr(ex, "status", None) == 410:
+                    # resource version is too old, we need to list the pods again
+                    logger.info("%s: %s, listing pods again", self, ex)
+                    self.resource_version = None
+                    continue
+                self.watch_errors += 1
+                logger.warning(
+                    "%s: failed to watch pods, retrying in %ss: %s", self, backoff, ex
+                )
+            time.sleep(backoff)
+            backoff = min(backoff * 2, WATCH_MAX_BACKOFF)
+
+    def _list_pods(self):
+        kwargs = {}
+        if self.label_selector:
+            kwargs["label_selector"] = self.label_selector
+        pods = self.kube_client.list_namespaced_pod(self.namespace, **kwargs)
+        self.lists += 1
+        with self._condition:
+            self._pods = {pod.metadata.name: pod for pod in pods.items}
+            self.resource_version = pods.metadata.resource_version
+            self._condition.notify_all()
+
+    def _stream_events(self):
+        from kubernetes import watch
+
+        kwargs = {}
+        if self.label_selector:
+            kwargs["label_selector"] = self.label_selector
+        watcher = watch.Watch()
+        for event in watcher.stream(
+            self.kube_client.list_namespaced_pod,
+            self.namespace,
+            resource_version=self.resource_version,
+            timeout_seconds=WATCH_TIMEOUT_SECONDS,
+            **kwargs
+        ):
+            yield event
+            if not self._subscribers:
+                watcher.stop()
+
+    def _watch_pods(self):
+        for event in self._stream_events():
+            if event["type"] == "ERROR":
+                raw_object = event.get("raw_object") or {}
+                if raw_object.get("code") == 410:
+                    self.resource_version = None
+                    return
+                raise Exception("Pods watch error: %s" % raw_object)
+
+            pod = event["object"]
+            lag = self.lag_stats.on_event(pod)
+            logger.debug(
+                "Event %s of %s, lag: %s", event["type"], pod.metadata.name, lag
+            )
+            with self._condition:
+                if event["type"] == "DELETED":
+                    self._pods.pop(pod.metadata.name, None)
+                else:
+                    self._pods[pod.metadata.name] = pod
+                self.resource_version = pod.metadata.resource_version
+                self._condition.notify_all()
+
+
+_INFORMERS = {}
+_INFORMERS_LOCK = threading.Lock()
+
+
+def get_pod_informer(kube_client, namespace, label_selector=None):
+    # type: (...) -> DbndPodInformer
+    """
+    All pod controllers of the same cluster, namespace and label selector
+    share the informer (every controller can have its own client)
+    """
+    try:
+        host = kube_client.api_client.configuration.host
+    except AttributeError:
+        host = id(kube_client)
+    key = (host, namespace, label_selector)
+    with _INFORMERS_LOCK:
+        informer = _INFORMERS.get(key)
+        if informer is None:
+            informer = _INFORMERS[key] = DbndPodInformer(
+                kube_client=kube_client,
+                namespace=namespace,
+                label_selector=label_selector,
+            )
+        return informer
@@ -121,6 +121,10 @@ class KubernetesEngineConfig(ContainerEngineConfig):
     startup_timeout = parameter(default="10m").help(
         "Time to wait for pod getting into Running state"
     )[datetime.timedelta]
+    pod_watch = parameter(default=True).help(
+        "Wait for pod state changes using a single watch shared by all pods of the run, "
+        "instead of polling every pod"
+    )[bool]
 
     dashboard_url = parameter(default=None).help(
         "skeleton url to display as kubernetes dashboard"
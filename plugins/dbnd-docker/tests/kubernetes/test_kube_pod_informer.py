@@ -0,0 +1,127 @@
+import threading
+
+from datetime import timedelta
+
+from mock import MagicMock
+
+from dbnd._core.utils.timezone import utcnow
+from dbnd_docker.kubernetes.kube_dbnd_client import DbndPodCtrl
+from dbnd_docker.kubernetes.kube_pod_informer import DbndPodInformer
+
+
+def _pod(name, phase, resource_version):
+    pod = MagicMock()
+    pod.metadata.name = name
+    pod.metadata.resource_version = resource_version
+    pod.metadata.deletion_timestamp = None
+    pod.status.phase = phase
+    pod.status.start_time = utcnow() - timedelta(seconds=2)
+    pod.status.conditions = []
+    pod.status.container_statuses = []
+    return pod
+
+
+class _TestInformer(DbndPodInformer):
+    def __init__(self, kube_client, events):
+        super(_TestInformer, self).__init__(kube_client, "default", "dbnd=task_run")
+        self.events = events
+        self.watch_calls = 0
+
+    def _stream_events(self):
+        self.watch_calls += 1
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            yield event
+
+
+class _Events(object):
+    def __init__(self):
+        self._events = []
+        self._cond = threading.Condition()
+
+    def put(self, event):
+        with self._cond:
+            self._events.append(event)
+            self._cond.notify_all()
+
+    def get(self):
+        with self._cond:
+            while not self._events:
+                self._cond.wait()
+            return self._events.pop(0)
+
+
+class TestDbndPodInformer(object):
+    def _informer(self, pods):
+        kube_client = MagicMock()
+        kube_client.list_namespaced_pod.return_value.items = pods
+        kube_client.list_namespaced_pod.return_value.metadata.resource_version = "1"
+        return _TestInformer(kube_client, _Events())
+
+    def test_wait_for_update(self):
+        pending = _pod("pod-a", "Pending", "1")
+        informer = self._informer([pending])
+        informer.subscribe()
+        try:
+            # listed pod is returned right away
+            assert informer.wait_for_update("pod-a", timeout=5) is pending
+            # nothing has changed
+            assert informer.wait_for_update("pod-a", pending, timeout=0.1) is None
+
+            running = _pod("pod-a", "Running", "2")
+            threading.Timer(
+                0.1, informer.events.put, [{"type": "MODIFIED", "object": running}]
+            ).start()
+            assert informer.wait_for_update("pod-a", pending, timeout=5) is running
+            assert informer.lag_stats.events == 1
+            assert informer.lag_stats.max_lag >= 2
+
+            informer.events.put({"type": "DELETED", "object": running})
+            assert informer.wait_for_update("pod-a", running, timeout=0.5) is None
+        finally:
+            informer.unsubscribe()
+            informer.events.put(None)
+
+        # list + watch is done once for all the waits
+        assert informer.kube_client.list_namespaced_pod.call_count == 1
+
+    def test_relist_on_expired_resource_version(self):
+        informer = self._informer([])
+        informer.subscribe()
+        try:
+            informer.events.put(
+                {"type": "ERROR", "object": None, "raw_object": {"code": 410}}
+            )
+            new_pod = _pod("pod-b", "Running", "5")
+            informer.kube_client.list_namespaced_pod.return_value.items = [new_pod]
+            assert informer.wait_for_update("pod-b", timeout=5) is new_pod
+            assert informer.lists == 2
+        finally:
+            informer.unsubscribe()
+            informer.events.put(None)
+
+    def test_pod_is_read_without_watch_update(self):
+        pending = _pod("pod-a", "Pending", "1")
+        running = _pod("pod-a", "Running", "2")
+        informer = self._informer([pending])
+        kube_client = informer.kube_client
+        kube_client.read_namespaced_pod.return_value = running
+
+        pod_ctrl = DbndPodCtrl(
+            pod_name="pod-a",
+            pod_namespace="default",
+            kube_config=MagicMock(),
+            kube_client=kube_client,
+        )
+        informer.subscribe()
+        pod_ctrl._pod_informer = informer
+        try:
+            # the watch never delivers the update, the pod is read directly
+            pod = pod_ctrl._wait_for_pod_update(pending, poll_interval=0.1, timeout=0.1)
+            assert pod is running
+            kube_client.read_namespaced_pod.assert_called_once_with("pod-a", "default")
+        finally:
+            informer.unsubscribe()
+            informer.events.put(None)
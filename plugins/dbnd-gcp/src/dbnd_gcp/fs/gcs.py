@@ -21,6 +21,7 @@
 import logging
 import mimetypes
 import os
+import threading
 import time
 
 import six
@@ -34,11 +35,12 @@ import targets.fs.file_system
 import targets.utils.atomic
 
 from targets.config import get_local_tempfile
-from targets.errors import InvalidDeleteException
+from targets.errors import FileNotFoundException, InvalidDeleteException
 from targets.fs import FileSystems
 from targets.fs.file_system import FileSystem
 from targets.utils.atomic import _DeleteOnCloseFile
 from targets.utils.path import path_to_bucket_and_key
+from targets.utils.ranged_reader import open_ranged_reader
 
 
 logger = logging.getLogger(__name__)
@@ -47,6 +49,7 @@ try:
     import httplib2
 
     import google.auth
+    import google_auth_httplib2
     from googleapiclient import errors
     from googleapiclient import discovery
     from googleapiclient import http
@@ -145,6 +148,7 @@ class GCSClient(FileSystem):
 
     name = FileSystems.gcs
     _exist_after_write_consistent = False
+    atomic_upload = True
 
     def __init__(
         self,
@@ -156,6 +160,8 @@ class GCSClient(FileSystem):
     ):
         self.chunksize = chunksize
         authenticate_kwargs = get_authenticate_kwargs(oauth_credentials, http_)
+        self._credentials = authenticate_kwargs.get("credentials")
+        self._thread_local = threading.local()
 
         build_kwargs = authenticate_kwargs.copy()
         build_kwargs.update(discovery_build_kwargs)
@@ -505,5 +511,69 @@ class GCSClient(FileSystem):
     def copy_from_local(self, local_path, dest):
         self.put(local_path, dest)
 
+    def _thread_http(self):
+        """
+        httplib2.Http of the client is not thread-safe,
+        every thread gets its own http authorized by the client credentials
+        """
+        http_ = getattr(self._thread_local, "http", None)
+        if http_ is None:
+            http_ = google_auth_httplib2.AuthorizedHttp(
+                self._credentials, http=http.build_http()
+            )
+            self._thread_local.http = http_
+        return http_
+
+    def _execute_with_retries(self, request, http_=None):
+        attempts = 0
+        while True:
+            try:
+                return request.execute(http=http_)
+            except errors.HttpError as err:
+                if err.resp.status < 500:
+                    raise
+                error = err
+            except RETRYABLE_ERRORS as err:
+                error = err
+
+            attempts += 1
+            if attempts >= NUM_RETRIES:
+                raise error
+            logger.warning("Error downloading file, retrying", exc_info=True)
+
     def open_read(self, path, mode="r"):
-        return self.download(path)
+        """
+        Returns seekable file object, the object content is streamed by
+        range requests of [features]remote_read_chunk_size bytes on demand
+        (nothing is downloaded to the local disk).
+        The next chunks are read ahead in background only if the client is created
+        with credentials (a thread-local http is used per reading thread),
+        a single http provided by the user can't be shared between threads.
+        """
+        bucket, obj = self._path_to_bucket_and_key(path)
+        try:
+            metadata = self.client.objects().get(bucket=bucket, object=obj).execute()
+        except errors.HttpError as ex:
+            if ex.resp["status"] == "404":
+                raise FileNotFoundException("Could not find file at %s" % path)
+            raise
+
+        # the object can be overwritten while we are reading it,
+        # all the ranges are read from the same generation
+        generation = metadata.get("generation")
+
+        def _read_range(start, end):
+            request = self.client.objects().get_media(
+                bucket=bucket, object=obj, generation=generation
+            )
+            request.headers["Range"] = "bytes=%d-%d" % (start, end)
+            if not self._credentials:
+                return self._execute_with_retries(request)
+            return self._execute_with_retries(request, http_=self._thread_http())
+
+        return open_ranged_reader(
+            _read_range,
+            size=int(metadata["size"]),
+            read_ahead=None if self._credentials else 0,
+            name=path,
+        )
@@ -92,6 +92,15 @@ class TestGCSClient(_GCSBaseTestCase):
         fp = self.client.download(self.bucket_url("test_download"))
         assert b"hello" == fp.read()
 
+    def test_open_read_seek(self):
+        content = os.urandom(1000)
+        self.client.put_string(content, self.bucket_url("test_open_read_seek"))
+        with self.client.open_read(self.bucket_url("test_open_read_seek")) as fp:
+            fp.seek(-10, os.SEEK_END)
+            assert fp.read() == content[-10:]
+            fp.seek(0)
+            assert fp.read(10) == content[:10]
+
     def test_rename(self):
         self.client.put_string("hello", self.bucket_url("test_rename_1"))
         self.client.rename(
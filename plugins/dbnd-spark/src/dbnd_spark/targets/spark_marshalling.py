@@ -1,12 +1,17 @@
 from __future__ import absolute_import
 
+import json
 import logging
+import os
 
 from urllib.parse import urlparse
 
 import pyspark.sql as spark
 
+from pyspark.sql.types import StructType
+
 from dbnd._core.commands import get_spark_session
+from targets import target as target_factory
 from targets.marshalling.marshaller import Marshaller
 from targets.target_config import FileFormat
 from targets.utils.performance import target_timeit
@@ -14,6 +19,9 @@ from targets.utils.performance import target_timeit
 
 logger = logging.getLogger(__name__)
 
+# spark ignores the files starting with "_" (like _SUCCESS) when the directory is read
+SCHEMA_FILE = "_dbnd_schema.json"
+
 
 class SparkMarshaller(Marshaller):
     type = spark.DataFrame
@@ -39,27 +47,109 @@ class SparkMarshaller(Marshaller):
 
     def value_to_target(self, value, target, **kwargs):
         path = _target_to_path(target)
-        value.write.options(**kwargs).save(path=path, format=self.file_format)
+        # save mode is not an option of the writer
+        mode = kwargs.pop("mode", None)
+        value.write.options(**kwargs).save(
+            path=path, format=self.file_format, mode=mode
+        )
 
 
 class SparkDataFrameToCsv(SparkMarshaller):
     infer_schema = True
     header = True
+    # the schema of the written dataframe is saved next to the data (SCHEMA_FILE),
+    # so it's not inferred by extra pass over the data on every read
+    cache_schema = True
+    # the part of the rows used to infer the schema if there is no saved one
+    infer_schema_sampling_ratio = 0.1
 
     @target_timeit
     def target_to_value(self, target, **kwargs):
         # keep it backward compatible
         if "header" not in kwargs:
             kwargs["header"] = self.header
-        if "inferSchema" not in kwargs:
-            kwargs["inferSchema"] = self.infer_schema
+        if "schema" not in kwargs and "inferSchema" not in kwargs:
+            schema = self.load_schema(target) if self.cache_schema else None
+            if schema is not None:
+                kwargs["schema"] = schema
+            else:
+                kwargs["inferSchema"] = self.infer_schema
+        if (
+            kwargs.get("inferSchema")
+            and "samplingRatio" not in kwargs
+            and self.infer_schema_sampling_ratio
+        ):
+            kwargs["samplingRatio"] = self.infer_schema_sampling_ratio
         return super(SparkDataFrameToCsv, self).target_to_value(target, **kwargs)
 
     def value_to_target(self, value, target, **kwargs):
         # keep it backward compatible
         if "header" not in kwargs:
             kwargs["header"] = self.header
-        return super(SparkDataFrameToCsv, self).value_to_target(value, target, **kwargs)
+        mode = kwargs.get("mode")
+        existed = (
+            self.cache_schema
+            and mode in ("append", "ignore")
+            and _schema_target(target) is not None
+            and target.exists()
+        )
+        super(SparkDataFrameToCsv, self).value_to_target(value, target, **kwargs)
+        if not self.cache_schema:
+            return
+        if not existed:
+            self.save_schema(value.schema, target)
+        elif mode == "append" and self.load_schema(target) != value.schema:
+            # the schema is applied by position to all files, including the older ones
+            self.remove_schema(target)
+
+    def load_schema(self, target):
+        schema_target = _schema_target(target)
+        if schema_target is None or not schema_target.exists():
+            return None
+        try:
+            with schema_target.open("r") as fp:
+                return StructType.fromJson(json.load(fp))
+        except Exception as ex:
+            logger.warning(
+                "Failed to load spark schema from %s, it will be inferred: %s",
+                schema_target,
+                ex,
+            )
+            return None
+
+    def save_schema(self, schema, target):
+        schema_target = _schema_target(target)
+        if schema_target is None:
+            return
+        try:
+            with schema_target.open("w") as fp:
+                fp.write(schema.json())
+        except Exception as ex:
+            logger.warning("Failed to save spark schema to %s: %s", schema_target, ex)
+
+    def remove_schema(self, target):
+        schema_target = _schema_target(target)
+        if schema_target is None or not schema_target.exists():
+            return
+        try:
+            schema_target.remove()
+        except Exception as ex:
+            logger.warning(
+                "Failed to remove spark schema %s, it should be removed manually: %s",
+                schema_target,
+                ex,
+            )
+
+
+def _schema_target(target):
+    from targets.multi_target import MultiTarget
+
+    # the schema of every partition can be different
+    if isinstance(target, MultiTarget):
+        return None
+    return target_factory(
+        os.path.join(target.path, SCHEMA_FILE), fs=getattr(target, "fs", None)
+    )
 
 
 def _target_to_path(target):
@@ -0,0 +1,128 @@
+import logging
+import os
+import time
+
+import pytest
+
+from pytest import mark
+
+from targets import target
+
+
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="module")
+def spark_session():
+    from pyspark.sql import SparkSession
+
+    return SparkSession.builder.master("local[2]").getOrCreate()
+
+
+def _load_jobs(spark_session, marshaller, t, group="load"):
+    """
+    Loads the target, returns the dataframe and the number of spark jobs started by load
+    """
+    sc = spark_session.sparkContext
+    sc.setJobGroup(group, group)
+    try:
+        df = marshaller.target_to_value(t)
+    finally:
+        sc.setLocalProperty("spark.jobGroup.id", None)
+    return df, len(sc.statusTracker().getJobIdsForGroup(group))
+
+
+@mark.spark
+class TestSparkDataFrameToCsv(object):
+    @pytest.fixture
+    def marshaller(self):
+        from dbnd_spark.targets.spark_marshalling import SparkDataFrameToCsv
+
+        return SparkDataFrameToCsv()
+
+    @pytest.fixture
+    def infer_marshaller(self):
+        from dbnd_spark.targets.spark_marshalling import SparkDataFrameToCsv
+
+        m = SparkDataFrameToCsv()
+        m.cache_schema = False
+        m.infer_schema_sampling_ratio = None
+        return m
+
+    @pytest.fixture
+    def df(self, spark_session):
+        return spark_session.createDataFrame(
+            [(i, "value_%s" % i, i / 2.0) for i in range(1000)], ["a", "b", "c"]
+        )
+
+    def test_schema_is_saved(
+        self, spark_session, marshaller, infer_marshaller, df, tmpdir
+    ):
+        from dbnd_spark.targets.spark_marshalling import SCHEMA_FILE
+
+        t = target(str(tmpdir.join("data.csv")))
+        marshaller.value_to_target(df, t)
+        assert os.path.exists(os.path.join(t.path, SCHEMA_FILE))
+
+        actual, jobs = _load_jobs(spark_session, marshaller, t, group="cached")
+        assert actual.schema == df.schema
+        assert actual.count() == 1000
+
+        # the data is scanned to infer the schema
+        _, infer_jobs = _load_jobs(spark_session, infer_marshaller, t, group="infer")
+        assert jobs < infer_jobs
+
+    def test_schema_is_inferred(self, spark_session, marshaller, df, tmpdir):
+        csv_dir = str(tmpdir.join("data.csv"))
+        df.write.csv(csv_dir, header=True)
+
+        actual = marshaller.target_to_value(target(csv_dir))
+        assert [f.dataType for f in actual.schema.fields] == [
+            f.dataType for f in df.schema.fields
+        ]
+
+    def test_explicit_schema(self, spark_session, marshaller, df, tmpdir):
+        from pyspark.sql.types import StringType, StructField, StructType
+
+        t = target(str(tmpdir.join("data.csv")))
+        marshaller.value_to_target(df, t)
+
+        schema = StructType([StructField(n, StringType()) for n in ["a", "b", "c"]])
+        actual = marshaller.target_to_value(t, schema=schema)
+        assert actual.schema == schema
+
+    def test_append(self, spark_session, marshaller, df, tmpdir):
+        from dbnd_spark.targets.spark_marshalling import SCHEMA_FILE
+
+        t = target(str(tmpdir.join("data.csv")))
+        marshaller.value_to_target(df, t)
+        # the same schema, the saved one is still valid
+        marshaller.value_to_target(df, t, mode="append")
+        assert os.path.exists(os.path.join(t.path, SCHEMA_FILE))
+        assert marshaller.target_to_value(t).count() == 2000
+
+        # another schema, the saved one doesn't fit the older files anymore
+        other = df.select("c", "b")
+        marshaller.value_to_target(other, t, mode="append")
+        assert not os.path.exists(os.path.join(t.path, SCHEMA_FILE))
+        assert marshaller.target_to_value(t).count() == 3000
+
+    @pytest.mark.skip("performance tests")
+    def test_cached_schema_performance(
+        self, spark_session, marshaller, infer_marshaller, tmpdir
+    ):
+        df = spark_session.range(0, 5 * 1000 * 1000).selectExpr(
+            "id", "id * 2.5 as value", "cast(id as string) as name"
+        )
+        t = target(str(tmpdir.join("data.csv")))
+        marshaller.value_to_target(df, t)
+
+        for name, m in [
+            ("inferSchema", infer_marshaller),
+            ("cached schema", marshaller),
+        ]:
+            start = time.time()
+            _, jobs = _load_jobs(spark_session, m, t, group=name)
+            logger.info(
+                "Load with %s: %.2fs, %s spark jobs", name, time.time() - start, jobs
+            )